@@ -2,8 +2,10 @@
 JWT creation, validation, and RBAC.
 Role-based route protection via require_roles dependency.
 """
+import hashlib
+import time
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Any, List, Optional
 
 import bcrypt
 from fastapi import Depends, HTTPException, status
@@ -14,10 +16,19 @@ from pymongo.database import Database
 from config import get_settings
 from database import get_db, USERS
 from models.user import UserView, user_from_doc
+from utils.cache import TTLCache
 
 settings = get_settings()
 http_bearer = HTTPBearer(auto_error=False)
 
+# Authenticated users by email, so a request does not cost a users lookup.
+# users_router invalidates on update/delete; the TTL bounds staleness from other writers.
+_user_cache = TTLCache(maxsize=1024, ttl=30.0)
+
+# Verified token payloads by sha256 of the token, each kept until the token's exp,
+# so a token is signature-checked once per process rather than once per request
+_token_cache = TTLCache(maxsize=4096, ttl=0.0)
+
 
 def verify_password(plain: str, hashed: str) -> bool:
     """Verify password using bcrypt directly for Python 3.13 compatibility."""
@@ -38,10 +49,23 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 
 def decode_token(token: str) -> Optional[dict]:
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    payload = _token_cache.get(key)
+    if payload is not None:
+        return payload
     try:
-        return jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
     except JWTError:
         return None
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)) and exp > time.time():
+        _token_cache.set(key, payload, ttl=exp - time.time())
+    return payload
+
+
+def revoke_tokens(email: str) -> int:
+    """Forget cached verifications of a user's tokens (delete / role change). Returns entries dropped."""
+    return _token_cache.pop_where(lambda payload: payload.get("sub") == email)
 
 
 def get_user_by_email(db: Database, email: str) -> Optional[UserView]:
@@ -49,6 +73,33 @@ def get_user_by_email(db: Database, email: str) -> Optional[UserView]:
     return user_from_doc(d) if d else None
 
 
+def get_user_from_token(db: Database, token: Optional[str]) -> Optional[UserView]:
+    """Resolve a raw JWT to its user. Returns None if missing/invalid."""
+    if not token:
+        return None
+    payload = decode_token(token)
+    if not payload:
+        return None
+    sub = payload.get("sub")
+    if not sub:
+        return None
+    user = _user_cache.get(sub)
+    if user is None:
+        user = get_user_by_email(db, sub)
+        if user:
+            _user_cache.set(sub, user)
+    return user
+
+
+def invalidate_user(email: str) -> None:
+    """Drop a cached user after it is updated or deleted."""
+    _user_cache.pop(email)
+
+
+def user_cache_stats() -> dict[str, Any]:
+    return {"users": _user_cache.stats(), "tokens": _token_cache.stats()}
+
+
 def get_current_user(
     creds: Optional[HTTPAuthorizationCredentials] = Depends(http_bearer),
     db: Database = Depends(get_db),
@@ -56,14 +107,7 @@ def get_current_user(
     """Resolve JWT and return current user. Returns None if no/invalid token."""
     if not creds or not creds.credentials:
         return None
-    payload = decode_token(creds.credentials)
-    if not payload:
-        return None
-    sub = payload.get("sub")
-    if not sub:
-        return None
-    d = db[USERS].find_one({"email": sub})
-    return user_from_doc(d) if d else None
+    return get_user_from_token(db, creds.credentials)
 
 
 def require_auth(current_user: Optional[UserView] = Depends(get_current_user)) -> UserView:
@@ -38,6 +38,29 @@ class Settings(BaseSettings):
     MS_FORMS_CLIENT_ID: str = ""
     MS_FORMS_CLIENT_SECRET: str = ""
 
+    # Interview queue: how long a panel's claim on a candidate lasts without renewal
+    INTERVIEW_CLAIM_LEASE_SECONDS: int = 600
+    # Batch interview submit: max decisions per request
+    INTERVIEW_BATCH_MAX_ITEMS: int = 500
+
+    # Background report jobs: concurrent builds, artifact directory and eviction
+    REPORT_JOB_WORKERS: int = 2
+    REPORT_ARTIFACT_DIR: str = str(Path(__file__).resolve().parent / "var" / "reports")
+    REPORT_ARTIFACT_MAX_AGE_HOURS: int = 24
+    REPORT_ARTIFACT_MAX_BYTES: int = 2 * 1024 ** 3
+    # A running job with no progress heartbeat for this long is treated as dead
+    REPORT_JOB_STALE_SECONDS: int = 300
+
+    # Report result cache: memory tier (whole files up to the item limit) and disk tier
+    REPORT_CACHE_MEMORY_BYTES: int = 64 * 1024 ** 2
+    REPORT_CACHE_MEMORY_ITEM_BYTES: int = 4 * 1024 ** 2
+    REPORT_CACHE_DIR: str = str(Path(__file__).resolve().parent / "var" / "report-cache")
+    REPORT_CACHE_DISK_BYTES: int = 1024 ** 3
+
+    # Audit partitions (one per month) kept in Mongo; older ones are archived to gzip NDJSON here
+    AUDIT_RETENTION_MONTHS: int = 12
+    AUDIT_ARCHIVE_DIR: str = str(Path(__file__).resolve().parent / "var" / "audit-archive")
+
     # App
     APP_ENV: str = "development"
     ALLOWED_ORIGINS: str = "http://localhost:5173,http://127.0.0.1:5173"
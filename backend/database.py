@@ -1,13 +1,15 @@
 """
 MongoDB connection and database access.
 """
-from typing import Generator
+from datetime import datetime
+from typing import Callable, Generator, Optional, TypeVar
 
 from pymongo import MongoClient
+from pymongo.client_session import ClientSession
 from pymongo.database import Database
 
 # Re-export for convenience
-__all__ = ["get_db", "USERS", "CANDIDATES", "INTERVIEWS", "RE_INTERVIEW_REQUESTS", "AUDIT_LOGS"]
+__all__ = ["get_db", "USERS", "CANDIDATES", "INTERVIEWS", "RE_INTERVIEW_REQUESTS", "AUDIT_LOGS", "COUNTERS", "SCHEMA_MIGRATIONS", "KPI_COUNTERS", "DAILY_ROLLUPS", "INTERVIEW_SUBMISSIONS", "DATA_VERSIONS", "REPORT_JOBS", "month_partition", "run_transaction"]
 
 from config import get_settings
 
@@ -20,6 +22,21 @@ CANDIDATES = "candidates"
 INTERVIEWS = "interviews"
 RE_INTERVIEW_REQUESTS = "re_interview_requests"
 AUDIT_LOGS = "audit_logs"
+COUNTERS = "counters"
+SCHEMA_MIGRATIONS = "schema_migrations"
+KPI_COUNTERS = "kpi_counters"
+DAILY_ROLLUPS = "daily_rollups"
+INTERVIEW_SUBMISSIONS = "interview_submissions"
+DATA_VERSIONS = "data_versions"
+REPORT_JOBS = "report_jobs"
+
+
+def month_partition(collection: str, dt: datetime) -> str:
+    """Month partition of a partitioned collection, e.g. audit_logs_202610."""
+    return f"{collection}_{dt.year:04d}{dt.month:02d}"
+
+
+T = TypeVar("T")
 
 
 def get_client() -> MongoClient:
@@ -44,3 +61,21 @@ def _get_db() -> Database:
 def get_db() -> Generator[Database, None, None]:
     """FastAPI dependency: yield db."""
     yield _get_db()
+
+
+def is_replicated() -> bool:
+    """Replica set or sharded cluster (Atlas is one): transactions and change streams available."""
+    topology = get_client().topology_description.topology_type_name
+    return topology in ("ReplicaSetWithPrimary", "Sharded", "LoadBalanced")
+
+
+def run_transaction(callback: Callable[[Optional[ClientSession]], T]) -> T:
+    """
+    Run callback(session) inside a transaction and return its result.
+    On a standalone server the callback runs with session=None (no atomicity).
+    The callback may be retried on transient errors, so keep it side-effect free outside the DB.
+    """
+    if not is_replicated():
+        return callback(None)
+    with get_client().start_session() as session:
+        return session.with_transaction(callback)
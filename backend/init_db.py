@@ -8,29 +8,54 @@ import sys
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from database import get_client, USERS, CANDIDATES, INTERVIEWS, RE_INTERVIEW_REQUESTS, AUDIT_LOGS
+from database import get_client, USERS
 from config import get_settings
 from models.user import user_doc
 from auth.jwt import hash_password
+from utils.candidate_id import seed_candidate_id_counters
+from services.search_service import rebuild_search_index
+from services.kpi_service import reconcile_kpis
+from services.rollup_service import rebuild_rollups
+from services.interview_snapshot_service import backfill_interview_snapshots
+from services.audit_store import migrate_legacy_audit_logs, archive_expired_partitions
+from migrations import apply_migrations, verify_query_plans
 
 
 def main():
     settings = get_settings()
     db = get_client()[settings.MONGODB_DB]
 
-    # Create indexes
-    db[USERS].create_index("email", unique=True)
-    db[CANDIDATES].create_index("candidate_id", unique=True)
-    db[CANDIDATES].create_index("ms_form_response_id", unique=True, sparse=True)
-    db[CANDIDATES].create_index("status")
-    db[CANDIDATES].create_index("created_at")
-    db[INTERVIEWS].create_index("candidate_oid")
-    db[INTERVIEWS].create_index("interview_date")
-    db[INTERVIEWS].create_index("decision")
-    db[RE_INTERVIEW_REQUESTS].create_index("candidate_oid")
-    db[RE_INTERVIEW_REQUESTS].create_index("status")
-    db[AUDIT_LOGS].create_index("user_id")
-    db[AUDIT_LOGS].create_index("created_at")
+    # Create / upgrade indexes, then fail loudly if a canonical query is not index-served
+    applied = apply_migrations(db)
+    print(f"Applied index migration(s): {applied or 'none pending'}")
+    verify_query_plans(db)
+    print("Verified canonical query plans.")
+
+    # Seed candidate ID counters from existing IDs (idempotent)
+    seeded = seed_candidate_id_counters(db)
+    print(f"Seeded {seeded} candidate ID counter(s).")
+
+    # Backfill search tokens / name keys for candidates created before the search index
+    indexed = rebuild_search_index(db)
+    print(f"Updated search tokens for {indexed} candidate(s).")
+
+    # Rebuild dashboard KPI counters from candidates (repairs any drift)
+    result = reconcile_kpis(db)
+    print(f"Reconciled KPI counters ({len(result['drift'])} field(s) drifted).")
+
+    # Rebuild daily throughput rollups from raw candidates / interviews
+    buckets = rebuild_rollups(db)
+    print(f"Rebuilt {buckets} daily rollup bucket(s).")
+
+    # Denormalized candidate/interviewer snapshots on older interviews
+    backfilled = backfill_interview_snapshots(db)
+    print(f"Backfilled snapshots on {backfilled} interview(s).")
+
+    # Move pre-partitioning audit entries into month partitions, then apply retention
+    moved = migrate_legacy_audit_logs(db)
+    print(f"Moved {moved} audit entr(ies) into month partitions.")
+    archived = archive_expired_partitions(db)
+    print(f"Archived {len(archived)} audit partition(s) past retention.")
 
     # Seed admin user
     existing = db[USERS].find_one({"email": "admin@tpeml.com"})
@@ -46,7 +71,6 @@ def main():
     )
     db[USERS].insert_one(doc)
     print("Created admin user: admin@tpeml.com / Admin@123")
-    print("Created indexes on all collections.")
 
 
 if __name__ == "__main__":
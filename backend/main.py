@@ -8,7 +8,9 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
 from config import get_settings
-from routers import auth_router, candidates_router, interview_router, reports_router, re_interview_router, qr_router, dashboard_router, users_router, public_router
+from services import report_jobs
+from services.live_feed import live_feed
+from routers import audit_logs_router, auth_router, candidates_router, interview_router, reports_router, report_jobs_router, re_interview_router, qr_router, dashboard_router, users_router, public_router
 
 settings = get_settings()
 
@@ -43,11 +45,19 @@ app.include_router(users_router.router)
 app.include_router(candidates_router.router)
 app.include_router(interview_router.router)
 app.include_router(reports_router.router)
+app.include_router(audit_logs_router.router)
+app.include_router(report_jobs_router.router)
 app.include_router(re_interview_router.router)
 app.include_router(qr_router.router)
 app.include_router(dashboard_router.router)
 
 
+@app.on_event("shutdown")
+def shutdown():
+    live_feed.stop()
+    report_jobs.shutdown()
+
+
 @app.get("/health")
 def health():
     return {"status": "ok"}
@@ -0,0 +1,18 @@
+"""
+Index migrations and query-plan verification.
+Run at deploy: python init_db.py (or python -m migrations).
+"""
+from migrations.indexes import MIGRATIONS, PARTITION_INDEXES, apply_migrations, apply_partition_indexes, applied_version, ensure_partition_indexes
+from migrations.query_plans import CANONICAL_QUERIES, QueryPlanError, verify_query_plans
+
+__all__ = [
+    "MIGRATIONS",
+    "PARTITION_INDEXES",
+    "apply_migrations",
+    "apply_partition_indexes",
+    "applied_version",
+    "ensure_partition_indexes",
+    "CANONICAL_QUERIES",
+    "QueryPlanError",
+    "verify_query_plans",
+]
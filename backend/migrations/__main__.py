@@ -0,0 +1,30 @@
+"""
+Apply pending index migrations, then verify canonical query plans.
+Run from backend dir: python -m migrations [--verify-only]
+Exits non-zero if any canonical query falls back to COLLSCAN or in-memory SORT.
+"""
+import sys
+
+from config import get_settings
+from database import get_client
+from migrations import apply_migrations, verify_query_plans, QueryPlanError
+
+
+def main(argv: list[str]) -> int:
+    db = get_client()[get_settings().MONGODB_DB]
+    if "--verify-only" not in argv:
+        applied = apply_migrations(db)
+        print(f"Applied index migration(s): {applied or 'none pending'}")
+    try:
+        report = verify_query_plans(db)
+    except QueryPlanError as e:
+        print(f"❌ {e}")
+        return 1
+    for row in report:
+        print(f"  ok  {row['collection']:<22} {row['name']}: {' <- '.join(row['stages'])}")
+    print(f"✅ {len(report)} canonical queries use indexes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,248 @@
+"""
+Versioned index declarations, applied in order at deploy.
+Each version lists, per collection, the indexes it adds. create_index is
+idempotent, so a version interrupted half-way is simply re-applied.
+Add new indexes as a new version; never edit an applied one. A version may
+name a `prepare(db)` step that makes existing data satisfy a new unique index.
+
+Month-partitioned collections (<name>_YYYYMM, see database.month_partition)
+declare their indexes once in PARTITION_INDEXES instead: apply_migrations
+ensures them on every existing partition and on the current month's, and
+services/audit_store on each new partition at first write.
+"""
+from datetime import datetime
+from typing import Any
+
+from pymongo import ASCENDING, DESCENDING
+from pymongo.database import Database
+
+from database import (
+    USERS,
+    CANDIDATES,
+    INTERVIEWS,
+    RE_INTERVIEW_REQUESTS,
+    AUDIT_LOGS,
+    DAILY_ROLLUPS,
+    INTERVIEW_SUBMISSIONS,
+    REPORT_JOBS,
+    SCHEMA_MIGRATIONS,
+    month_partition,
+)
+
+
+def _ix(keys, **options) -> dict[str, Any]:
+    """Index spec: keys as a field name or [(field, direction)], plus create_index options."""
+    if isinstance(keys, str):
+        keys = [(keys, ASCENDING)]
+    return {"keys": keys, "options": options}
+
+
+def _drop_extra_queue_claims(db: Database) -> None:
+    """Keep only each panel's most recent claim per location, so v10's unique index can build."""
+    dupes = db[CANDIDATES].aggregate([
+        {"$match": {"status": "yet_to_interview", "claimed_by": {"$type": "objectId"}}},
+        {"$sort": {"claimed_at": -1}},
+        {"$group": {"_id": {"by": "$claimed_by", "loc": "$interview_location"}, "ids": {"$push": "$_id"}}},
+        {"$match": {"ids.1": {"$exists": True}}},
+    ])
+    for g in dupes:
+        db[CANDIDATES].update_many(
+            {"_id": {"$in": g["ids"][1:]}},
+            {"$set": {"claimed_by": None, "claimed_by_name": None, "claimed_at": None, "claim_expires_at": None}},
+        )
+
+
+MIGRATIONS: list[dict[str, Any]] = [
+    {
+        "version": 1,
+        "description": "Baseline single-field indexes",
+        "indexes": {
+            USERS: [_ix("email", unique=True)],
+            CANDIDATES: [
+                _ix("candidate_id", unique=True),
+                _ix("ms_form_response_id", unique=True, sparse=True),
+                _ix("status"),
+                _ix("created_at"),
+            ],
+            INTERVIEWS: [
+                _ix("candidate_oid"),
+                _ix("interview_date"),
+                _ix("decision"),
+            ],
+            RE_INTERVIEW_REQUESTS: [
+                _ix("candidate_oid"),
+                _ix("status"),
+            ],
+            AUDIT_LOGS: [
+                _ix("user_id"),
+                _ix("created_at"),
+            ],
+        },
+    },
+    {
+        "version": 2,
+        "description": "Search tokens and keyset pagination for candidates",
+        "indexes": {
+            CANDIDATES: [
+                _ix("search_grams"),
+                _ix("name_keys"),
+                _ix([("created_at", DESCENDING), ("_id", DESCENDING)]),
+                _ix([("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            ],
+        },
+    },
+    {
+        "version": 3,
+        "description": "Compound indexes for interview, re-interview and audit query shapes",
+        "indexes": {
+            INTERVIEWS: [
+                _ix([("interview_date", DESCENDING), ("_id", DESCENDING)]),
+                _ix([("decision", ASCENDING), ("interview_date", DESCENDING)]),
+                _ix([("candidate_oid", ASCENDING), ("interview_date", DESCENDING)]),
+            ],
+            RE_INTERVIEW_REQUESTS: [
+                _ix([("status", ASCENDING), ("created_at", DESCENDING)]),
+            ],
+            AUDIT_LOGS: [
+                _ix([("created_at", DESCENDING), ("_id", DESCENDING)]),
+            ],
+        },
+    },
+    {
+        "version": 4,
+        "description": "Daily throughput rollups by day range",
+        "indexes": {
+            DAILY_ROLLUPS: [
+                _ix([("day", ASCENDING), ("location", ASCENDING), ("branch", ASCENDING)]),
+            ],
+        },
+    },
+    {
+        "version": 5,
+        "description": "Completed-interview reads from denormalized snapshots",
+        "indexes": {
+            INTERVIEWS: [
+                _ix([("candidate_status", ASCENDING), ("interview_date", DESCENDING), ("_id", DESCENDING)]),
+                _ix([("candidate_status", ASCENDING), ("decision", ASCENDING), ("interview_date", DESCENDING), ("_id", DESCENDING)]),
+                _ix("interviewer_id"),
+            ],
+        },
+    },
+    {
+        "version": 6,
+        "description": "At most one interview per candidate per round",
+        "indexes": {
+            INTERVIEWS: [
+                _ix(
+                    [("candidate_oid", ASCENDING), ("interview_round", ASCENDING)],
+                    unique=True,
+                    partialFilterExpression={"interview_round": {"$type": "number"}},
+                ),
+            ],
+        },
+    },
+    {
+        "version": 7,
+        "description": "Interview queue claims by location, oldest first",
+        "indexes": {
+            CANDIDATES: [
+                _ix([("status", ASCENDING), ("interview_location", ASCENDING), ("created_at", ASCENDING)]),
+            ],
+        },
+    },
+    {
+        "version": 8,
+        "description": "Expire batch-submit idempotency keys after a week",
+        "indexes": {
+            INTERVIEW_SUBMISSIONS: [
+                _ix("created_at", expireAfterSeconds=7 * 24 * 3600),
+            ],
+        },
+    },
+    {
+        "version": 9,
+        "description": "Background report jobs: dedupe, per-user listing, artifact eviction",
+        "indexes": {
+            REPORT_JOBS: [
+                _ix("active_key", unique=True, sparse=True),
+                _ix([("requested_by", ASCENDING), ("created_at", DESCENDING)]),
+                _ix([("status", ASCENDING), ("finished_at", ASCENDING)]),
+            ],
+        },
+    },
+    {
+        "version": 10,
+        "description": "At most one queue claim per panel per location",
+        "prepare": _drop_extra_queue_claims,
+        "indexes": {
+            CANDIDATES: [
+                _ix(
+                    [("claimed_by", ASCENDING), ("interview_location", ASCENDING)],
+                    unique=True,
+                    partialFilterExpression={"status": "yet_to_interview", "claimed_by": {"$type": "objectId"}},
+                ),
+            ],
+        },
+    },
+]
+
+
+# Every partition serves the audit query API's filters in (created_at, _id) order
+PARTITION_INDEXES: dict[str, list[dict[str, Any]]] = {
+    AUDIT_LOGS: [
+        _ix([("created_at", DESCENDING), ("_id", DESCENDING)]),
+        _ix([("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        _ix([("action", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        _ix([("resource_type", ASCENDING), ("resource_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+    ],
+}
+
+
+def ensure_partition_indexes(db: Database, collection: str, partition: str) -> None:
+    """Create a partition's declared indexes (idempotent; creates the partition if missing)."""
+    for spec in PARTITION_INDEXES[collection]:
+        db[partition].create_index(spec["keys"], **spec["options"])
+
+
+def apply_partition_indexes(db: Database, now: datetime | None = None) -> list[str]:
+    """Ensure partition indexes on every existing partition and the current month's. Returns partitions touched."""
+    now = now or datetime.utcnow()
+    touched = []
+    for collection in PARTITION_INDEXES:
+        names = set(db.list_collection_names(filter={"name": {"$regex": f"^{collection}_[0-9]{{6}}$"}}))
+        names.add(month_partition(collection, now))
+        for name in sorted(names):
+            ensure_partition_indexes(db, collection, name)
+            touched.append(name)
+    return touched
+
+
+def applied_version(db: Database) -> int:
+    d = db[SCHEMA_MIGRATIONS].find_one(sort=[("version", DESCENDING)])
+    return d["version"] if d else 0
+
+
+def apply_migrations(db: Database) -> list[int]:
+    """Apply every version newer than the recorded one. Returns the versions applied."""
+    current = applied_version(db)
+    applied = []
+    for m in sorted(MIGRATIONS, key=lambda m: m["version"]):
+        if m["version"] <= current:
+            continue
+        if m.get("prepare"):
+            m["prepare"](db)
+        for collection, specs in m["indexes"].items():
+            for spec in specs:
+                db[collection].create_index(spec["keys"], **spec["options"])
+        db[SCHEMA_MIGRATIONS].update_one(
+            {"version": m["version"]},
+            {"$setOnInsert": {
+                "version": m["version"],
+                "description": m["description"],
+                "applied_at": datetime.utcnow(),
+            }},
+            upsert=True,
+        )
+        applied.append(m["version"])
+    apply_partition_indexes(db)
+    return applied
@@ -0,0 +1,231 @@
+"""
+Registry of the app's canonical query shapes, checked with explain().
+verify_query_plans fails when any winning plan contains a COLLSCAN or a
+blocking in-memory SORT, i.e. the declared indexes no longer serve it.
+Register new shapes here when adding a query path or index. Shapes marked
+"partitioned" run against the current month's partition of the collection
+(apply_migrations makes sure it exists with its indexes).
+"""
+from datetime import datetime, timedelta
+from typing import Any, Iterator
+
+from bson import ObjectId
+from pymongo.database import Database
+
+from database import (
+    USERS,
+    CANDIDATES,
+    INTERVIEWS,
+    RE_INTERVIEW_REQUESTS,
+    AUDIT_LOGS,
+    DAILY_ROLLUPS,
+    REPORT_JOBS,
+    month_partition,
+)
+
+BAD_STAGES = ("COLLSCAN", "SORT")
+
+_SINCE = datetime(2000, 1, 1)
+_UNTIL = _SINCE + timedelta(days=1)
+
+CANONICAL_QUERIES: list[dict[str, Any]] = [
+    {
+        "name": "login / current user by email",
+        "collection": USERS,
+        "filter": {"email": "probe@example.com"},
+    },
+    {
+        "name": "candidate by Candidate ID",
+        "collection": CANDIDATES,
+        "filter": {"candidate_id": "TPEML-2000-GEN-00001"},
+    },
+    {
+        "name": "list candidates newest first",
+        "collection": CANDIDATES,
+        "filter": {},
+        "sort": [("created_at", -1), ("_id", -1)],
+    },
+    {
+        "name": "list candidates by status newest first",
+        "collection": CANDIDATES,
+        "filter": {"status": "yet_to_interview"},
+        "sort": [("created_at", -1), ("_id", -1)],
+    },
+    {
+        "name": "yet-to-interview filtered by role",
+        "collection": CANDIDATES,
+        "filter": {"status": "yet_to_interview", "role_applied": {"$regex": "eng", "$options": "i"}},
+        "sort": [("created_at", -1)],
+    },
+    {
+        "name": "completed candidates filtered by role",
+        "collection": CANDIDATES,
+        "filter": {"status": "interview_completed", "role_applied": {"$regex": "eng", "$options": "i"}},
+    },
+    {
+        "name": "interview queue claim next",
+        "collection": CANDIDATES,
+        "filter": {
+            "status": "yet_to_interview",
+            "interview_location": "Pune",
+            "$or": [{"claim_expires_at": None}, {"claim_expires_at": {"$lte": _SINCE}}],
+        },
+        "sort": [("created_at", 1)],
+    },
+    {
+        "name": "candidate search tokens",
+        "collection": CANDIDATES,
+        "filter": {"search_grams": {"$all": ["t:abc", "t:bcd"]}},
+    },
+    {
+        "name": "candidate id prefix",
+        "collection": CANDIDATES,
+        "filter": {"candidate_id": {"$regex": "^TPEML-2026"}},
+        "sort": [("candidate_id", 1)],
+    },
+    {
+        "name": "fuzzy name block",
+        "collection": CANDIDATES,
+        "filter": {"name_keys": {"$in": ["md", "md|amrn"]}},
+    },
+    {
+        "name": "completed interviews by date range",
+        "collection": INTERVIEWS,
+        "filter": {"interview_date": {"$gte": _SINCE, "$lte": _UNTIL}},
+        "sort": [("interview_date", -1)],
+    },
+    {
+        "name": "completed interviews by date range and decision",
+        "collection": INTERVIEWS,
+        "filter": {"interview_date": {"$gte": _SINCE, "$lte": _UNTIL}, "decision": "shortlist"},
+        "sort": [("interview_date", -1)],
+    },
+    {
+        "name": "completed interview list page",
+        "collection": INTERVIEWS,
+        "filter": {"candidate_status": "interview_completed"},
+        "sort": [("interview_date", -1), ("_id", -1)],
+    },
+    {
+        "name": "completed interview list by decision",
+        "collection": INTERVIEWS,
+        "filter": {"candidate_status": "interview_completed", "decision": "shortlist"},
+        "sort": [("interview_date", -1), ("_id", -1)],
+    },
+    {
+        "name": "interviewer name propagation",
+        "collection": INTERVIEWS,
+        "filter": {"interviewer_id": ObjectId("000000000000000000000000")},
+    },
+    {
+        "name": "latest interview for a candidate",
+        "collection": INTERVIEWS,
+        "filter": {"candidate_oid": ObjectId("000000000000000000000000")},
+        "sort": [("interview_date", -1)],
+    },
+    {
+        "name": "pending re-interview requests",
+        "collection": RE_INTERVIEW_REQUESTS,
+        "filter": {"status": "pending"},
+    },
+    {
+        "name": "audit logs by date range",
+        "collection": AUDIT_LOGS,
+        "partitioned": True,
+        "filter": {"created_at": {"$gte": _SINCE, "$lte": _UNTIL}},
+        "sort": [("created_at", -1), ("_id", -1)],
+    },
+    {
+        "name": "audit logs by user",
+        "collection": AUDIT_LOGS,
+        "partitioned": True,
+        "filter": {"user_id": ObjectId("000000000000000000000000"), "created_at": {"$gte": _SINCE, "$lte": _UNTIL}},
+        "sort": [("created_at", -1), ("_id", -1)],
+    },
+    {
+        "name": "audit logs by action",
+        "collection": AUDIT_LOGS,
+        "partitioned": True,
+        "filter": {"action": "interview_submit"},
+        "sort": [("created_at", -1), ("_id", -1)],
+    },
+    {
+        "name": "audit logs for a resource",
+        "collection": AUDIT_LOGS,
+        "partitioned": True,
+        "filter": {"resource_type": "interview", "resource_id": "000000000000000000000000"},
+        "sort": [("created_at", -1), ("_id", -1)],
+    },
+    {
+        "name": "dashboard timeseries day range",
+        "collection": DAILY_ROLLUPS,
+        "filter": {"day": {"$gte": "2000-01-01", "$lte": "2000-01-31"}},
+    },
+    {
+        "name": "report job by dedupe key",
+        "collection": REPORT_JOBS,
+        "filter": {"active_key": "0" * 64},
+    },
+    {
+        "name": "report jobs for a user",
+        "collection": REPORT_JOBS,
+        "filter": {"requested_by": ObjectId("000000000000000000000000")},
+        "sort": [("created_at", -1)],
+    },
+    {
+        "name": "report artifacts to evict",
+        "collection": REPORT_JOBS,
+        "filter": {"status": "done", "finished_at": {"$lt": _SINCE}},
+    },
+]
+
+
+class QueryPlanError(RuntimeError):
+    """One or more canonical queries are not served by an index."""
+
+
+def _stages(plan: dict) -> Iterator[str]:
+    if not plan:
+        return
+    if "stage" in plan:
+        yield plan["stage"]
+    # Slot-based engine nests the classic plan under queryPlan
+    for key in ("queryPlan", "inputStage"):
+        if key in plan:
+            yield from _stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from _stages(child)
+
+
+def _target(q: dict[str, Any]) -> str:
+    """Collection a registered query runs against."""
+    if q.get("partitioned"):
+        return month_partition(q["collection"], datetime.utcnow())
+    return q["collection"]
+
+
+def explain_query(db: Database, q: dict[str, Any]) -> list[str]:
+    """Stage names of the winning plan for a registered query."""
+    cursor = db[_target(q)].find(q["filter"])
+    if q.get("sort"):
+        cursor = cursor.sort(q["sort"])
+    plan = cursor.limit(50).explain()
+    return list(_stages(plan.get("queryPlanner", {}).get("winningPlan", {})))
+
+
+def verify_query_plans(db: Database, queries: list[dict[str, Any]] | None = None) -> list[dict[str, Any]]:
+    """
+    Explain every canonical query. Returns one report row per query and raises
+    QueryPlanError if any winning plan uses COLLSCAN or an in-memory SORT.
+    """
+    report = []
+    failures = []
+    for q in queries or CANONICAL_QUERIES:
+        stages = explain_query(db, q)
+        bad = [s for s in stages if s in BAD_STAGES]
+        report.append({"name": q["name"], "collection": _target(q), "stages": stages, "ok": not bad})
+        if bad:
+            failures.append(f"{q['name']} ({_target(q)}): {' <- '.join(stages)}")
+    if failures:
+        raise QueryPlanError("Queries not served by an index:\n  " + "\n  ".join(failures))
+    return report
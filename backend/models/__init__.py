@@ -2,7 +2,7 @@
 MongoDB document schemas and helpers for TPEML Recruitment Portal.
 No SQLAlchemy; use db[collection] for access.
 """
-from database import USERS, CANDIDATES, INTERVIEWS, RE_INTERVIEW_REQUESTS, AUDIT_LOGS
+from database import USERS, CANDIDATES, INTERVIEWS, RE_INTERVIEW_REQUESTS, AUDIT_LOGS, COUNTERS, SCHEMA_MIGRATIONS, KPI_COUNTERS, DAILY_ROLLUPS, INTERVIEW_SUBMISSIONS, DATA_VERSIONS, REPORT_JOBS
 
 __all__ = [
     "USERS",
@@ -10,4 +10,11 @@ __all__ = [
     "INTERVIEWS",
     "RE_INTERVIEW_REQUESTS",
     "AUDIT_LOGS",
+    "COUNTERS",
+    "SCHEMA_MIGRATIONS",
+    "KPI_COUNTERS",
+    "DAILY_ROLLUPS",
+    "INTERVIEW_SUBMISSIONS",
+    "DATA_VERSIONS",
+    "REPORT_JOBS",
 ]
@@ -1,6 +1,6 @@
 """
 Audit log – all material actions logged for Admin audit.
-MongoDB collection: audit_logs.
+MongoDB collections: audit_logs_YYYYMM (one per month, see services/audit_store).
 """
 from datetime import datetime
 from typing import Any
@@ -24,3 +24,15 @@ def audit_log_doc(
         "details": details,
         "created_at": datetime.utcnow(),
     }
+
+
+def doc_to_audit_log(d: dict) -> dict[str, Any]:
+    return {
+        "id": str(d["_id"]),
+        "user_id": str(d["user_id"]) if d.get("user_id") else None,
+        "action": d.get("action"),
+        "resource_type": d.get("resource_type"),
+        "resource_id": d.get("resource_id"),
+        "details": d.get("details"),
+        "created_at": d["created_at"].isoformat() if d.get("created_at") else None,
+    }
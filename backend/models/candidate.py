@@ -157,6 +157,40 @@ def doc_to_candidate_profile(d: dict) -> dict[str, Any]:
     }
 
 
+# Columns shown by list/search tables (view=summary)
+CANDIDATE_SUMMARY_FIELDS = (
+    "candidate_id",
+    "name",
+    "email",
+    "contact_no",
+    "interview_location",
+    "date_of_interview",
+    "diploma_branch",
+    "status",
+    "decision",
+    "created_at",
+)
+
+
+def candidate_projection(fields: tuple[str, ...] | list[str]) -> dict[str, int]:
+    """Mongo projection for a sparse fieldset (_id is always returned)."""
+    return {f: 1 for f in fields if f != "id"}
+
+
+def doc_to_candidate_summary(d: dict, fields: tuple[str, ...] | list[str] = CANDIDATE_SUMMARY_FIELDS) -> dict[str, Any]:
+    """Lean serializer: id plus the requested fields only."""
+    oid = d.get("_id")
+    out: dict[str, Any] = {"id": str(oid) if oid else None}
+    for f in fields:
+        if f == "id":
+            continue
+        v = d.get(f)
+        if f == "created_at" and v is not None and not isinstance(v, str):
+            v = v.isoformat() if hasattr(v, "isoformat") else str(v)
+        out[f] = v
+    return out
+
+
 class CandidateProfile(BaseModel):
     """Pydantic model for API responses."""
     id: Optional[str] = None
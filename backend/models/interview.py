@@ -2,6 +2,8 @@
 Interview document – one record per interview session.
 MongoDB collection: interviews.
 Decision: shortlist | reject | hold.
+Carries a snapshot of candidate_name / role_applied / interviewer_name and the
+candidate's current status, so result reads never join back to candidates or users.
 """
 from datetime import datetime
 from typing import Any
@@ -16,12 +18,24 @@ def interview_doc(
     decision: str,
     *,
     notes: str | None = None,
+    candidate_name: str | None = None,
+    role_applied: str | None = None,
+    interviewer_name: str | None = None,
+    candidate_status: str = "interview_completed",
+    interview_round: int | None = None,
 ) -> dict[str, Any]:
     now = datetime.utcnow()
     return {
         "candidate_id": candidate_id,
         "candidate_oid": candidate_oid,
         "interviewer_id": interviewer_oid,
+        # Denormalized snapshot (kept current by services/interview_snapshot_service)
+        "candidate_name": candidate_name,
+        "role_applied": role_applied,
+        "interviewer_name": interviewer_name,
+        "candidate_status": candidate_status,
+        # 1 for the first interview, +1 per approved re-interview; unique per candidate
+        "interview_round": interview_round,
         "interview_date": now,
         "notes": notes,
         "decision": decision,
@@ -30,6 +44,19 @@ def interview_doc(
     }
 
 
+# Fields doc_to_interview_result reads (including the snapshot)
+INTERVIEW_RESULT_PROJECTION = {
+    "candidate_id": 1,
+    "candidate_name": 1,
+    "role_applied": 1,
+    "interviewer_name": 1,
+    "interview_date": 1,
+    "decision": 1,
+    "notes": 1,
+    "created_at": 1,
+}
+
+
 def doc_to_interview_result(d: dict, candidate_name: str, interviewer_name: str, role_applied: str | None) -> dict[str, Any]:
     oid = d.get("_id")
     idt = d.get("interview_date")
@@ -0,0 +1,66 @@
+"""
+Report job – a report export built in the background and stored on disk.
+MongoDB collection: report_jobs.
+Status: queued | running | done | failed | expired.
+"""
+from datetime import datetime
+from typing import Any
+
+from bson import ObjectId
+
+
+def report_job_doc(
+    report: str,
+    params: dict[str, str],
+    fmt: str,
+    gzip: bool,
+    user_oid: ObjectId,
+    dedupe_key: str,
+    data_versions: dict[str, int],
+) -> dict[str, Any]:
+    now = datetime.utcnow()
+    return {
+        "report": report,
+        "params": params,
+        "format": fmt,
+        "gzip": gzip,
+        # Everyone whose request collapsed onto this job
+        "requested_by": [user_oid],
+        "dedupe_key": dedupe_key,
+        # Set while the job can still serve identical requests (unique); removed on failure / expiry
+        "active_key": dedupe_key,
+        "data_versions": data_versions,
+        "status": "queued",
+        "rows_written": 0,
+        "bytes_written": 0,
+        "artifact_path": None,
+        "filename": None,
+        "media_type": None,
+        "error": None,
+        "created_at": now,
+        "started_at": None,
+        "finished_at": None,
+        # Refreshed while running, and while queued by the process holding the job
+        "heartbeat_at": now,
+    }
+
+
+def doc_to_report_job(d: dict) -> dict[str, Any]:
+    def iso(v):
+        return v.isoformat() if v else None
+
+    return {
+        "id": str(d["_id"]),
+        "report": d.get("report"),
+        "params": d.get("params") or {},
+        "format": d.get("format"),
+        "gzip": d.get("gzip", False),
+        "status": d.get("status"),
+        "rows_written": d.get("rows_written", 0),
+        "bytes_written": d.get("bytes_written", 0),
+        "filename": d.get("filename"),
+        "error": d.get("error"),
+        "created_at": iso(d.get("created_at")),
+        "started_at": iso(d.get("started_at")),
+        "finished_at": iso(d.get("finished_at")),
+    }
@@ -1,11 +1,12 @@
-"""Audit helper: log actions to audit_logs (MongoDB)."""
+"""Audit helper: log actions to the audit log (month partitions, see services/audit_store)."""
 from typing import Any, Optional
 
 from bson import ObjectId
+from pymongo.client_session import ClientSession
 from pymongo.database import Database
 
-from database import AUDIT_LOGS
 from models.audit_log import audit_log_doc
+from services import audit_store
 
 
 def log_action(
@@ -15,8 +16,12 @@ def log_action(
     resource_type: Optional[str] = None,
     resource_id: Optional[str] = None,
     details: Optional[dict[str, Any]] = None,
+    session: Optional[ClientSession] = None,
 ) -> None:
-    """Append an audit log entry."""
+    """
+    Append an audit log entry before returning. Pass the surrounding
+    transaction's `session` so the entry commits (or rolls back) with the change.
+    """
     entry = audit_log_doc(
         action,
         user_oid=user_oid,
@@ -24,4 +29,21 @@ def log_action(
         resource_id=resource_id,
         details=details,
     )
-    db[AUDIT_LOGS].insert_one(entry)
+    audit_store.insert_entries(db, [entry], session=session)
+
+
+def log_actions(
+    db: Database,
+    user_oid: Optional[ObjectId],
+    action: str,
+    resource_type: Optional[str],
+    records: list[tuple[Optional[str], Optional[dict[str, Any]]]],
+    session: Optional[ClientSession] = None,
+) -> None:
+    """One entry per (resource_id, details) record, written with a single insert_many per month partition."""
+    entries = [
+        audit_log_doc(action, user_oid=user_oid, resource_type=resource_type, resource_id=rid, details=details)
+        for rid, details in records
+    ]
+    if entries:
+        audit_store.insert_entries(db, entries, session=session)
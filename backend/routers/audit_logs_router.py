@@ -0,0 +1,71 @@
+"""
+Admin audit log browser: cursor-paginated queries over the month partitions,
+partition sizes, and on-demand archiving of partitions past retention.
+"""
+from datetime import date, datetime, time
+from typing import Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pymongo.database import Database
+
+from database import get_db
+from auth.jwt import require_roles
+from models.audit_log import doc_to_audit_log
+from models.user import UserView
+from services import audit_store
+
+router = APIRouter(prefix="/api/audit", tags=["audit"])
+
+
+@router.get("", response_model=dict)
+def list_audit_logs(
+    user_id: Optional[str] = Query(None),
+    action: Optional[str] = Query(None),
+    resource_type: Optional[str] = Query(None),
+    resource_id: Optional[str] = Query(None),
+    from_date: Optional[date] = Query(None, description="YYYY-MM-DD"),
+    to_date: Optional[date] = Query(None, description="YYYY-MM-DD, inclusive"),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from a previous page"),
+    db: Database = Depends(get_db),
+    user: UserView = Depends(require_roles(["admin"])),
+):
+    """Audit entries newest first. Only the month partitions in the date range are read. Admin only."""
+    user_oid = None
+    if user_id:
+        try:
+            user_oid = ObjectId(user_id)
+        except InvalidId:
+            raise HTTPException(status_code=400, detail="Invalid user_id")
+    rows, next_cursor = audit_store.query(
+        db,
+        limit=limit,
+        cursor=cursor,
+        user_id=user_oid,
+        action=action,
+        resource_type=resource_type,
+        resource_id=resource_id,
+        from_date=datetime.combine(from_date, time.min) if from_date else None,
+        to_date=datetime.combine(to_date, time.max) if to_date else None,
+    )
+    return {"items": [doc_to_audit_log(r) for r in rows], "next_cursor": next_cursor}
+
+
+@router.get("/partitions", response_model=dict)
+def audit_partitions(
+    db: Database = Depends(get_db),
+    user: UserView = Depends(require_roles(["admin"])),
+):
+    """Month partitions held in Mongo with approximate entry counts. Admin only."""
+    return {"partitions": audit_store.partition_stats(db)}
+
+
+@router.post("/archive", response_model=dict)
+def archive_audit_partitions(
+    db: Database = Depends(get_db),
+    user: UserView = Depends(require_roles(["admin"])),
+):
+    """Archive partitions older than AUDIT_RETENTION_MONTHS to disk and drop them. Admin only."""
+    return {"archived": audit_store.archive_expired_partitions(db)}
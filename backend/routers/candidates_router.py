@@ -1,44 +1,104 @@
 """
 Candidates API: search by ID / QR, get profile, list (filters).
 """
+import json
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
 from pymongo.database import Database
 
-from database import get_db, CANDIDATES
+from database import get_db, run_transaction, CANDIDATES
 from auth.jwt import require_auth, require_roles
 from models.user import UserView
-from models.candidate import candidate_doc, doc_to_candidate_profile, CandidateProfile
+from models.candidate import (
+    candidate_doc,
+    doc_to_candidate_profile,
+    doc_to_candidate_summary,
+    candidate_projection,
+    CandidateProfile,
+    CANDIDATE_SUMMARY_FIELDS,
+)
+from services import candidate_events
+from services.search_service import search_candidates, fuzzy_search_candidates, with_search_fields
+from utils.cache import TTLCache
+from utils.pagination import encode_cursor, keyset_filter
 
 router = APIRouter(prefix="/api/candidates", tags=["candidates"])
 
+# list_candidates total modes; cached totals are reused for 30s per filter
+TOTAL_MODES = ("exact", "cached", "estimate", "none")
+_count_cache = TTLCache(maxsize=256, ttl=30.0)
+
+
+def _resolve_fieldset(view: str, fields: Optional[str]) -> Optional[tuple[str, ...]]:
+    """Sparse fieldset from ?fields=a,b or ?view=summary; None means full profiles."""
+    if fields:
+        requested = tuple(f.strip() for f in fields.split(",") if f.strip())
+        unknown = [f for f in requested if f not in CandidateProfile.model_fields]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+        return requested
+    if view == "summary":
+        return CANDIDATE_SUMMARY_FIELDS
+    if view != "full":
+        raise HTTPException(status_code=400, detail="Invalid view. Must be one of: full, summary")
+    return None
+
+
+def _serializer(fieldset: Optional[tuple[str, ...]]):
+    """(Mongo projection, doc -> dict) for a fieldset."""
+    if fieldset is None:
+        return None, doc_to_candidate_profile
+    return candidate_projection(fieldset), lambda d: doc_to_candidate_summary(d, fieldset)
+
 
 @router.get("/search", response_model=dict)
 def search(
     q: Optional[str] = Query(None, description="Candidate ID or search term"),
+    mode: str = Query("default", description="default | fuzzy (misspelling-tolerant name match)"),
+    interview_location: Optional[str] = Query(None),
+    year_of_recruitment: Optional[str] = Query(None),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    view: str = Query("full", description="full | summary"),
+    fields: Optional[str] = Query(None, description="Comma-separated profile fields; overrides view"),
     db: Database = Depends(get_db),
     user: UserView = Depends(require_auth),
 ):
-    """Search by Candidate ID or partial match on name/email."""
+    """
+    Search by Candidate ID or partial match on name/email. Ranked: exact ID > prefix > substring.
+    `truncated` is true when more candidates matched than one search reads; total is then a lower bound.
+    """
     if not q or not q.strip():
         return {"candidates": [], "total": 0}
+    if mode not in ("default", "fuzzy"):
+        raise HTTPException(status_code=400, detail="Invalid mode. Must be one of: default, fuzzy")
+    projection, serialize = _serializer(_resolve_fieldset(view, fields))
     term = q.strip()
+    filters = {}
+    if interview_location:
+        filters["interview_location"] = interview_location
+    if year_of_recruitment:
+        filters["year_of_recruitment"] = year_of_recruitment
+
+    if mode == "fuzzy":
+        matches = fuzzy_search_candidates(db, term, limit=limit, extra_filter=filters or None, projection=projection)
+        out = []
+        for score, c in matches:
+            profile = serialize(c)
+            profile["score"] = score
+            out.append(profile)
+        return {"candidates": out, "total": len(out)}
+
     if term.upper().startswith("TPEML-"):
-        c = db[CANDIDATES].find_one({"candidate_id": term})
+        c = db[CANDIDATES].find_one({"candidate_id": term, **filters}, projection)
         if c:
-            return {"candidates": [doc_to_candidate_profile(c)], "total": 1}
-        return {"candidates": [], "total": 0}
-    rgx = {"$regex": term, "$options": "i"}
-    candidates = list(db[CANDIDATES].find({
-        "$or": [
-            {"name": rgx},
-            {"email": rgx},
-            {"candidate_id": rgx},
-        ]
-    }).limit(50))
-    return {"candidates": [doc_to_candidate_profile(c) for c in candidates], "total": len(candidates)}
+            return {"candidates": [serialize(c)], "total": 1}
+    candidates, total, truncated = search_candidates(
+        db, term, skip=skip, limit=limit, extra_filter=filters or None, projection=projection,
+    )
+    return {"candidates": [serialize(c) for c in candidates], "total": total, "truncated": truncated}
 
 
 @router.get("/id/{candidate_id}", response_model=CandidateProfile)
@@ -136,9 +196,14 @@ def create_candidate(
             onboarded_by=user.id,  # Store who created this candidate
             status="yet_to_interview",
         )
-        
-        r = db[CANDIDATES].insert_one(doc)
-        doc["_id"] = r.inserted_id
+        with_search_fields(doc)
+
+        def _insert(session):
+            r = db[CANDIDATES].insert_one(doc, session=session)
+            doc["_id"] = r.inserted_id
+            candidate_events.candidate_created(db, doc, session=session)
+
+        run_transaction(_insert)
         
         return CandidateProfile(**doc_to_candidate_profile(doc))
     except Exception as e:
@@ -154,16 +219,50 @@ def list_candidates(
     role: Optional[str] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from a previous page; replaces skip"),
+    total_mode: str = Query("exact", alias="total", description="exact | cached | estimate | none"),
+    view: str = Query("full", description="full | summary"),
+    fields: Optional[str] = Query(None, description="Comma-separated profile fields; overrides view"),
     db: Database = Depends(get_db),
     user: UserView = Depends(require_auth),
 ):
-    """List candidates with optional filters."""
+    """List candidates with optional filters. Newest first; keyset pagination via cursor."""
+    if total_mode not in TOTAL_MODES:
+        raise HTTPException(status_code=400, detail=f"Invalid total. Must be one of: {', '.join(TOTAL_MODES)}")
+    projection, serialize = _serializer(_resolve_fieldset(view, fields))
+    if projection is not None:
+        projection["created_at"] = 1  # cursor key
     q = {}
     if status_filter:
         q["status"] = status_filter
     if role:
         q["role_applied"] = {"$regex": role, "$options": "i"}
-    total = db[CANDIDATES].count_documents(q)
-    cursor = db[CANDIDATES].find(q).sort("created_at", -1).skip(skip).limit(limit)
-    candidates = [doc_to_candidate_profile(c) for c in cursor]
-    return {"candidates": candidates, "total": total}
+    total = _count_candidates(db, q, total_mode)
+
+    page_q = {**q, **keyset_filter("created_at", cursor)} if cursor else q
+    find = db[CANDIDATES].find(page_q, projection).sort([("created_at", -1), ("_id", -1)])
+    if not cursor:
+        find = find.skip(skip)
+    docs = list(find.limit(limit + 1))
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1].get("created_at"), docs[-1]["_id"])
+    candidates = [serialize(c) for c in docs]
+    return {"candidates": candidates, "total": total, "next_cursor": next_cursor}
+
+
+def _count_candidates(db: Database, q: dict, mode: str) -> Optional[int]:
+    """Total for list_candidates. cached: exact count reused for 30s; estimate: collection metadata when unfiltered."""
+    if mode == "none":
+        return None
+    if mode == "estimate" and not q:
+        return db[CANDIDATES].estimated_document_count()
+    if mode == "exact":
+        return db[CANDIDATES].count_documents(q)
+    key = json.dumps(q, sort_keys=True, default=str)
+    total = _count_cache.get(key)
+    if total is None:
+        total = db[CANDIDATES].count_documents(q)
+        _count_cache.set(key, total)
+    return total
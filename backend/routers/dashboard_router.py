@@ -1,12 +1,23 @@
 """
 Dashboard API: KPI counts for HR portal.
 """
-from fastapi import APIRouter, Depends
+import asyncio
+import json
+from datetime import date, timedelta
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
 from pymongo.database import Database
 
-from database import get_db, CANDIDATES
-from auth.jwt import require_auth
+from database import get_db
+from auth.jwt import require_auth, require_roles, get_user_from_token, http_bearer
 from models.user import UserView
+from services.kpi_service import ReconcileConflict, read_kpis, reconcile_kpis
+from services.live_feed import live_feed, RESYNC
+from services.rollup_service import timeseries as rollup_timeseries, rebuild_rollups, GROUP_BY_FIELDS
 
 router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
 
@@ -16,12 +27,106 @@ def kpis(
     db: Database = Depends(get_db),
     user: UserView = Depends(require_auth),
 ):
-    """Return counts: yet_to_interview, interview_completed, total."""
-    yti = db[CANDIDATES].count_documents({"status": "yet_to_interview"})
-    completed = db[CANDIDATES].count_documents({"status": "interview_completed"})
-    total = db[CANDIDATES].count_documents({})
-    return {
-        "yet_to_interview": yti,
-        "interview_completed": completed,
-        "total_candidates": total,
-    }
+    """Return counts: yet_to_interview, interview_completed, total, plus per-decision / per-location breakdowns."""
+    return read_kpis(db)
+
+
+@router.post("/kpis/reconcile", response_model=dict)
+def reconcile(
+    db: Database = Depends(get_db),
+    user: UserView = Depends(require_roles(["admin"])),
+):
+    """Recompute KPI counters from candidates and report any drift that was repaired. Admin only."""
+    try:
+        return reconcile_kpis(db)
+    except ReconcileConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.get("/timeseries", response_model=dict)
+def timeseries(
+    from_date: Optional[date] = Query(None, description="YYYY-MM-DD, default 30 days before to_date"),
+    to_date: Optional[date] = Query(None, description="YYYY-MM-DD, default today"),
+    group_by: str = Query("none", description="none | location | branch"),
+    location: Optional[str] = Query(None),
+    branch: Optional[str] = Query(None),
+    db: Database = Depends(get_db),
+    user: UserView = Depends(require_auth),
+):
+    """Daily onboarding / interview throughput from the pre-aggregated rollups."""
+    if group_by not in GROUP_BY_FIELDS:
+        raise HTTPException(status_code=400, detail=f"Invalid group_by. Must be one of: {', '.join(GROUP_BY_FIELDS)}")
+    to_date = to_date or date.today()
+    from_date = from_date or (to_date - timedelta(days=30))
+    if from_date > to_date:
+        raise HTTPException(status_code=400, detail="from_date must not be after to_date")
+    series = rollup_timeseries(db, from_date.isoformat(), to_date.isoformat(), group_by, location, branch)
+    return {"from_date": from_date.isoformat(), "to_date": to_date.isoformat(), "group_by": group_by, "series": series}
+
+
+@router.post("/timeseries/rebuild", response_model=dict)
+def rebuild_timeseries(
+    db: Database = Depends(get_db),
+    user: UserView = Depends(require_roles(["admin"])),
+):
+    """Rebuild the daily rollups from candidates and interviews. Admin only."""
+    return {"buckets": rebuild_rollups(db)}
+
+
+def _sse(event: dict[str, Any]) -> str:
+    lines = []
+    if event.get("id"):
+        lines.append(f"id: {event['id']}")
+    lines.append(f"event: {event['type']}")
+    lines.append(f"data: {json.dumps(event.get('data'), default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+@router.get("/stream")
+async def stream(
+    request: Request,
+    access_token: Optional[str] = Query(None, description="JWT for EventSource clients that cannot send headers"),
+    last_event_id: Optional[str] = Header(None),
+    creds: Optional[HTTPAuthorizationCredentials] = Depends(http_bearer),
+    db: Database = Depends(get_db),
+):
+    """
+    Server-Sent Events: KPI updates and candidate status transitions, pushed as they happen.
+    Replaces polling /kpis. Reconnects resume from Last-Event-ID.
+    """
+    token = creds.credentials if creds and creds.credentials else access_token
+    user = await run_in_threadpool(get_user_from_token, db, token)
+    if not user:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    if not live_feed.available:
+        raise HTTPException(status_code=503, detail="Live updates need a MongoDB replica set; poll /api/dashboard/kpis instead")
+
+    async def events():
+        sub, replay = live_feed.subscribe(last_event_id)
+        try:
+            yield "retry: 3000\n\n"
+            if replay is None:
+                yield _sse({"type": "kpis", "data": await run_in_threadpool(read_kpis, db)})
+            else:
+                for event in replay:
+                    yield _sse(event)
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(sub.queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if event is RESYNC:
+                    # Missed events: tell the client to refetch lists, and send fresh KPIs
+                    yield _sse(RESYNC)
+                    yield _sse({"type": "kpis", "data": await run_in_threadpool(read_kpis, db)})
+                    continue
+                yield _sse(event)
+        finally:
+            live_feed.unsubscribe(sub)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,23 +1,33 @@
 """
 Interview workflow: Yet-To-Interview (submit notes/decision), Interview Completed (read-only).
 """
-from datetime import datetime
+from collections import Counter
+from datetime import datetime, timedelta
 from typing import Optional
 
 from bson import ObjectId
-from fastapi import APIRouter, Depends, HTTPException, Query
-from pydantic import BaseModel
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from pydantic import BaseModel, Field
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.client_session import ClientSession
 from pymongo.database import Database
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 
-from database import get_db, CANDIDATES, INTERVIEWS, USERS
+from config import get_settings
+from database import get_db, run_transaction, CANDIDATES, INTERVIEWS, INTERVIEW_SUBMISSIONS
 from auth.jwt import require_auth, require_roles
 from models.user import UserView
 from models.candidate import doc_to_candidate_profile
-from models.interview import interview_doc, doc_to_interview_result
-from routers.audit import log_action
+from models.interview import interview_doc, doc_to_interview_result, INTERVIEW_RESULT_PROJECTION
+from routers.audit import log_action, log_actions
+from services import candidate_events
+from services.interview_snapshot_service import backfill_interview_snapshots
+from utils.pagination import encode_cursor, keyset_filter
 
 router = APIRouter(prefix="/api/interviews", tags=["interviews"])
 
+DECISIONS = ("shortlist", "reject", "hold")
+
 
 class SubmitInterviewRequest(BaseModel):
     candidate_id: str
@@ -25,6 +35,22 @@ class SubmitInterviewRequest(BaseModel):
     decision: str  # shortlist | reject | hold
 
 
+class BatchSubmitItem(SubmitInterviewRequest):
+    idempotency_key: str = Field(..., min_length=1, max_length=128)
+
+
+class BatchSubmitRequest(BaseModel):
+    items: list[BatchSubmitItem]
+
+
+class ClaimNextRequest(BaseModel):
+    interview_location: str
+
+
+class ClaimRequest(BaseModel):
+    candidate_id: str
+
+
 class InterviewResult(BaseModel):
     id: str
     candidate_id: str
@@ -47,7 +73,8 @@ def list_yet_to_interview(
     q = {"status": "yet_to_interview"}
     if role_filter:
         q["role_applied"] = {"$regex": role_filter, "$options": "i"}
-    candidates = list(db[CANDIDATES].find(q).sort("created_at", -1))
+    projection = {"candidate_id": 1, "name": 1, "role_applied": 1, "experience_years": 1, "qualifications": 1}
+    candidates = list(db[CANDIDATES].find(q, projection).sort("created_at", -1))
     items = []
     for c in candidates:
         items.append({
@@ -61,44 +88,365 @@ def list_yet_to_interview(
     return {"candidates": items, "total": len(items)}
 
 
+CLEAR_CLAIM = {"claimed_by": None, "claimed_by_name": None, "claimed_at": None, "claim_expires_at": None}
+QUEUE_ITEM_PROJECTION = {
+    "candidate_id": 1,
+    "name": 1,
+    "interview_location": 1,
+    "diploma_branch": 1,
+    "created_at": 1,
+    "claim_expires_at": 1,
+}
+
+
+def _not_claimed_by_others(user: UserView) -> dict:
+    """Filter: no live claim, or the live claim is this user's."""
+    return {"$or": [
+        {"claimed_by": None},
+        {"claimed_by": user.oid},
+        {"claim_expires_at": {"$lte": datetime.utcnow()}},
+    ]}
+
+
+def _queue_item(c: dict) -> dict:
+    ca, exp = c.get("created_at"), c.get("claim_expires_at")
+    return {
+        "id": str(c["_id"]),
+        "candidate_id": c.get("candidate_id"),
+        "name": c.get("name"),
+        "interview_location": c.get("interview_location"),
+        "diploma_branch": c.get("diploma_branch"),
+        "created_at": ca.isoformat() if ca else None,
+        "claim_expires_at": exp.isoformat() if exp else None,
+    }
+
+
+@router.post("/queue/claim", response_model=dict)
+def claim_next(
+    req: ClaimNextRequest,
+    db: Database = Depends(get_db),
+    user: UserView = Depends(require_roles(["admin", "hr", "interviewer"])),
+):
+    """
+    Atomically claim the longest-waiting unclaimed candidate at a location.
+    The claim is a lease: it lapses back into the queue unless renewed or submitted.
+    A panel that already holds a live claim at the location gets that candidate back.
+    A unique (claimed_by, interview_location) index keeps concurrent claims from one
+    panel to a single lease; the losing request returns the winner's candidate.
+    """
+    now = datetime.utcnow()
+    lease = timedelta(seconds=get_settings().INTERVIEW_CLAIM_LEASE_SECONDS)
+    mine = {"status": "yet_to_interview", "interview_location": req.interview_location, "claimed_by": user.oid}
+    held = db[CANDIDATES].find_one({**mine, "claim_expires_at": {"$gt": now}}, QUEUE_ITEM_PROJECTION)
+    if held:
+        return {"candidate": _queue_item(held)}
+    # A lapsed lease still names this panel; hand it back so the unique index admits the new claim
+    db[CANDIDATES].update_many({**mine, "claim_expires_at": {"$lte": now}}, {"$set": CLEAR_CLAIM})
+    try:
+        c = db[CANDIDATES].find_one_and_update(
+            {
+                "status": "yet_to_interview",
+                "interview_location": req.interview_location,
+                "$or": [{"claim_expires_at": None}, {"claim_expires_at": {"$lte": now}}],
+            },
+            {"$set": {
+                "claimed_by": user.oid,
+                "claimed_by_name": user.full_name,
+                "claimed_at": now,
+                "claim_expires_at": now + lease,
+            }},
+            sort=[("created_at", 1)],
+            projection=QUEUE_ITEM_PROJECTION,
+            return_document=ReturnDocument.AFTER,
+        )
+    except DuplicateKeyError:
+        # A concurrent claim by this panel at the location got there first
+        c = db[CANDIDATES].find_one(mine, QUEUE_ITEM_PROJECTION)
+    return {"candidate": _queue_item(c) if c else None}
+
+
+@router.post("/queue/renew", response_model=dict)
+def renew_claim(
+    req: ClaimRequest,
+    db: Database = Depends(get_db),
+    user: UserView = Depends(require_roles(["admin", "hr", "interviewer"])),
+):
+    """Extend the lease on a candidate this user has claimed."""
+    now = datetime.utcnow()
+    lease = timedelta(seconds=get_settings().INTERVIEW_CLAIM_LEASE_SECONDS)
+    c = db[CANDIDATES].find_one_and_update(
+        {
+            "candidate_id": req.candidate_id,
+            "status": "yet_to_interview",
+            "claimed_by": user.oid,
+            "claim_expires_at": {"$gt": now},
+        },
+        {"$set": {"claim_expires_at": now + lease}},
+        projection=QUEUE_ITEM_PROJECTION,
+        return_document=ReturnDocument.AFTER,
+    )
+    if not c:
+        raise HTTPException(status_code=409, detail="No live claim on this candidate")
+    return {"candidate": _queue_item(c)}
+
+
+@router.post("/queue/release", response_model=dict)
+def release_claim(
+    req: ClaimRequest,
+    db: Database = Depends(get_db),
+    user: UserView = Depends(require_roles(["admin", "hr", "interviewer"])),
+):
+    """Give a claimed candidate back to the queue (keeps their original place)."""
+    r = db[CANDIDATES].update_one(
+        {"candidate_id": req.candidate_id, "status": "yet_to_interview", "claimed_by": user.oid},
+        {"$set": CLEAR_CLAIM},
+    )
+    if r.matched_count == 0:
+        raise HTTPException(status_code=409, detail="No claim on this candidate")
+    return {"candidate_id": req.candidate_id, "status": "released"}
+
+
 @router.post("/submit")
 def submit_interview(
     req: SubmitInterviewRequest,
     db: Database = Depends(get_db),
     user: UserView = Depends(require_roles(["admin", "hr", "interviewer"])),
 ):
-    """Add interview notes + decision. Moves candidate to interview_completed."""
-    c = db[CANDIDATES].find_one({"candidate_id": req.candidate_id})
-    if not c:
-        raise HTTPException(status_code=404, detail="Candidate not found")
-    if c.get("status") != "yet_to_interview":
-        raise HTTPException(status_code=400, detail="Candidate already interviewed")
-    if req.decision not in ("shortlist", "reject", "hold"):
+    """
+    Add interview notes + decision. Moves candidate to interview_completed.
+    The status check and transition are one conditional find-and-modify, so
+    concurrent submits for the same candidate produce exactly one interview.
+    """
+    if req.decision not in DECISIONS:
         raise HTTPException(status_code=400, detail="Invalid decision")
 
-    cand_oid = c["_id"]
-    doc = interview_doc(
-        candidate_oid=cand_oid,
-        candidate_id=req.candidate_id,
-        interviewer_oid=user.oid,
-        decision=req.decision,
-        notes=req.notes,
-    )
-    r = db[INTERVIEWS].insert_one(doc)
-    db[CANDIDATES].update_one(
-    {"_id": cand_oid},
-    {
-        "$set": {
-            "status": "interview_completed",
-            "decision": req.decision,
-            "interview_notes": req.notes,
-            "updated_at": datetime.utcnow(),
+    def _submit(session):
+        c = db[CANDIDATES].find_one_and_update(
+            {
+                "candidate_id": req.candidate_id,
+                "status": "yet_to_interview",
+                **_not_claimed_by_others(user),
+            },
+            {
+                "$set": {
+                    "status": "interview_completed",
+                    "decision": req.decision,
+                    "interview_notes": req.notes,
+                    "updated_at": datetime.utcnow(),
+                    **CLEAR_CLAIM,
+                },
+                "$inc": {"interview_round": 1},
+            },
+            return_document=ReturnDocument.BEFORE,
+            session=session,
+        )
+        if c is None:
+            return None
+        doc = interview_doc(
+            candidate_oid=c["_id"],
+            candidate_id=req.candidate_id,
+            interviewer_oid=user.oid,
+            decision=req.decision,
+            notes=req.notes,
+            candidate_name=c.get("name"),
+            role_applied=c.get("role_applied"),
+            interviewer_name=user.full_name,
+            interview_round=(c.get("interview_round") or 0) + 1,
+        )
+        r = db[INTERVIEWS].insert_one(doc, session=session)
+        candidate_events.interview_submitted(db, c, req.decision, session=session)
+        # Same transaction: a committed submission always has its audit entry
+        log_action(
+            db, user.oid, "interview_submit", "interview", str(r.inserted_id),
+            {"candidate_id": req.candidate_id, "decision": req.decision},
+            session=session,
+        )
+        return r.inserted_id
+
+    interview_oid = run_transaction(_submit)
+    if interview_oid is None:
+        c = db[CANDIDATES].find_one({"candidate_id": req.candidate_id}, {"status": 1})
+        if not c:
+            raise HTTPException(status_code=404, detail="Candidate not found")
+        if c.get("status") == "yet_to_interview":
+            raise HTTPException(status_code=409, detail="Candidate is claimed by another interview panel")
+        raise HTTPException(status_code=400, detail="Candidate already interviewed")
+    return {"id": str(interview_oid), "candidate_id": req.candidate_id, "decision": req.decision, "status": "interview_completed"}
+
+
+# Candidate fields a submit needs: snapshot, KPI/rollup buckets, round, claim
+SUBMIT_CANDIDATE_PROJECTION = {
+    "candidate_id": 1,
+    "name": 1,
+    "role_applied": 1,
+    "status": 1,
+    "decision": 1,
+    "interview_location": 1,
+    "diploma_branch": 1,
+    "interview_round": 1,
+    "claimed_by": 1,
+    "claim_expires_at": 1,
+}
+
+
+def _batch_result(item: BatchSubmitItem, status: str, **extra) -> dict:
+    return {"idempotency_key": item.idempotency_key, "candidate_id": item.candidate_id, "status": status, **extra}
+
+
+def _apply_batch(db: Database, user: UserView, items: list[BatchSubmitItem], session: Optional[ClientSession]) -> list[dict]:
+    """
+    One pass over a batch: replay known keys, validate the rest against one
+    $in fetch of candidates, then apply with bulk writes. Returns results in item order.
+    """
+    now = datetime.utcnow()
+    keys = [f"{user.oid}:{it.idempotency_key}" for it in items]
+    stored = {
+        d["_id"]: d["result"]
+        for d in db[INTERVIEW_SUBMISSIONS].find({"_id": {"$in": keys}}, {"result": 1}, session=session)
+    }
+    results: list[Optional[dict]] = [None] * len(items)
+    to_record: list[int] = []
+    pending: list[int] = []
+    seen_keys: set[str] = set()
+    seen_candidates: set[str] = set()
+    for n, (key, it) in enumerate(zip(keys, items)):
+        if key in stored:
+            results[n] = {**stored[key], "replayed": True}
+            continue
+        if key in seen_keys:
+            results[n] = _batch_result(it, "invalid", detail="Duplicate idempotency_key in batch")
+            continue
+        seen_keys.add(key)
+        to_record.append(n)
+        if it.decision not in DECISIONS:
+            results[n] = _batch_result(it, "invalid", detail="Invalid decision")
+        elif it.candidate_id in seen_candidates:
+            results[n] = _batch_result(it, "conflict", detail="Candidate appears more than once in batch")
+        else:
+            seen_candidates.add(it.candidate_id)
+            pending.append(n)
+
+    cands = {}
+    if pending:
+        cands = {
+            c["candidate_id"]: c
+            for c in db[CANDIDATES].find(
+                {"candidate_id": {"$in": [items[n].candidate_id for n in pending]}},
+                SUBMIT_CANDIDATE_PROJECTION,
+                session=session,
+            )
         }
-    },
-)
+    accepted: list[tuple[int, dict]] = []
+    ops = []
+    for n in pending:
+        it, c = items[n], cands.get(items[n].candidate_id)
+        if c is None:
+            results[n] = _batch_result(it, "not_found", detail="Candidate not found")
+        elif c.get("status") != "yet_to_interview":
+            results[n] = _batch_result(it, "conflict", detail="Candidate already interviewed")
+        elif c.get("claimed_by") not in (None, user.oid) and c.get("claim_expires_at") and c["claim_expires_at"] > now:
+            results[n] = _batch_result(it, "conflict", detail="Candidate is claimed by another interview panel")
+        else:
+            accepted.append((n, c))
+            ops.append(UpdateOne(
+                {"_id": c["_id"], "status": "yet_to_interview", **_not_claimed_by_others(user)},
+                {
+                    "$set": {
+                        "status": "interview_completed",
+                        "decision": it.decision,
+                        "interview_notes": it.notes,
+                        "interview_submission_key": keys[n],
+                        "updated_at": now,
+                        **CLEAR_CLAIM,
+                    },
+                    "$inc": {"interview_round": 1},
+                },
+            ))
+
+    if ops:
+        r = db[CANDIDATES].bulk_write(ops, ordered=False, session=session)
+        if r.modified_count != len(ops):
+            # Another submit won some candidates between read and write (only possible without transactions)
+            won = {
+                d["_id"]
+                for d in db[CANDIDATES].find(
+                    {"_id": {"$in": [c["_id"] for _, c in accepted]}, "interview_submission_key": {"$in": keys}},
+                    {"_id": 1},
+                    session=session,
+                )
+            }
+            for n, c in accepted:
+                if c["_id"] not in won:
+                    results[n] = _batch_result(items[n], "conflict", detail="Candidate already interviewed")
+            accepted = [(n, c) for n, c in accepted if c["_id"] in won]
 
-    log_action(db, user.oid, "interview_submit", "interview", str(r.inserted_id), {"candidate_id": req.candidate_id, "decision": req.decision})
-    return {"id": str(r.inserted_id), "candidate_id": req.candidate_id, "decision": req.decision, "status": "interview_completed"}
+    if accepted:
+        docs = [
+            interview_doc(
+                candidate_oid=c["_id"],
+                candidate_id=c["candidate_id"],
+                interviewer_oid=user.oid,
+                decision=items[n].decision,
+                notes=items[n].notes,
+                candidate_name=c.get("name"),
+                role_applied=c.get("role_applied"),
+                interviewer_name=user.full_name,
+                interview_round=(c.get("interview_round") or 0) + 1,
+            )
+            for n, c in accepted
+        ]
+        inserted = db[INTERVIEWS].insert_many(docs, session=session).inserted_ids
+        candidate_events.interviews_submitted(db, [(c, items[n].decision) for n, c in accepted], session=session)
+        log_actions(
+            db, user.oid, "interview_submit", "interview",
+            [(str(iid), {"candidate_id": c["candidate_id"], "decision": items[n].decision, "batch": True})
+             for iid, (n, c) in zip(inserted, accepted)],
+            session=session,
+        )
+        for iid, (n, c) in zip(inserted, accepted):
+            results[n] = _batch_result(items[n], "applied", interview_id=str(iid), decision=items[n].decision)
+
+    if to_record:
+        db[INTERVIEW_SUBMISSIONS].insert_many(
+            [{"_id": keys[n], "user_id": user.oid, "result": results[n], "created_at": now} for n in to_record],
+            ordered=False,
+            session=session,
+        )
+    return [r if "replayed" in r else {**r, "replayed": False} for r in results]
+
+
+@router.post("/submit/batch", response_model=dict)
+def submit_interviews_batch(
+    req: BatchSubmitRequest,
+    db: Database = Depends(get_db),
+    user: UserView = Depends(require_roles(["admin", "hr", "interviewer"])),
+):
+    """
+    Submit many interview decisions at once (panels entering results after the fact).
+    Items are independent and get one result each, in request order:
+    applied | conflict | not_found | invalid. Every item carries a client
+    idempotency_key; resending a key returns its stored result (replayed=true)
+    instead of applying it again.
+    """
+    max_items = get_settings().INTERVIEW_BATCH_MAX_ITEMS
+    if not req.items:
+        raise HTTPException(status_code=400, detail="No items")
+    if len(req.items) > max_items:
+        raise HTTPException(status_code=400, detail=f"At most {max_items} items per batch")
+    for attempt in range(2):
+        try:
+            results = run_transaction(lambda session: _apply_batch(db, user, req.items, session))
+            break
+        except (BulkWriteError, DuplicateKeyError):
+            # A concurrent retry of the same keys committed first; run again to replay its results
+            if attempt:
+                raise
+    counts = Counter(r["status"] for r in results)
+    return {"results": results, "counts": dict(counts)}
+
+
+# Page size when a cursor is passed without an explicit limit
+COMPLETED_PAGE_SIZE = 500
 
 
 @router.get("/completed", response_model=dict)
@@ -107,15 +455,17 @@ def list_completed(
     to_date: Optional[str] = Query(None),
     role: Optional[str] = Query(None),
     decision: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size; omit with no cursor for the full list"),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from a previous page"),
     db: Database = Depends(get_db),
     user: UserView = Depends(require_auth),
 ):
-    """Read-only list of completed interviews."""
-    cand_q: dict = {"status": "interview_completed"}
-    if role:
-        cand_q["role_applied"] = {"$regex": role, "$options": "i"}
-    completed_ids = [d["_id"] for d in db[CANDIDATES].find(cand_q, {"_id": 1})]
-    q: dict = {"candidate_oid": {"$in": completed_ids}}
+    """
+    Read-only list of completed interviews, newest first. Reads only the interview snapshots.
+    Without limit or cursor every match is returned (next_cursor is null), as existing clients expect;
+    paged callers pass limit and follow next_cursor.
+    """
+    q: dict = {"candidate_status": "interview_completed"}
     date_q: dict = {}
     if from_date:
         date_q["$gte"] = datetime.fromisoformat(from_date.replace("Z", "+00:00"))
@@ -125,18 +475,27 @@ def list_completed(
         q["interview_date"] = date_q
     if decision:
         q["decision"] = decision
-    interviews = list(db[INTERVIEWS].find(q).sort("interview_date", -1))
-    out = []
-    for i in interviews:
-        cand = db[CANDIDATES].find_one({"_id": i["candidate_oid"]}) or {}
-        u = db[USERS].find_one({"_id": i["interviewer_id"]}) or {}
-        out.append(doc_to_interview_result(
+    if role:
+        q["role_applied"] = {"$regex": role, "$options": "i"}
+    if cursor:
+        q = {"$and": [q, keyset_filter("interview_date", cursor)]}
+        limit = limit or COMPLETED_PAGE_SIZE
+    found = db[INTERVIEWS].find(q, INTERVIEW_RESULT_PROJECTION).sort([("interview_date", -1), ("_id", -1)])
+    rows = list(found.limit(limit + 1) if limit else found)
+    next_cursor = None
+    if limit and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].get("interview_date"), rows[-1]["_id"])
+    out = [
+        doc_to_interview_result(
             i,
-            candidate_name=cand.get("name", ""),
-            interviewer_name=u.get("full_name", ""),
-            role_applied=cand.get("role_applied"),
-        ))
-    return {"interviews": out, "total": len(out)}
+            candidate_name=i.get("candidate_name") or "",
+            interviewer_name=i.get("interviewer_name") or "",
+            role_applied=i.get("role_applied"),
+        )
+        for i in rows
+    ]
+    return {"interviews": out, "total": len(out), "next_cursor": next_cursor}
 
 
 @router.get("/completed/{interview_id}", response_model=InterviewResult)
@@ -150,17 +509,24 @@ def get_completed(
         oid = ObjectId(interview_id)
     except Exception:
         raise HTTPException(status_code=404, detail="Interview not found")
-    i = db[INTERVIEWS].find_one({"_id": oid})
+    i = db[INTERVIEWS].find_one({"_id": oid, "candidate_status": "interview_completed"}, INTERVIEW_RESULT_PROJECTION)
     if not i:
         raise HTTPException(status_code=404, detail="Interview not found")
-    cand = db[CANDIDATES].find_one({"_id": i["candidate_oid"]})
-    if not cand or cand.get("status") != "interview_completed":
-        raise HTTPException(status_code=404, detail="Interview not found")
-    u = db[USERS].find_one({"_id": i["interviewer_id"]})
     res = doc_to_interview_result(
         i,
-        candidate_name=cand.get("name", ""),
-        interviewer_name=u.get("full_name") if u else "",
-        role_applied=cand.get("role_applied"),
+        candidate_name=i.get("candidate_name") or "",
+        interviewer_name=i.get("interviewer_name") or "",
+        role_applied=i.get("role_applied"),
     )
     return InterviewResult(**res)
+
+
+@router.post("/snapshots/backfill", status_code=202)
+def backfill_snapshots(
+    background_tasks: BackgroundTasks,
+    db: Database = Depends(get_db),
+    user: UserView = Depends(require_roles(["admin"])),
+):
+    """Fill candidate/interviewer snapshots on interviews that predate them. Runs in the background. Admin only."""
+    background_tasks.add_task(backfill_interview_snapshots, db)
+    return {"status": "scheduled"}
@@ -6,8 +6,10 @@ from pydantic import BaseModel
 from pymongo.database import Database
 from typing import Optional
 
-from database import get_db, CANDIDATES
+from database import get_db, run_transaction, CANDIDATES
 from models.candidate import candidate_doc, doc_to_candidate_profile, CandidateProfile
+from services import candidate_events
+from services.search_service import with_search_fields
 
 router = APIRouter(prefix="/api/public", tags=["public"])
 
@@ -82,9 +84,14 @@ def self_onboard_candidate(
             onboarded_by=None,  # No user
             status="yet_to_interview",
         )
-        
-        r = db[CANDIDATES].insert_one(doc)
-        doc["_id"] = r.inserted_id
+        with_search_fields(doc)
+
+        def _insert(session):
+            r = db[CANDIDATES].insert_one(doc, session=session)
+            doc["_id"] = r.inserted_id
+            candidate_events.candidate_created(db, doc, session=session)
+
+        run_transaction(_insert)
         
         return CandidateProfile(**doc_to_candidate_profile(doc))
     except Exception as e:
@@ -6,13 +6,16 @@ from datetime import datetime
 from bson import ObjectId
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
+from pymongo import ReturnDocument
 from pymongo.database import Database
 
-from database import get_db, CANDIDATES, RE_INTERVIEW_REQUESTS, USERS
+from database import get_db, run_transaction, CANDIDATES, RE_INTERVIEW_REQUESTS, USERS
 from auth.jwt import require_auth, require_roles
 from models.user import UserView
 from models.re_interview_request import re_interview_request_doc
 from routers.audit import log_action
+from routers.interview_router import CLEAR_CLAIM
+from services import candidate_events
 
 router = APIRouter(prefix="/api/re-interview", tags=["re-interview"])
 
@@ -62,32 +65,50 @@ def resolve_re_interview(
         oid = ObjectId(body.request_id)
     except Exception:
         raise HTTPException(status_code=404, detail="Request not found")
-    req = db[RE_INTERVIEW_REQUESTS].find_one({"_id": oid})
-    if not req:
-        raise HTTPException(status_code=404, detail="Request not found")
-    if req.get("status") != "pending":
-        raise HTTPException(status_code=400, detail="Request already resolved")
-
     status_new = "approved" if body.approved else "rejected"
-    db[RE_INTERVIEW_REQUESTS].update_one(
-        {"_id": oid},
-        {"$set": {
-            "status": status_new,
-            "approved_by_id": user.oid,
-            "resolved_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow(),
-        }},
-    )
 
-    if body.approved:
-        db[CANDIDATES].update_one(
-            {"_id": req["candidate_oid"]},
-            {"$set": {"status": "yet_to_interview", "updated_at": datetime.utcnow()}},
+    def _resolve(session):
+        # Guarded on pending: of two concurrent resolutions only one matches
+        now = datetime.utcnow()
+        req = db[RE_INTERVIEW_REQUESTS].find_one_and_update(
+            {"_id": oid, "status": "pending"},
+            {"$set": {
+                "status": status_new,
+                "approved_by_id": user.oid,
+                "resolved_at": now,
+                "updated_at": now,
+            }},
+            session=session,
         )
-        cand = db[CANDIDATES].find_one({"_id": req["candidate_oid"]})
-        log_action(db, user.oid, "re_interview_approve", "re_interview_request", str(oid), {"candidate_id": cand.get("candidate_id") if cand else ""})
-    else:
-        log_action(db, user.oid, "re_interview_reject", "re_interview_request", str(oid), {})
+        if req is None:
+            return False
+        if body.approved:
+            cand = db[CANDIDATES].find_one_and_update(
+                {"_id": req["candidate_oid"], "status": "interview_completed"},
+                {"$set": {
+                    "status": "yet_to_interview",
+                    "updated_at": now,
+                    **CLEAR_CLAIM,
+                }},
+                return_document=ReturnDocument.BEFORE,
+                session=session,
+            )
+            # KPI delta only for a candidate this call actually moved back
+            if cand:
+                candidate_events.re_interview_approved(db, cand, session=session)
+            log_action(
+                db, user.oid, "re_interview_approve", "re_interview_request", str(oid),
+                {"candidate_id": req.get("candidate_id", "")},
+                session=session,
+            )
+        else:
+            log_action(db, user.oid, "re_interview_reject", "re_interview_request", str(oid), {}, session=session)
+        return True
+
+    if not run_transaction(_resolve):
+        if db[RE_INTERVIEW_REQUESTS].count_documents({"_id": oid}, limit=1):
+            raise HTTPException(status_code=400, detail="Request already resolved")
+        raise HTTPException(status_code=404, detail="Request not found")
 
     return {"id": str(oid), "status": status_new}
 
@@ -0,0 +1,105 @@
+"""
+Background report jobs: submit a report build, poll its progress, download the file.
+"""
+from pathlib import Path
+from typing import Any
+
+from bson import ObjectId
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+from pydantic import BaseModel, Field
+from pymongo.database import Database
+
+from database import get_db
+from auth.jwt import require_auth
+from models.report_job import doc_to_report_job
+from models.user import UserView
+from services.report_catalog import REPORTS
+from services.report_jobs import submit_job, get_job, list_jobs
+
+router = APIRouter(prefix="/api/report-jobs", tags=["report-jobs"])
+
+
+class ReportJobRequest(BaseModel):
+    report: str  # a key of services.report_catalog.REPORTS
+    params: dict[str, Any] = {}
+    format: str = Field("xlsx", pattern="^(xlsx|csv|ndjson)$")
+    gzip: bool = False
+
+
+def _job_for(db: Database, job_id: str, user: UserView) -> dict:
+    try:
+        oid = ObjectId(job_id)
+    except Exception:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    job = get_job(db, oid)
+    if not job or (user.role != "admin" and user.oid not in job.get("requested_by", [])):
+        raise HTTPException(status_code=404, detail="Report job not found")
+    return job
+
+
+@router.get("/reports", response_model=dict)
+def available_reports(user: UserView = Depends(require_auth)):
+    """Reports that can be built in the background, with the params each accepts."""
+    return {"reports": [
+        {"report": name, "title": spec["title"], "params": list(spec["params"])}
+        for name, spec in REPORTS.items()
+        if user.role == "admin" or not spec.get("admin_only")
+    ]}
+
+
+@router.post("", response_model=dict, status_code=202)
+def create_report_job(
+    req: ReportJobRequest,
+    db: Database = Depends(get_db),
+    user: UserView = Depends(require_auth),
+):
+    """
+    Queue a report build. An identical request (same report, params, format
+    and underlying data) joins the existing job instead of starting another.
+    """
+    spec = REPORTS.get(req.report)
+    if spec is None:
+        raise HTTPException(status_code=404, detail="Unknown report")
+    if spec.get("admin_only") and user.role != "admin":
+        raise HTTPException(status_code=403, detail="Insufficient permissions")
+    try:
+        job, created = submit_job(db, req.report, req.params, req.format, req.gzip, user)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"job": doc_to_report_job(job), "deduplicated": not created}
+
+
+@router.get("", response_model=dict)
+def my_report_jobs(
+    db: Database = Depends(get_db),
+    user: UserView = Depends(require_auth),
+):
+    """The caller's most recent report jobs."""
+    return {"jobs": [doc_to_report_job(j) for j in list_jobs(db, user)]}
+
+
+@router.get("/{job_id}", response_model=dict)
+def report_job_status(
+    job_id: str,
+    db: Database = Depends(get_db),
+    user: UserView = Depends(require_auth),
+):
+    """Status and progress (rows / bytes written so far)."""
+    return {"job": doc_to_report_job(_job_for(db, job_id, user))}
+
+
+@router.get("/{job_id}/download")
+def download_report_job(
+    job_id: str,
+    db: Database = Depends(get_db),
+    user: UserView = Depends(require_auth),
+):
+    """The finished file. 409 while the job is still building, 410 once evicted or failed."""
+    job = _job_for(db, job_id, user)
+    if job["status"] in ("queued", "running"):
+        raise HTTPException(status_code=409, detail="Report is not ready yet")
+    path = job.get("artifact_path")
+    if job["status"] != "done" or not path or not Path(path).exists():
+        raise HTTPException(status_code=410, detail="Report is no longer available")
+    return FileResponse(path, media_type=job.get("media_type"), filename=job.get("filename"))
@@ -1,94 +1,146 @@
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import StreamingResponse
+from datetime import date
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from pymongo.database import Database
-from io import BytesIO
-import openpyxl
 
 from database import get_db, CANDIDATES
-from auth.jwt import require_auth
+from auth.jwt import require_auth, require_roles
 from models.user import UserView
+from services.export_service import export_format, export_stream
+from services.report_cache import report_cache
+from services.report_catalog import REPORTS, data_versions, normalize_params, report_key
 
 router = APIRouter(prefix="/api/reports", tags=["reports"])
+
+FORMAT_QUERY = Query("xlsx", alias="format", pattern="^(xlsx|csv|ndjson)$")
+GZIP_QUERY = Query(False, description="gzip csv/ndjson output")
+
+
+def _download(
+    db: Database,
+    report: str,
+    name: str,
+    params: dict[str, Any],
+    fmt: str,
+    gzip: bool,
+):
+    """
+    Serve a catalog report: from the report cache when the underlying data is
+    unchanged, otherwise streamed from the builder and cached on the way out.
+    """
+    if fmt == "xlsx":
+        gzip = False
+    params = normalize_params(report, params)
+    media_type, ext = export_format(fmt, gzip)
+    filename = f"{name}.{ext}"
+    key = report_key(report, params, fmt, gzip, data_versions(db, report))
+
+    data, path = report_cache.get(key)
+    if data is not None:
+        return Response(
+            content=data,
+            media_type=media_type,
+            headers={"Content-Disposition": f"attachment; filename={filename}"},
+        )
+    if path is not None:
+        return FileResponse(path, media_type=media_type, filename=filename)
+
+    spec = REPORTS[report]
+    columns, rows = spec["build"](db, params)
+    chunks, _, _ = export_stream(fmt, spec["title"], columns, rows, gzip=gzip)
+    return StreamingResponse(
+        report_cache.fill(key, ext, chunks),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}"
+        },
+    )
+
+
+def _iso(d: Optional[date]) -> Optional[str]:
+    return d.isoformat() if d else None
+
+
 @router.get("/all-candidates")
 def download_all_candidates(
+    fmt: str = FORMAT_QUERY,
+    gzip: bool = GZIP_QUERY,
     db: Database = Depends(get_db),
     user: UserView = Depends(require_auth),
 ):
-    candidates = list(db[CANDIDATES].find({}).sort("created_at", -1))
-
-    if not candidates:
+    """All candidates, streamed from a batched cursor (constant memory)."""
+    if not db[CANDIDATES].find_one({}, {"_id": 1}):
         raise HTTPException(status_code=404, detail="No candidates found")
 
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "All Candidates"
-
-    headers = list(candidates[0].keys())
-    ws.append(headers)
+    return _download(db, "all-candidates", "all-candidates", {}, fmt, gzip)
 
-    for c in candidates:
-        ws.append([c.get(h) for h in headers])
 
-    stream = BytesIO()
-    wb.save(stream)
-    stream.seek(0)
-
-    return StreamingResponse(
-        stream,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={
-            "Content-Disposition": "attachment; filename=all-candidates.xlsx"
-        },
-    )
 @router.get("/branch-summary")
 def download_branch_summary(
+    group_by: str = Query("branch", pattern="^(branch|location|state|college)$"),
+    fmt: str = FORMAT_QUERY,
+    gzip: bool = GZIP_QUERY,
     db: Database = Depends(get_db),
     user: UserView = Depends(require_auth),
 ):
-    candidates = list(db[CANDIDATES].find({}))
-
-    summary = {}
-
-    for c in candidates:
-        branch = c.get("diploma_branch") or "Unknown"
-        decision = c.get("decision")
+    """Shortlisted / not-shortlisted / total per diploma branch (or location, state, college)."""
+    return _download(db, "branch-summary", f"{group_by}-summary", {"group_by": group_by}, fmt, gzip)
 
-        if branch not in summary:
-            summary[branch] = {
-                "shortlist": 0,
-                "reject": 0,
-                "total": 0
-            }
 
-        if decision == "shortlist":
-            summary[branch]["shortlist"] += 1
-        elif decision == "reject":
-            summary[branch]["reject"] += 1
+@router.get("/daily-log")
+def download_daily_log(
+    from_date: Optional[date] = Query(None, description="Registration date from (YYYY-MM-DD)"),
+    to_date: Optional[date] = Query(None, description="Registration date to, inclusive"),
+    fmt: str = FORMAT_QUERY,
+    gzip: bool = GZIP_QUERY,
+    db: Database = Depends(get_db),
+    user: UserView = Depends(require_auth),
+):
+    """Daily recruitment log: registration, latest interview, interviewer, decision, status."""
+    params = {"from_date": _iso(from_date), "to_date": _iso(to_date)}
+    return _download(db, "daily-log", "daily-recruitment-log", params, fmt, gzip)
+
+
+@router.get("/interview-results")
+def download_interview_results(
+    from_date: Optional[date] = Query(None, description="Interview date from (YYYY-MM-DD)"),
+    to_date: Optional[date] = Query(None, description="Interview date to, inclusive"),
+    role: Optional[str] = Query(None),
+    decision: Optional[str] = Query(None),
+    fmt: str = FORMAT_QUERY,
+    gzip: bool = GZIP_QUERY,
+    db: Database = Depends(get_db),
+    user: UserView = Depends(require_auth),
+):
+    """Interview results with optional date range, role and decision filters."""
+    params = {"from_date": _iso(from_date), "to_date": _iso(to_date), "role": role, "decision": decision}
+    return _download(db, "interview-results", "interview-results", params, fmt, gzip)
 
-        summary[branch]["total"] += 1
 
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Branch Summary"
+@router.get("/audit-logs")
+def download_audit_logs(
+    from_date: Optional[date] = Query(None, description="YYYY-MM-DD"),
+    to_date: Optional[date] = Query(None, description="YYYY-MM-DD, inclusive"),
+    fmt: str = FORMAT_QUERY,
+    gzip: bool = GZIP_QUERY,
+    db: Database = Depends(get_db),
+    user: UserView = Depends(require_roles(["admin"])),
+):
+    """Audit log export. Admin only."""
+    params = {"from_date": _iso(from_date), "to_date": _iso(to_date)}
+    return _download(db, "audit-logs", "audit-logs", params, fmt, gzip)
 
-    ws.append(["Branch", "Shortlisted", "Not-Shortlisted", "Grand Total"])
 
-    for branch, data in summary.items():
-        ws.append([
-            branch,
-            data["shortlist"],
-            data["reject"],
-            data["total"]
-        ])
+@router.get("/cache-stats", response_model=dict)
+def cache_stats(user: UserView = Depends(require_roles(["admin"]))):
+    """Report cache size and hit / miss / eviction counters. Admin only."""
+    return report_cache.stats()
 
-    stream = BytesIO()
-    wb.save(stream)
-    stream.seek(0)
 
-    return StreamingResponse(
-        stream,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={
-            "Content-Disposition": "attachment; filename=branch-summary.xlsx"
-        },
-    )
+@router.post("/cache/clear", response_model=dict)
+def clear_cache(user: UserView = Depends(require_roles(["admin"]))):
+    """Drop every cached report file. Admin only."""
+    report_cache.clear()
+    return {"status": "cleared"}
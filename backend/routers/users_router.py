@@ -7,8 +7,9 @@ from pydantic import BaseModel, EmailStr
 from pymongo.database import Database
 
 from database import get_db, USERS
-from auth.jwt import hash_password, require_roles
+from auth.jwt import hash_password, require_roles, invalidate_user, revoke_tokens, user_cache_stats
 from models.user import UserView, user_doc
+from services.interview_snapshot_service import propagate_user_name
 
 router = APIRouter(prefix="/api/users", tags=["users"])
 
@@ -99,6 +100,12 @@ def list_users(
     ]
 
 
+@router.get("/cache-stats", response_model=dict)
+def cache_stats(current_user: UserView = Depends(require_roles(["admin"]))):
+    """Authenticated-user and verified-token cache sizes and hit / miss counters (Admin only)."""
+    return user_cache_stats()
+
+
 @router.get("/{user_id}", response_model=UserResponse)
 def get_user(
     user_id: str,
@@ -170,6 +177,11 @@ def update_user(
     
     if update_dict:
         db[USERS].update_one({"_id": oid}, {"$set": update_dict})
+        invalidate_user(user["email"])
+        if "role" in update_dict and update_dict["role"] != user.get("role"):
+            revoke_tokens(user["email"])
+        if "full_name" in update_dict and update_dict["full_name"] != user.get("full_name"):
+            propagate_user_name(db, oid, update_dict["full_name"])
     
     # Get updated user
     updated_user = db[USERS].find_one({"_id": oid})
@@ -204,9 +216,11 @@ def delete_user(
             detail="Cannot delete your own account"
         )
     
-    result = db[USERS].delete_one({"_id": oid})
+    user = db[USERS].find_one_and_delete({"_id": oid}, projection={"email": 1})
     
-    if result.deleted_count == 0:
+    if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    invalidate_user(user["email"])
+    revoke_tokens(user["email"])
     
     return None
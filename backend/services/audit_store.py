@@ -0,0 +1,235 @@
+"""
+Month-partitioned audit storage: entries live in audit_logs_YYYYMM by
+created_at (UTC). Each partition carries the indexes declared in
+migrations.indexes.PARTITION_INDEXES and is created on first write. Partitions older than AUDIT_RETENTION_MONTHS are
+rolled into gzip NDJSON files under AUDIT_ARCHIVE_DIR and dropped.
+
+Reads walk partitions newest first, so date-bounded queries and exports
+only touch the months in range. The legacy unpartitioned audit_logs
+collection is drained into partitions by migrate_legacy_audit_logs.
+"""
+import gzip
+import logging
+import os
+import re
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from bson import ObjectId, json_util
+from pymongo import InsertOne
+from pymongo.client_session import ClientSession
+from pymongo.database import Database
+from pymongo.errors import BulkWriteError
+
+from config import get_settings
+from database import AUDIT_LOGS, month_partition
+from migrations.indexes import ensure_partition_indexes
+from services import data_version
+from utils.pagination import decode_cursor, encode_cursor
+
+logger = logging.getLogger(__name__)
+
+PARTITION_PREFIX = f"{AUDIT_LOGS}_"
+_PARTITION_RE = re.compile(rf"^{PARTITION_PREFIX}(\d{{4}})(\d{{2}})$")
+
+_ensured: set[str] = set()
+_ensured_lock = threading.Lock()
+
+
+def partition_name(dt: datetime) -> str:
+    return month_partition(AUDIT_LOGS, dt)
+
+
+def _month_key(name: str) -> Optional[tuple[int, int]]:
+    m = _PARTITION_RE.match(name)
+    return (int(m.group(1)), int(m.group(2))) if m else None
+
+
+def ensure_partition(db: Database, name: str) -> None:
+    """Create a partition's indexes once per process (idempotent; never inside a transaction)."""
+    if name in _ensured:
+        return
+    with _ensured_lock:
+        if name in _ensured:
+            return
+        ensure_partition_indexes(db, AUDIT_LOGS, name)
+        _ensured.add(name)
+
+
+def partitions(db: Database, from_date: Optional[datetime] = None, to_date: Optional[datetime] = None) -> list[str]:
+    """Existing partitions overlapping [from_date, to_date], newest first."""
+    lo = (from_date.year, from_date.month) if from_date else None
+    hi = (to_date.year, to_date.month) if to_date else None
+    names = []
+    for name in db.list_collection_names(filter={"name": {"$regex": f"^{PARTITION_PREFIX}[0-9]{{6}}$"}}):
+        key = _month_key(name)
+        if key and (lo is None or key >= lo) and (hi is None or key <= hi):
+            names.append(name)
+    return sorted(names, reverse=True)
+
+
+def _only_duplicates(e: BulkWriteError) -> bool:
+    return not e.details.get("writeConcernErrors") and all(
+        err.get("code") == 11000 for err in e.details.get("writeErrors", [])
+    )
+
+
+def insert_entries(db: Database, entries: list[dict[str, Any]], session: Optional[ClientSession] = None) -> None:
+    """Write entries into their month partitions (one insert_many per month)."""
+    by_partition: dict[str, list[dict[str, Any]]] = {}
+    for e in entries:
+        by_partition.setdefault(partition_name(e["created_at"]), []).append(e)
+    for name, docs in by_partition.items():
+        ensure_partition(db, name)
+        db[name].insert_many(docs, ordered=False, session=session)
+    data_version.bump(db, AUDIT_LOGS, session=session)
+
+
+def _filter(
+    user_id: Optional[ObjectId] = None,
+    action: Optional[str] = None,
+    resource_type: Optional[str] = None,
+    resource_id: Optional[str] = None,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+) -> dict[str, Any]:
+    q: dict[str, Any] = {}
+    if user_id is not None:
+        q["user_id"] = user_id
+    if action:
+        q["action"] = action
+    if resource_type:
+        q["resource_type"] = resource_type
+    if resource_id:
+        q["resource_id"] = resource_id
+    created: dict[str, Any] = {}
+    if from_date:
+        created["$gte"] = from_date
+    if to_date:
+        created["$lte"] = to_date
+    if created:
+        q["created_at"] = created
+    return q
+
+
+def query(
+    db: Database,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    **filters: Any,
+) -> tuple[list[dict[str, Any]], Optional[str]]:
+    """
+    One page of entries, newest first, and the next_cursor (None on the last page).
+    Filters: user_id, action, resource_type, resource_id, from_date, to_date.
+    """
+    q = _filter(**filters)
+    to_date = filters.get("to_date")
+    if cursor:
+        after, after_id = decode_cursor(cursor)
+        # Resume in the cursor's month; newer partitions are already exhausted
+        if after and (to_date is None or after < to_date):
+            to_date = after
+        q = {"$and": [q, {"$or": [
+            {"created_at": {"$lt": after}},
+            {"created_at": after, "_id": {"$lt": after_id}},
+        ]}]}
+    rows: list[dict[str, Any]] = []
+    for name in partitions(db, filters.get("from_date"), to_date):
+        need = limit + 1 - len(rows)
+        rows.extend(db[name].find(q).sort([("created_at", -1), ("_id", -1)]).limit(need))
+        if len(rows) > limit:
+            break
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["_id"])
+    return rows, next_cursor
+
+
+def iter_entries(
+    db: Database,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    batch_size: int = 500,
+) -> Iterator[dict[str, Any]]:
+    """Every entry in range, newest first, streamed one partition at a time."""
+    q = _filter(from_date=from_date, to_date=to_date)
+    for name in partitions(db, from_date, to_date):
+        yield from db[name].find(q).sort([("created_at", -1), ("_id", -1)]).batch_size(batch_size)
+
+
+def partition_stats(db: Database) -> list[dict[str, Any]]:
+    return [
+        {"partition": name, "entries": db[name].estimated_document_count()}
+        for name in partitions(db)
+    ]
+
+
+def _archive_path(name: str) -> Path:
+    d = Path(get_settings().AUDIT_ARCHIVE_DIR)
+    d.mkdir(parents=True, exist_ok=True)
+    return d / f"{name}.ndjson.gz"
+
+
+def archive_expired_partitions(db: Database, now: Optional[datetime] = None) -> list[str]:
+    """
+    Roll partitions older than the retention window into gzip NDJSON (extended
+    JSON, so ObjectIds and dates round-trip) and drop them. Returns archived names.
+    """
+    now = now or datetime.utcnow()
+    months = get_settings().AUDIT_RETENTION_MONTHS
+    oldest_kept = now.year * 12 + (now.month - 1) - (months - 1)
+    archived = []
+    for name in partitions(db):
+        year, month = _month_key(name)
+        if year * 12 + (month - 1) >= oldest_kept:
+            continue
+        path = _archive_path(name)
+        tmp = path.with_suffix(".part")
+        n = 0
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            for doc in db[name].find().sort([("created_at", 1), ("_id", 1)]).batch_size(1000):
+                f.write(json_util.dumps(doc, json_options=json_util.RELAXED_JSON_OPTIONS))
+                f.write("\n")
+                n += 1
+        if path.exists():
+            # Entries written to this month after an earlier archive run: keep both files
+            path = path.with_name(f"{name}.{now:%Y%m%d%H%M%S}.ndjson.gz")
+        os.replace(tmp, path)
+        db.drop_collection(name)
+        with _ensured_lock:
+            _ensured.discard(name)
+        logger.info("Archived %d audit entries from %s to %s", n, name, path)
+        archived.append(name)
+    if archived:
+        data_version.bump(db, AUDIT_LOGS)
+    return archived
+
+
+def migrate_legacy_audit_logs(db: Database, batch_size: int = 1000) -> int:
+    """Move entries from the unpartitioned audit_logs collection into month partitions. Returns count moved."""
+    moved = 0
+    while True:
+        batch = list(db[AUDIT_LOGS].find().limit(batch_size))
+        if not batch:
+            break
+        by_partition: dict[str, list] = {}
+        for doc in batch:
+            if not doc.get("created_at"):
+                doc["created_at"] = doc["_id"].generation_time.replace(tzinfo=None)
+            by_partition.setdefault(partition_name(doc["created_at"]), []).append(InsertOne(doc))
+        for name, ops in by_partition.items():
+            ensure_partition(db, name)
+            try:
+                db[name].bulk_write(ops, ordered=False)
+            except BulkWriteError as e:
+                # Re-run after an interrupted migration: already-moved entries are duplicates
+                if not _only_duplicates(e):
+                    raise
+        db[AUDIT_LOGS].delete_many({"_id": {"$in": [d["_id"] for d in batch]}})
+        moved += len(batch)
+    if moved:
+        data_version.bump(db, AUDIT_LOGS)
+    return moved
@@ -0,0 +1,52 @@
+"""
+Side effects of candidate lifecycle events, called by every write path
+(onboarding, interview submit, re-interview approval). Pass the session of
+the surrounding transaction so derived data commits together with the change.
+"""
+from typing import Optional
+
+from pymongo.client_session import ClientSession
+from pymongo.database import Database
+
+from database import CANDIDATES, INTERVIEWS
+from services import data_version, kpi_service, rollup_service, interview_snapshot_service
+
+
+def candidate_created(db: Database, candidate: dict, session: Optional[ClientSession] = None) -> None:
+    kpi_service.record_candidate_created(db, candidate, session=session)
+    rollup_service.record_onboarded(db, candidate, session=session)
+    data_version.bump(db, CANDIDATES, session=session)
+
+
+def interview_submitted(
+    db: Database,
+    candidate: dict,
+    decision: str,
+    session: Optional[ClientSession] = None,
+) -> None:
+    """`candidate` is the document as it was before the submit."""
+    kpi_service.record_status_change(db, candidate, "interview_completed", decision, session=session)
+    rollup_service.record_interviewed(db, candidate, decision, session=session)
+    interview_snapshot_service.set_candidate_status(db, candidate["_id"], "interview_completed", session=session)
+    data_version.bump(db, CANDIDATES, INTERVIEWS, session=session)
+
+
+def interviews_submitted(
+    db: Database,
+    items: list[tuple[dict, str]],
+    session: Optional[ClientSession] = None,
+) -> None:
+    """Batch form of interview_submitted: (candidate_before, decision) pairs, one write per derived collection."""
+    if not items:
+        return
+    kpi_service.record_status_changes(db, [(c, "interview_completed", d) for c, d in items], session=session)
+    rollup_service.record_interviewed_many(db, items, session=session)
+    interview_snapshot_service.set_candidates_status(db, [c["_id"] for c, _ in items], "interview_completed", session=session)
+    data_version.bump(db, CANDIDATES, INTERVIEWS, session=session)
+
+
+def re_interview_approved(db: Database, candidate: dict, session: Optional[ClientSession] = None) -> None:
+    """`candidate` is the document as it was before being moved back to yet_to_interview."""
+    kpi_service.record_status_change(db, candidate, "yet_to_interview", candidate.get("decision"), session=session)
+    interview_snapshot_service.set_candidate_status(db, candidate["_id"], "yet_to_interview", session=session)
+    data_version.bump(db, CANDIDATES, INTERVIEWS, session=session)
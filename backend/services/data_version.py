@@ -0,0 +1,24 @@
+"""
+Per-collection data versions: one counter document per collection in
+data_versions (_id = collection name, v = int), bumped by every write path
+that changes reported data. Derived results (report summaries, cached
+exports) are keyed by the versions they were computed from, so they are
+reused until the next such write.
+"""
+from typing import Optional
+
+from pymongo.client_session import ClientSession
+from pymongo.database import Database
+
+from database import DATA_VERSIONS
+
+
+def bump(db: Database, *collections: str, session: Optional[ClientSession] = None) -> None:
+    for collection in collections:
+        db[DATA_VERSIONS].update_one({"_id": collection}, {"$inc": {"v": 1}}, upsert=True, session=session)
+
+
+def current(db: Database, *collections: str) -> tuple[int, ...]:
+    """Versions of the given collections, in order (0 for never written). One query."""
+    found = {d["_id"]: d.get("v", 0) for d in db[DATA_VERSIONS].find({"_id": {"$in": list(collections)}})}
+    return tuple(found.get(c, 0) for c in collections)
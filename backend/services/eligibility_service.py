@@ -6,6 +6,7 @@ from datetime import datetime
 from pymongo.database import Database
 
 from database import CANDIDATES
+from services import data_version
 
 
 def evaluate_eligibility(db: Database, candidate_doc: dict) -> str:
@@ -25,6 +26,7 @@ def evaluate_eligibility(db: Database, candidate_doc: dict) -> str:
         {"_id": candidate_doc["_id"]},
         {"$set": {"eligibility": eligibility, "updated_at": datetime.utcnow()}},
     )
+    data_version.bump(db, CANDIDATES)
     return eligibility
 
 
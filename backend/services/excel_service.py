@@ -1,204 +1,245 @@
 """
-Excel (.xlsx) export for daily recruitment log, interview results, audit logs.
+Report row builders: all candidates, daily recruitment log, interview results, audit logs.
+Each has a stable (header, field) column schema and yields rows from a batched
+cursor; joins are prefetched per batch ($in / one $group), never per row.
+Rendered to xlsx / csv / ndjson by services/export_service.
 """
 from datetime import datetime
-from io import BytesIO
-from typing import Optional
+from typing import Any, Iterable, Iterator, Optional
 
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-from openpyxl.utils import get_column_letter
+from bson import ObjectId
 from pymongo.database import Database
 
-from database import CANDIDATES, INTERVIEWS, AUDIT_LOGS, USERS
+from database import CANDIDATES, INTERVIEWS, USERS
+from services import audit_store
 
+BATCH_SIZE = 500
 
-HEADER_FILL = PatternFill(start_color="0066B3", end_color="0066B3", fill_type="solid")
-HEADER_FONT = Font(bold=True, color="FFFFFF", size=11)
-HEADER_ALIGN = Alignment(horizontal="center", vertical="center", wrap_text=True)
-BORDER = Border(
-    left=Side(style="thin"),
-    right=Side(style="thin"),
-    top=Side(style="thin"),
-    bottom=Side(style="thin"),
-)
 
+def _batches(cursor: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    batch: list[dict] = []
+    for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
 
-def _apply_header(ws, row: int, headers: list):
-    for col, h in enumerate(headers, 1):
-        c = ws.cell(row=row, column=col, value=h)
-        c.fill = HEADER_FILL
-        c.font = HEADER_FONT
-        c.alignment = HEADER_ALIGN
-        c.border = BORDER
 
+def _date_range(from_date: Optional[datetime], to_date: Optional[datetime]) -> dict:
+    q: dict = {}
+    if from_date:
+        q["$gte"] = from_date
+    if to_date:
+        q["$lte"] = to_date.replace(hour=23, minute=59, second=59, microsecond=999999)
+    return q
+
+
+class _UserMap:
+    """Per-request user cache: each user is fetched at most once, in $in batches."""
+
+    def __init__(self, db: Database, fields: tuple[str, ...]):
+        self.db = db
+        self.projection = {f: 1 for f in fields}
+        self.users: dict[ObjectId, dict] = {}
+
+    def load(self, oids: Iterable[Optional[ObjectId]]) -> None:
+        missing = {o for o in oids if o is not None and o not in self.users}
+        if not missing:
+            return
+        for u in self.db[USERS].find({"_id": {"$in": list(missing)}}, self.projection):
+            self.users[u["_id"]] = u
+        for o in missing:
+            self.users.setdefault(o, {})
+
+    def get(self, oid: Optional[ObjectId]) -> dict:
+        return self.users.get(oid, {}) if oid is not None else {}
+
+
+# Stable all-candidates export schema: (header, candidate field)
+CANDIDATE_EXPORT_COLUMNS: list[tuple[str, str]] = [
+    ("Candidate ID", "candidate_id"),
+    ("Name", "name"),
+    ("Gender", "gender"),
+    ("Date of Birth", "dob"),
+    ("Contact No", "contact_no"),
+    ("Email", "email"),
+    ("Residential Address", "residential_address"),
+    ("State of Domicile", "state_of_domicile"),
+    ("Interview Location", "interview_location"),
+    ("Date of Interview", "date_of_interview"),
+    ("Year of Recruitment", "year_of_recruitment"),
+    ("College", "college_name"),
+    ("University", "university_name"),
+    ("Diploma Enrollment No", "diploma_enrollment_no"),
+    ("Diploma Branch", "diploma_branch"),
+    ("Diploma Passout Year", "diploma_passout_year"),
+    ("Diploma %", "diploma_percentage"),
+    ("Backlog in Diploma", "any_backlog_in_diploma"),
+    ("10th %", "tenth_percentage"),
+    ("10th Passout Year", "tenth_passout_year"),
+    ("12th %", "twelfth_percentage"),
+    ("12th Passout Year", "twelfth_passout_year"),
+    ("Onboarding Type", "onboarding_type"),
+    ("Status", "status"),
+    ("Decision", "decision"),
+    ("Interview Notes", "interview_notes"),
+    ("Registered At", "created_at"),
+]
+
+
+def all_candidates_rows(db: Database, batch_size: int = 1000) -> Iterator[list[Any]]:
+    """All candidates newest first, one row per CANDIDATE_EXPORT_COLUMNS, read with a batched cursor."""
+    fields = [f for _, f in CANDIDATE_EXPORT_COLUMNS]
+    cursor = (
+        db[CANDIDATES].find({}, {f: 1 for f in fields})
+        .sort([("created_at", -1), ("_id", -1)])
+        .batch_size(batch_size)
+    )
+    for c in cursor:
+        yield [c.get(f) for f in fields]
+
+
+DAILY_LOG_COLUMNS: list[tuple[str, str]] = [
+    ("Candidate ID", "candidate_id"),
+    ("Name", "name"),
+    ("Role Applied", "role_applied"),
+    ("Registration Date", "created_at"),
+    ("Interview Date", "interview_date"),
+    ("Interviewer", "interviewer_name"),
+    ("Decision", "decision"),
+    ("Status", "status"),
+    ("Eligibility", "eligibility"),
+]
+
+
+def _latest_interviews(db: Database, candidate_oids: list[ObjectId]) -> dict[ObjectId, dict]:
+    """Most recent interview per candidate, one aggregation for the whole batch."""
+    pipeline = [
+        {"$match": {"candidate_oid": {"$in": candidate_oids}}},
+        {"$sort": {"candidate_oid": 1, "interview_date": -1}},
+        {"$group": {
+            "_id": "$candidate_oid",
+            "interview_date": {"$first": "$interview_date"},
+            "interviewer_id": {"$first": "$interviewer_id"},
+            "interviewer_name": {"$first": "$interviewer_name"},
+            "decision": {"$first": "$decision"},
+        }},
+    ]
+    return {row["_id"]: row for row in db[INTERVIEWS].aggregate(pipeline)}
 
-def daily_recruitment_log(
+
+def daily_recruitment_log_rows(
     db: Database,
     from_date: Optional[datetime] = None,
     to_date: Optional[datetime] = None,
-) -> BytesIO:
-    """Excel: Registration date, Interview date, Interviewer, Decision, Status."""
+    batch_size: int = BATCH_SIZE,
+) -> Iterator[list[Any]]:
+    """Registration date, latest interview date, interviewer, decision, status – newest candidates first."""
     q: dict = {}
-    if from_date:
-        q["created_at"] = {"$gte": from_date}
-    if to_date:
-        end = to_date.replace(hour=23, minute=59, second=59, microsecond=999999)
-        q.setdefault("created_at", {})["$lte"] = end
-    candidates = list(db[CANDIDATES].find(q).sort("created_at", -1))
-
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Daily Recruitment Log"
-    headers = [
-        "Candidate ID",
-        "Name",
-        "Role Applied",
-        "Registration Date",
-        "Interview Date",
-        "Interviewer",
-        "Decision",
-        "Status",
-        "Eligibility",
-    ]
-    _apply_header(ws, 1, headers)
-
-    row = 2
-    for c in candidates:
-        cand_oid = c["_id"]
-        inv = db[INTERVIEWS].find_one({"candidate_oid": cand_oid}, sort=[("interview_date", -1)])
-        interview_date = inv.get("interview_date") if inv else None
-        interviewer_name = ""
-        decision = ""
-        if inv:
-            u = db[USERS].find_one({"_id": inv["interviewer_id"]})
-            interviewer_name = u.get("full_name", "") if u else ""
-            decision = inv.get("decision", "")
-
-        ca = c.get("created_at")
-        ws.cell(row=row, column=1, value=c.get("candidate_id", ""))
-        ws.cell(row=row, column=2, value=c.get("name", ""))
-        ws.cell(row=row, column=3, value=c.get("role_applied") or "")
-        ws.cell(row=row, column=4, value=ca.strftime("%Y-%m-%d %H:%M") if ca else "")
-        ws.cell(row=row, column=5, value=interview_date.strftime("%Y-%m-%d %H:%M") if interview_date else "")
-        ws.cell(row=row, column=6, value=interviewer_name)
-        ws.cell(row=row, column=7, value=decision)
-        ws.cell(row=row, column=8, value=c.get("status", ""))
-        ws.cell(row=row, column=9, value=c.get("eligibility") or "")
-        for col in range(1, 10):
-            ws.cell(row=row, column=col).border = BORDER
-        row += 1
-
-    for col in range(1, len(headers) + 1):
-        ws.column_dimensions[get_column_letter(col)].width = 18
-
-    buf = BytesIO()
-    wb.save(buf)
-    buf.seek(0)
-    return buf
-
-
-def interview_results(
+    created = _date_range(from_date, to_date)
+    if created:
+        q["created_at"] = created
+    cursor = (
+        db[CANDIDATES].find(q, {"candidate_id": 1, "name": 1, "role_applied": 1, "created_at": 1, "status": 1, "eligibility": 1})
+        .sort([("created_at", -1), ("_id", -1)])
+        .batch_size(batch_size)
+    )
+    users = _UserMap(db, ("full_name",))
+    for batch in _batches(cursor, batch_size):
+        latest = _latest_interviews(db, [c["_id"] for c in batch])
+        # Interviews predating the snapshot have no interviewer_name; resolve those by id
+        users.load(i.get("interviewer_id") for i in latest.values() if not i.get("interviewer_name"))
+        for c in batch:
+            inv = latest.get(c["_id"]) or {}
+            interviewer = inv.get("interviewer_name") or users.get(inv.get("interviewer_id")).get("full_name", "")
+            yield [
+                c.get("candidate_id", ""),
+                c.get("name", ""),
+                c.get("role_applied") or "",
+                c.get("created_at"),
+                inv.get("interview_date"),
+                interviewer if inv else "",
+                inv.get("decision", ""),
+                c.get("status", ""),
+                c.get("eligibility") or "",
+            ]
+
+
+INTERVIEW_RESULT_COLUMNS: list[tuple[str, str]] = [
+    ("Candidate ID", "candidate_id"),
+    ("Name", "candidate_name"),
+    ("Role Applied", "role_applied"),
+    ("Interview Date", "interview_date"),
+    ("Interviewer", "interviewer_name"),
+    ("Decision", "decision"),
+    ("Notes", "notes"),
+]
+
+
+def interview_results_rows(
     db: Database,
     from_date: Optional[datetime] = None,
     to_date: Optional[datetime] = None,
     role: Optional[str] = None,
     decision: Optional[str] = None,
-) -> BytesIO:
-    """Excel: Interview results with filters."""
+    batch_size: int = BATCH_SIZE,
+) -> Iterator[list[Any]]:
+    """Interview results with filters, newest first. Names come from the interview snapshot (no joins)."""
     q: dict = {}
-    if from_date:
-        q["interview_date"] = {"$gte": from_date}
-    if to_date:
-        end = to_date.replace(hour=23, minute=59, second=59, microsecond=999999)
-        q.setdefault("interview_date", {})["$lte"] = end
+    interviewed = _date_range(from_date, to_date)
+    if interviewed:
+        q["interview_date"] = interviewed
     if decision:
         q["decision"] = decision
     if role:
-        cand_ids = [d["_id"] for d in db[CANDIDATES].find({"role_applied": {"$regex": role, "$options": "i"}}, {"_id": 1})]
-        q["candidate_oid"] = {"$in": cand_ids}
-    interviews = list(db[INTERVIEWS].find(q).sort("interview_date", -1))
-
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Interview Results"
-    headers = [
-        "Candidate ID",
-        "Name",
-        "Role Applied",
-        "Interview Date",
-        "Interviewer",
-        "Decision",
-        "Notes",
-    ]
-    _apply_header(ws, 1, headers)
-
-    row = 2
-    for i in interviews:
-        c = db[CANDIDATES].find_one({"_id": i["candidate_oid"]}) or {}
-        u = db[USERS].find_one({"_id": i["interviewer_id"]}) or {}
-        idt = i.get("interview_date")
-        ws.cell(row=row, column=1, value=c.get("candidate_id", ""))
-        ws.cell(row=row, column=2, value=c.get("name", ""))
-        ws.cell(row=row, column=3, value=c.get("role_applied") or "")
-        ws.cell(row=row, column=4, value=idt.strftime("%Y-%m-%d %H:%M") if idt else "")
-        ws.cell(row=row, column=5, value=u.get("full_name", ""))
-        ws.cell(row=row, column=6, value=i.get("decision", ""))
-        ws.cell(row=row, column=7, value=(i.get("notes") or "")[:500])
-        for col in range(1, 8):
-            ws.cell(row=row, column=col).border = BORDER
-        row += 1
-
-    for col in range(1, len(headers) + 1):
-        ws.column_dimensions[get_column_letter(col)].width = 20
-
-    buf = BytesIO()
-    wb.save(buf)
-    buf.seek(0)
-    return buf
-
-
-def audit_logs_report(
+        q["role_applied"] = {"$regex": role, "$options": "i"}
+    cursor = (
+        db[INTERVIEWS].find(q, {f: 1 for _, f in INTERVIEW_RESULT_COLUMNS})
+        .sort([("interview_date", -1), ("_id", -1)])
+        .batch_size(batch_size)
+    )
+    for i in cursor:
+        yield [
+            i.get("candidate_id", ""),
+            i.get("candidate_name") or "",
+            i.get("role_applied") or "",
+            i.get("interview_date"),
+            i.get("interviewer_name") or "",
+            i.get("decision", ""),
+            (i.get("notes") or "")[:500],
+        ]
+
+
+AUDIT_LOG_COLUMNS: list[tuple[str, str]] = [
+    ("Timestamp", "created_at"),
+    ("User", "user_email"),
+    ("Action", "action"),
+    ("Resource Type", "resource_type"),
+    ("Resource ID", "resource_id"),
+    ("Details", "details"),
+]
+
+
+def audit_logs_rows(
     db: Database,
     from_date: Optional[datetime] = None,
     to_date: Optional[datetime] = None,
-) -> BytesIO:
-    """Excel: Admin audit logs."""
-    q: dict = {}
-    if from_date:
-        q["created_at"] = {"$gte": from_date}
-    if to_date:
-        end = to_date.replace(hour=23, minute=59, second=59, microsecond=999999)
-        q.setdefault("created_at", {})["$lte"] = end
-    logs = list(db[AUDIT_LOGS].find(q).sort("created_at", -1))
-
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Audit Logs"
-    headers = ["Timestamp", "User", "Action", "Resource Type", "Resource ID", "Details"]
-    _apply_header(ws, 1, headers)
-
-    row = 2
-    for log in logs:
-        user_email = "System"
-        if log.get("user_id"):
-            u = db[USERS].find_one({"_id": log["user_id"]})
-            user_email = u.get("email", "System") if u else "System"
-        ca = log.get("created_at")
-        ws.cell(row=row, column=1, value=ca.strftime("%Y-%m-%d %H:%M:%S") if ca else "")
-        ws.cell(row=row, column=2, value=user_email)
-        ws.cell(row=row, column=3, value=log.get("action", ""))
-        ws.cell(row=row, column=4, value=log.get("resource_type") or "")
-        ws.cell(row=row, column=5, value=log.get("resource_id") or "")
-        ws.cell(row=row, column=6, value=str(log.get("details"))[:500] if log.get("details") else "")
-        for col in range(1, 7):
-            ws.cell(row=row, column=col).border = BORDER
-        row += 1
-
-    for col in range(1, 7):
-        ws.column_dimensions[get_column_letter(col)].width = 22
-
-    buf = BytesIO()
-    wb.save(buf)
-    buf.seek(0)
-    return buf
+    batch_size: int = BATCH_SIZE,
+) -> Iterator[list[Any]]:
+    """Admin audit logs, newest first, streamed partition by partition, with user emails from a per-request user map."""
+    created = _date_range(from_date, to_date)
+    cursor = audit_store.iter_entries(db, created.get("$gte"), created.get("$lte"), batch_size=batch_size)
+    users = _UserMap(db, ("email",))
+    for batch in _batches(cursor, batch_size):
+        users.load(log.get("user_id") for log in batch)
+        for log in batch:
+            yield [
+                log.get("created_at"),
+                users.get(log.get("user_id")).get("email", "System"),
+                log.get("action", ""),
+                log.get("resource_type") or "",
+                log.get("resource_id") or "",
+                str(log.get("details"))[:500] if log.get("details") else "",
+            ]
@@ -0,0 +1,256 @@
+"""
+Streaming report export: rows go from a Mongo cursor to the response in
+chunks, so memory stays flat however many rows there are and the first
+bytes leave before the last row is read.
+
+Formats:
+  xlsx    – SpreadsheetML written directly into a zip stream (inline
+            strings, no shared-string table), one sheet, bold header row
+  csv     – header row + one line per row (for HRMS / BI ingestion)
+  ndjson  – one JSON object per row, keyed by column field names
+csv and ndjson can be gzip-compressed on the fly.
+"""
+import csv
+import io
+import json
+import math
+import re
+import zipfile
+import zlib
+from datetime import date, datetime
+from typing import Any, Iterable, Iterator, Sequence
+from xml.sax.saxutils import escape
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+EXPORT_FORMATS = {
+    "xlsx": XLSX_MEDIA_TYPE,
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+GZIP_MEDIA_TYPE = "application/gzip"
+
+# Bytes buffered before a chunk is handed to the response; rows buffered per zip write
+CHUNK_SIZE = 64 * 1024
+ROWS_PER_WRITE = 200
+
+_EPOCH = datetime(1899, 12, 30)
+_ILLEGAL_XML = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+# Cell styles (indexes into cellXfs below)
+_STYLE_HEADER = 1
+_STYLE_DATETIME = 2
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+    '</Relationships>'
+)
+# Header row: bold white on 0066B3 (the portal blue). Datetimes use built-in format 22 (m/d/yy h:mm).
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><color rgb="FFFFFFFF"/><name val="Calibri"/></font></fonts>'
+    '<fills count="3"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill>'
+    '<fill><patternFill patternType="solid"><fgColor rgb="FF0066B3"/><bgColor rgb="FF0066B3"/></patternFill></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="3"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="2" borderId="0" xfId="0" applyFont="1" applyFill="1"/>'
+    '<xf numFmtId="22" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+
+class _Sink(io.RawIOBase):
+    """Non-seekable zip target that collects output until drained."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: list[bytes] = []
+        self.size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._chunks.append(bytes(b))
+        self.size += len(b)
+        return len(b)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        self.size = 0
+        return data
+
+
+def _text(value: Any) -> str:
+    return escape(_ILLEGAL_XML.sub("", str(value)))
+
+
+def _cell(value: Any, style: int = 0) -> str:
+    s = f' s="{style}"' if style else ""
+    if value is None or value == "":
+        return "<c/>"
+    if isinstance(value, bool):
+        return f'<c t="b"{s}><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)) and math.isfinite(value):
+        return f"<c{s}><v>{value}</v></c>"
+    if isinstance(value, datetime):
+        serial = (value.replace(tzinfo=None) - _EPOCH).total_seconds() / 86400
+        return f'<c s="{_STYLE_DATETIME}"><v>{serial}</v></c>'
+    if isinstance(value, date):
+        return _cell(datetime(value.year, value.month, value.day), style)
+    # Cell text limit in Excel is 32767 characters
+    return f'<c t="inlineStr"{s}><is><t xml:space="preserve">{_text(value)[:32767]}</t></is></c>'
+
+
+def _row(values: Sequence[Any], style: int = 0) -> str:
+    return "<row>" + "".join(_cell(v, style) for v in values) + "</row>"
+
+
+def xlsx_stream(
+    sheet_title: str,
+    headers: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    column_width: int = 18,
+) -> Iterator[bytes]:
+    """Yield an .xlsx file in chunks: header row, then one sheet row per item of `rows`."""
+    sink = _Sink()
+    title = _text(re.sub(r"[\[\]:*?/\\]", "", sheet_title)[:31] or "Sheet1")
+    workbook = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        f'<sheets><sheet name="{title}" sheetId="1" r:id="rId1"/></sheets></workbook>'
+    )
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        zf.writestr("_rels/.rels", _ROOT_RELS)
+        zf.writestr("xl/workbook.xml", workbook)
+        zf.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+        zf.writestr("xl/styles.xml", _STYLES)
+        with zf.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write((
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                '<sheetViews><sheetView workbookViewId="0"><pane ySplit="1" topLeftCell="A2" state="frozen"/></sheetView></sheetViews>'
+                f'<cols><col min="1" max="{max(len(headers), 1)}" width="{column_width}" customWidth="1"/></cols>'
+                "<sheetData>" + _row(headers, _STYLE_HEADER)
+            ).encode())
+            pending: list[str] = []
+            for values in rows:
+                pending.append(_row(values))
+                if len(pending) >= ROWS_PER_WRITE:
+                    sheet.write("".join(pending).encode())
+                    pending.clear()
+                    if sink.size >= CHUNK_SIZE:
+                        yield sink.drain()
+            sheet.write(("".join(pending) + "</sheetData></worksheet>").encode())
+    yield sink.drain()
+
+
+def _plain(value: Any) -> Any:
+    """Text-format value: datetimes as ISO 8601, other non-JSON types as strings."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def csv_stream(headers: Sequence[str], rows: Iterable[Sequence[Any]]) -> Iterator[bytes]:
+    """Yield UTF-8 CSV in chunks (BOM first, so Excel detects the encoding)."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    buf.write("\ufeff")
+    writer.writerow(headers)
+    for values in rows:
+        writer.writerow(["" if v is None else _plain(v) for v in values])
+        if buf.tell() >= CHUNK_SIZE:
+            yield buf.getvalue().encode()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue().encode()
+
+
+def ndjson_stream(keys: Sequence[str], rows: Iterable[Sequence[Any]]) -> Iterator[bytes]:
+    """Yield one JSON object per row, in chunks."""
+    pending: list[str] = []
+    size = 0
+    for values in rows:
+        line = json.dumps({k: _plain(v) for k, v in zip(keys, values)}, ensure_ascii=False)
+        pending.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            yield ("\n".join(pending) + "\n").encode()
+            pending.clear()
+            size = 0
+    if pending:
+        yield ("\n".join(pending) + "\n").encode()
+
+
+def gzip_stream(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Gzip a chunk stream on the fly."""
+    z = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    for chunk in chunks:
+        out = z.compress(chunk)
+        if out:
+            yield out
+    yield z.flush()
+
+
+def export_format(fmt: str, gzip: bool = False) -> tuple[str, str]:
+    """(media_type, file extension) of an export. xlsx is already zipped, so gzip is ignored for it."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    if fmt == "xlsx":
+        return XLSX_MEDIA_TYPE, "xlsx"
+    if gzip:
+        return GZIP_MEDIA_TYPE, f"{fmt}.gz"
+    return EXPORT_FORMATS[fmt], fmt
+
+
+def export_stream(
+    fmt: str,
+    title: str,
+    columns: Sequence[tuple[str, str]],
+    rows: Iterable[Sequence[Any]],
+    gzip: bool = False,
+) -> tuple[Iterator[bytes], str, str]:
+    """
+    Chunks of a report in the requested format. `columns` are (header, field)
+    pairs: headers label xlsx/csv columns, fields key ndjson objects.
+    Returns (chunks, media_type, file extension), see export_format.
+    """
+    media_type, ext = export_format(fmt, gzip)
+    headers = [h for h, _ in columns]
+    if fmt == "xlsx":
+        return xlsx_stream(title, headers, rows), media_type, ext
+    if fmt == "csv":
+        chunks = csv_stream(headers, rows)
+    else:
+        chunks = ndjson_stream([f for _, f in columns], rows)
+    if gzip:
+        chunks = gzip_stream(chunks)
+    return chunks, media_type, ext
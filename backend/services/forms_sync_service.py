@@ -11,11 +11,14 @@ import httpx
 from pymongo.database import Database
 
 from config import get_settings
-from database import CANDIDATES
-from utils.candidate_id import generate_candidate_id
+from database import run_transaction, CANDIDATES
+from utils.candidate_id import allocate_candidate_ids
 from services.qr_service import generate_qr_for_candidate
 from services.eligibility_service import evaluate_eligibility
 from models.candidate import candidate_doc
+from services import candidate_events, data_version
+from services.search_service import search_fields, with_search_fields
+from services.interview_snapshot_service import propagate_candidate
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -57,6 +60,10 @@ def _fetch_form_responses(form_id: str, token: str) -> list[dict]:
         return []
 
 
+# Candidate fields a form response can update on an already-ingested candidate
+SYNCED_FIELDS = ("name", "email", "phone", "qualifications", "experience_years", "role_applied")
+
+
 def _map_response_to_candidate(response: dict) -> dict[str, Any]:
     """Map MS Forms response to candidate fields. Adapt keys to your actual form question IDs."""
     answers = response.get("answers", {}) or {}
@@ -102,32 +109,45 @@ def sync_form_responses(db: Database, base_url: str = "") -> tuple[int, int]:
     responses = _fetch_form_responses(settings.MS_FORMS_FORM_ID, token)
     created, updated = 0, 0
 
+    # One lookup for all already-ingested responses instead of one per response
+    rids = [r.get("id") for r in responses if r.get("id")]
+    projection = {"_id": 1, "ms_form_response_id": 1, "candidate_id": 1, **{f: 1 for f in SYNCED_FIELDS}}
+    existing_by_rid = {
+        d["ms_form_response_id"]: d
+        for d in db[CANDIDATES].find({"ms_form_response_id": {"$in": rids}}, projection)
+    } if rids else {}
+
+    new_rows: list[tuple[Optional[str], dict[str, Any]]] = []
     for r in responses:
         rid = r.get("id")
-        existing = db[CANDIDATES].find_one({"ms_form_response_id": rid}) if rid else None
+        existing = existing_by_rid.get(rid) if rid else None
         data = _map_response_to_candidate(r)
 
         if existing:
-            update: dict = {}
-            if data.get("name"):
-                update["name"] = data["name"]
-            if data.get("email") is not None:
-                update["email"] = data["email"]
-            if data.get("phone") is not None:
-                update["phone"] = data["phone"]
-            if data.get("qualifications") is not None:
-                update["qualifications"] = data["qualifications"]
-            if data.get("experience_years") is not None:
-                update["experience_years"] = data["experience_years"]
-            if data.get("role_applied") is not None:
-                update["role_applied"] = data["role_applied"]
+            # Only answered fields that differ: an unchanged response writes nothing,
+            # so re-syncing does not bump data versions or touch interview snapshots
+            update: dict = {
+                f: data[f] for f in SYNCED_FIELDS
+                if data.get(f) not in (None, "") and data[f] != existing.get(f)
+            }
+            if data.get("name") == "Unknown" and existing.get("name"):
+                update.pop("name", None)
             if update:
+                update.update(search_fields({**existing, **update}))
                 update["updated_at"] = datetime.utcnow()
                 db[CANDIDATES].update_one({"_id": existing["_id"]}, {"$set": update})
-            updated += 1
+                data_version.bump(db, CANDIDATES)
+                if "name" in update or "role_applied" in update:
+                    propagate_candidate(db, existing["_id"], name=update.get("name"), role_applied=update.get("role_applied"))
+                updated += 1
             continue
 
-        candidate_id = generate_candidate_id(db, data.get("role_applied"))
+        new_rows.append((rid, data))
+
+    # Reserve all Candidate IDs up front: one counter round trip per prefix
+    candidate_ids = allocate_candidate_ids(db, [data.get("role_applied") for _, data in new_rows])
+
+    for (rid, data), candidate_id in zip(new_rows, candidate_ids):
         doc = candidate_doc(
             candidate_id=candidate_id,
             ms_form_response_id=rid,
@@ -140,8 +160,14 @@ def sync_form_responses(db: Database, base_url: str = "") -> tuple[int, int]:
             status="yet_to_interview",
             eligibility="partial",
         )
-        r = db[CANDIDATES].insert_one(doc)
-        doc["_id"] = r.inserted_id
+        with_search_fields(doc)
+
+        def _insert(session):
+            r = db[CANDIDATES].insert_one(doc, session=session)
+            doc["_id"] = r.inserted_id
+            candidate_events.candidate_created(db, doc, session=session)
+
+        run_transaction(_insert)
         generate_qr_for_candidate(db, doc, base_url)
         evaluate_eligibility(db, doc)
         created += 1
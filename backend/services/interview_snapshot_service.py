@@ -0,0 +1,97 @@
+"""
+Denormalized snapshot on interview documents: candidate_name, role_applied,
+interviewer_name and candidate_status. Written at submit time, propagated
+when the source fields change, and backfilled for older interviews.
+"""
+import logging
+from typing import Any, Optional
+
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.client_session import ClientSession
+from pymongo.database import Database
+
+from database import CANDIDATES, INTERVIEWS, USERS
+from services import data_version
+
+logger = logging.getLogger(__name__)
+
+
+def set_candidate_status(db: Database, candidate_oid: ObjectId, status: str, session: Optional[ClientSession] = None) -> None:
+    """Mirror a candidate status change onto all of the candidate's interviews."""
+    set_candidates_status(db, [candidate_oid], status, session=session)
+
+
+def set_candidates_status(db: Database, candidate_oids: list[ObjectId], status: str, session: Optional[ClientSession] = None) -> None:
+    """set_candidate_status for many candidates in one update."""
+    if not candidate_oids:
+        return
+    db[INTERVIEWS].update_many(
+        {"candidate_oid": {"$in": candidate_oids}, "candidate_status": {"$ne": status}},
+        {"$set": {"candidate_status": status}},
+        session=session,
+    )
+
+
+def propagate_candidate(db: Database, candidate_oid: ObjectId, name: Optional[str] = None, role_applied: Optional[str] = None) -> int:
+    """Refresh candidate_name / role_applied snapshots after a candidate edit."""
+    update: dict[str, Any] = {}
+    if name is not None:
+        update["candidate_name"] = name
+    if role_applied is not None:
+        update["role_applied"] = role_applied
+    if not update:
+        return 0
+    n = db[INTERVIEWS].update_many({"candidate_oid": candidate_oid}, {"$set": update}).modified_count
+    if n:
+        data_version.bump(db, INTERVIEWS)
+    return n
+
+
+def propagate_user_name(db: Database, user_oid: ObjectId, full_name: str) -> int:
+    """Refresh interviewer_name snapshots after a user's full_name changes."""
+    n = db[INTERVIEWS].update_many(
+        {"interviewer_id": user_oid, "interviewer_name": {"$ne": full_name}},
+        {"$set": {"interviewer_name": full_name}},
+    ).modified_count
+    if n:
+        data_version.bump(db, INTERVIEWS)
+    return n
+
+
+def backfill_interview_snapshots(db: Database, batch_size: int = 500) -> int:
+    """
+    Fill the snapshot on interviews written before it existed.
+    Joins are batched: one candidates and one users $in query per batch.
+    Returns number of interviews updated.
+    """
+    updated = 0
+    while True:
+        batch = list(db[INTERVIEWS].find(
+            {"candidate_status": {"$exists": False}},
+            {"candidate_oid": 1, "interviewer_id": 1},
+        ).limit(batch_size))
+        if not batch:
+            return updated
+        cands = {d["_id"]: d for d in db[CANDIDATES].find(
+            {"_id": {"$in": list({i["candidate_oid"] for i in batch})}},
+            {"name": 1, "role_applied": 1, "status": 1},
+        )}
+        users = {d["_id"]: d for d in db[USERS].find(
+            {"_id": {"$in": list({i["interviewer_id"] for i in batch})}},
+            {"full_name": 1},
+        )}
+        ops = []
+        for i in batch:
+            c = cands.get(i["candidate_oid"]) or {}
+            u = users.get(i["interviewer_id"]) or {}
+            ops.append(UpdateOne({"_id": i["_id"]}, {"$set": {
+                "candidate_name": c.get("name", ""),
+                "role_applied": c.get("role_applied"),
+                "interviewer_name": u.get("full_name", ""),
+                # Orphaned interviews get a status no read path matches
+                "candidate_status": c.get("status") or "missing",
+            }}))
+        updated += db[INTERVIEWS].bulk_write(ops, ordered=False).modified_count
+        data_version.bump(db, INTERVIEWS)
+        logger.info("Backfilled interview snapshots: %d", updated)
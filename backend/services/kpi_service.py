@@ -0,0 +1,182 @@
+"""
+Dashboard KPI counters, maintained incrementally on every candidate status change.
+One document in kpi_counters (_id "candidates"):
+  total, yet_to_interview, interview_completed,
+  decision.{shortlist|reject|hold}        – among interview_completed candidates
+  location.{<location>}.{total|yet_to_interview|interview_completed}
+Writers apply $inc deltas inside the same transaction as the status change;
+reconcile_kpis recomputes everything from candidates and repairs drift.
+$inc leaves zero-valued keys behind (e.g. a location with nobody left waiting);
+_nonzero drops them, so stored and recomputed counters compare and read alike.
+Every write also increments `rev`, so reconcile_kpis only replaces the document
+if no delta landed while it was recomputing.
+"""
+from datetime import datetime
+from typing import Any, Optional
+
+from pymongo.client_session import ClientSession
+from pymongo.database import Database
+from pymongo.errors import DuplicateKeyError
+
+from database import CANDIDATES, KPI_COUNTERS
+
+KPI_DOC_ID = "candidates"
+RECONCILE_ATTEMPTS = 5
+
+
+class ReconcileConflict(RuntimeError):
+    """Counters kept changing while reconcile_kpis was recomputing them."""
+STATUSES = ("yet_to_interview", "interview_completed")
+
+
+def _key(value: Optional[str]) -> str:
+    """Counter field name for a free-text value (no dots / leading $ in Mongo paths)."""
+    v = (value or "").strip() or "Unknown"
+    return v.replace(".", "_").replace("$", "_")
+
+
+def _status_inc(inc: dict[str, int], location: Optional[str], status: Optional[str], decision: Optional[str], sign: int) -> None:
+    if status not in STATUSES:
+        return
+    loc = _key(location)
+    inc[status] = inc.get(status, 0) + sign
+    inc[f"location.{loc}.{status}"] = inc.get(f"location.{loc}.{status}", 0) + sign
+    if status == "interview_completed" and decision:
+        inc[f"decision.{_key(decision)}"] = inc.get(f"decision.{_key(decision)}", 0) + sign
+
+
+def _apply(db: Database, inc: dict[str, int], session: Optional[ClientSession]) -> None:
+    inc = {k: v for k, v in inc.items() if v}
+    if not inc:
+        return
+    db[KPI_COUNTERS].update_one(
+        {"_id": KPI_DOC_ID},
+        {"$inc": {**inc, "rev": 1}, "$set": {"updated_at": datetime.utcnow()}},
+        upsert=True,
+        session=session,
+    )
+
+
+def record_candidate_created(db: Database, candidate: dict, session: Optional[ClientSession] = None) -> None:
+    inc = {"total": 1, f"location.{_key(candidate.get('interview_location'))}.total": 1}
+    _status_inc(inc, candidate.get("interview_location"), candidate.get("status"), candidate.get("decision"), 1)
+    _apply(db, inc, session)
+
+
+def record_status_change(
+    db: Database,
+    candidate: dict,
+    new_status: str,
+    new_decision: Optional[str],
+    session: Optional[ClientSession] = None,
+) -> None:
+    """`candidate` is the document as it was before the change."""
+    record_status_changes(db, [(candidate, new_status, new_decision)], session=session)
+
+
+def record_status_changes(
+    db: Database,
+    changes: list[tuple[dict, str, Optional[str]]],
+    session: Optional[ClientSession] = None,
+) -> None:
+    """Many (candidate_before, new_status, new_decision) changes folded into one counter update."""
+    inc: dict[str, int] = {}
+    for candidate, new_status, new_decision in changes:
+        loc = candidate.get("interview_location")
+        _status_inc(inc, loc, candidate.get("status"), candidate.get("decision"), -1)
+        _status_inc(inc, loc, new_status, new_decision, 1)
+    _apply(db, inc, session)
+
+
+def _nonzero(counts: dict[str, Any]) -> dict[str, Any]:
+    """Nested counter map without zero counts or emptied sub-maps."""
+    out: dict[str, Any] = {}
+    for k, v in counts.items():
+        if isinstance(v, dict):
+            v = _nonzero(v)
+        if v:
+            out[k] = v
+    return out
+
+
+def kpis_from_doc(doc: dict) -> dict[str, Any]:
+    """API shape of a kpi_counters document."""
+    return {
+        "yet_to_interview": doc.get("yet_to_interview", 0),
+        "interview_completed": doc.get("interview_completed", 0),
+        "total_candidates": doc.get("total", 0),
+        "by_decision": _nonzero(doc.get("decision", {})),
+        "by_location": _nonzero(doc.get("location", {})),
+    }
+
+
+def read_kpis(db: Database) -> dict[str, Any]:
+    """O(1) KPI read. Builds the counters on first use."""
+    doc = db[KPI_COUNTERS].find_one({"_id": KPI_DOC_ID})
+    if doc is None:
+        reconcile_kpis(db)
+        doc = db[KPI_COUNTERS].find_one({"_id": KPI_DOC_ID}) or {}
+    return kpis_from_doc(doc)
+
+
+def compute_kpis(db: Database) -> dict[str, Any]:
+    """Exact counters from the candidates collection (one aggregation)."""
+    doc: dict[str, Any] = {"total": 0, "yet_to_interview": 0, "interview_completed": 0, "decision": {}, "location": {}}
+    pipeline = [
+        {"$group": {
+            "_id": {"location": "$interview_location", "status": "$status", "decision": "$decision"},
+            "n": {"$sum": 1},
+        }},
+    ]
+    for row in db[CANDIDATES].aggregate(pipeline):
+        g, n = row["_id"], row["n"]
+        status = g.get("status")
+        loc = doc["location"].setdefault(_key(g.get("location")), {})
+        doc["total"] += n
+        loc["total"] = loc.get("total", 0) + n
+        if status in STATUSES:
+            doc[status] += n
+            loc[status] = loc.get(status, 0) + n
+            if status == "interview_completed" and g.get("decision"):
+                dk = _key(g["decision"])
+                doc["decision"][dk] = doc["decision"].get(dk, 0) + n
+    return doc
+
+
+def reconcile_kpis(db: Database) -> dict[str, Any]:
+    """
+    Recompute counters from candidates, overwrite the stored ones, and report the drift found.
+    The overwrite is conditional on `rev` being unchanged since before the recompute;
+    a delta committed in between triggers another pass instead of being lost.
+    """
+    for _ in range(RECONCILE_ATTEMPTS):
+        stored = db[KPI_COUNTERS].find_one({"_id": KPI_DOC_ID})
+        actual = compute_kpis(db)
+        result = _reconcile_against(db, stored, actual)
+        if result is not None:
+            return result
+    raise ReconcileConflict("KPI counters kept changing during reconcile; try again")
+
+
+def _reconcile_against(db: Database, stored: Optional[dict], actual: dict[str, Any]) -> Optional[dict[str, Any]]:
+    """Replace `stored` with `actual` unless it changed since it was read (then None)."""
+    current = stored or {}
+    drift = {}
+    for k in ("total", "yet_to_interview", "interview_completed"):
+        if current.get(k, 0) != actual[k]:
+            drift[k] = {"stored": current.get(k, 0), "actual": actual[k]}
+    for k in ("decision", "location"):
+        actual[k] = _nonzero(actual[k])
+        if _nonzero(current.get(k, {})) != actual[k]:
+            drift[k] = {"stored": _nonzero(current.get(k, {})), "actual": actual[k]}
+    now = datetime.utcnow()
+    doc = {**actual, "rev": current.get("rev", 0) + 1, "updated_at": now, "reconciled_at": now}
+    if stored is None:
+        try:
+            db[KPI_COUNTERS].insert_one({"_id": KPI_DOC_ID, **doc})
+        except DuplicateKeyError:
+            return None
+    # rev None also matches documents written before rev existed
+    elif not db[KPI_COUNTERS].replace_one({"_id": KPI_DOC_ID, "rev": stored.get("rev")}, doc).matched_count:
+        return None
+    return {"drift": drift, "kpis": kpis_from_doc(actual)}
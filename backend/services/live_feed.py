@@ -0,0 +1,175 @@
+"""
+Live dashboard feed: one MongoDB change stream per process, fanned out to
+every connected Server-Sent Events client.
+
+Events:
+  kpis       – full KPI counters after any change to kpi_counters
+  candidate  – a candidate was onboarded or changed status / decision
+Each event id is the change stream resume token. A client reconnecting with
+Last-Event-ID gets the buffered events after it; if the id is too old it gets
+a fresh "kpis" snapshot instead. The watcher itself resumes from its last
+token after network errors.
+
+Change streams need a replica set. For local testing run a single-node one:
+  mongod --replSet rs0 --dbpath <dir>   then in mongosh: rs.initiate()
+"""
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Any, Optional
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from config import get_settings
+from database import get_client, is_replicated, CANDIDATES, KPI_COUNTERS
+from services.kpi_service import kpis_from_doc
+
+logger = logging.getLogger(__name__)
+
+# Events kept for Last-Event-ID replay; per-client queue bound before forcing a resync
+REPLAY_BUFFER_SIZE = 1000
+CLIENT_QUEUE_SIZE = 256
+RESYNC = {"type": "resync"}
+
+_CANDIDATE_FIELDS = ("candidate_id", "name", "status", "decision", "interview_location")
+
+_PIPELINE = [
+    {"$match": {"$or": [
+        {"ns.coll": KPI_COUNTERS, "operationType": {"$in": ["insert", "update", "replace"]}},
+        {"ns.coll": CANDIDATES, "operationType": "insert"},
+        {"ns.coll": CANDIDATES, "operationType": "update", "$or": [
+            {"updateDescription.updatedFields.status": {"$exists": True}},
+            {"updateDescription.updatedFields.decision": {"$exists": True}},
+        ]},
+    ]}},
+    {"$project": {
+        "ns": 1,
+        "operationType": 1,
+        **{f"fullDocument.{f}": 1 for f in _CANDIDATE_FIELDS},
+        **{f"fullDocument.{f}": 1 for f in ("total", "yet_to_interview", "interview_completed", "decision", "location")},
+    }},
+]
+
+
+class Subscription:
+    """One SSE client. Events are delivered onto its event loop's queue."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+
+    def offer(self, event: dict[str, Any]) -> None:
+        """Called on the event loop. A client too slow to keep up is told to resync."""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+
+class LiveFeed:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: set[Subscription] = set()
+        self._buffer: deque[dict[str, Any]] = deque(maxlen=REPLAY_BUFFER_SIZE)
+        self._resume_token: Optional[dict] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def available(self) -> bool:
+        return is_replicated()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="live-feed", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> tuple[Subscription, Optional[list[dict[str, Any]]]]:
+        """
+        Register a client. Returns (subscription, replay); replay is None when
+        the client must start from a snapshot (no or unknown Last-Event-ID).
+        """
+        self.start()
+        sub = Subscription(asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.add(sub)
+            replay = None
+            if last_event_id:
+                ids = [e.get("id") for e in self._buffer]
+                if last_event_id in ids:
+                    replay = list(self._buffer)[ids.index(last_event_id) + 1:]
+        return sub, replay
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    def _publish(self, event: dict[str, Any]) -> None:
+        with self._lock:
+            self._buffer.append(event)
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            try:
+                sub.loop.call_soon_threadsafe(sub.offer, event)
+            except RuntimeError:
+                # Event loop closed under us; the request is gone
+                self.unsubscribe(sub)
+
+    @staticmethod
+    def _to_event(change: dict[str, Any]) -> Optional[dict[str, Any]]:
+        doc = change.get("fullDocument") or {}
+        token = change["_id"].get("_data")
+        if change["ns"]["coll"] == KPI_COUNTERS:
+            return {"id": token, "type": "kpis", "data": kpis_from_doc(doc)}
+        if not doc:
+            return None
+        return {
+            "id": token,
+            "type": "candidate",
+            "data": {"operation": change["operationType"], **{f: doc.get(f) for f in _CANDIDATE_FIELDS}},
+        }
+
+    def _run(self) -> None:
+        db = get_client()[get_settings().MONGODB_DB]
+        backoff = 1.0
+        while not self._stop.is_set():
+            try:
+                with db.watch(
+                    _PIPELINE,
+                    full_document="updateLookup",
+                    resume_after=self._resume_token,
+                    max_await_time_ms=1000,
+                ) as stream:
+                    backoff = 1.0
+                    while not self._stop.is_set() and stream.alive:
+                        change = stream.try_next()
+                        if change is None:
+                            continue
+                        self._resume_token = stream.resume_token
+                        event = self._to_event(change)
+                        if event:
+                            self._publish(event)
+            except OperationFailure as e:
+                if e.code == 286:  # ChangeStreamHistoryLost: restart from now, clients must resync
+                    self._resume_token = None
+                    self._publish(RESYNC)
+                    continue
+                logger.warning("Live feed change stream failed: %s", e)
+            except PyMongoError as e:
+                logger.warning("Live feed change stream interrupted: %s", e)
+            self._stop.wait(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+
+live_feed = LiveFeed()
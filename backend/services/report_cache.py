@@ -0,0 +1,178 @@
+"""
+Report result cache, keyed by report_catalog.report_key (report, normalized
+params, format, data versions of the collections read). A write to any of
+those collections changes the key, so cached files never need invalidating;
+superseded ones simply age out of the LRU.
+
+Two tiers:
+  memory – whole files up to REPORT_CACHE_MEMORY_ITEM_BYTES, LRU within REPORT_CACHE_MEMORY_BYTES
+  disk   – every cached file under REPORT_CACHE_DIR, LRU within REPORT_CACHE_DISK_BYTES
+A miss streams the freshly built report to the client and tees it into the
+disk tier; the file is only admitted once the stream completes.
+"""
+import logging
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class ReportCache:
+    def __init__(self, directory: str, memory_bytes: int, memory_item_bytes: int, disk_bytes: int):
+        self.directory = Path(directory)
+        self.memory_bytes = memory_bytes
+        self.memory_item_bytes = memory_item_bytes
+        self.disk_bytes = disk_bytes
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_size = 0
+        self._disk: "OrderedDict[str, tuple[Path, int]]" = OrderedDict()
+        self._disk_size = 0
+        self._loaded = False
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.memory_evictions = 0
+        self.disk_evictions = 0
+
+    def _load(self) -> None:
+        """Index files left by a previous run, oldest first (called under the lock)."""
+        if self._loaded:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        files = []
+        for p in self.directory.iterdir():
+            if p.suffix == ".part":
+                p.unlink(missing_ok=True)
+            elif p.is_file():
+                st = p.stat()
+                files.append((st.st_mtime, p.name.split(".", 1)[0], p, st.st_size))
+        for _, key, path, size in sorted(files):
+            self._disk[key] = (path, size)
+            self._disk_size += size
+        self._loaded = True
+
+    def _remember(self, key: str, data: bytes) -> None:
+        if len(data) > self.memory_item_bytes:
+            return
+        if key in self._memory:
+            self._memory_size -= len(self._memory.pop(key))
+        self._memory[key] = data
+        self._memory_size += len(data)
+        while self._memory_size > self.memory_bytes and self._memory:
+            _, old = self._memory.popitem(last=False)
+            self._memory_size -= len(old)
+            self.memory_evictions += 1
+
+    def get(self, key: str) -> tuple[Optional[bytes], Optional[Path]]:
+        """(bytes, None) from memory, (None, path) from disk, or (None, None) on a miss."""
+        with self._lock:
+            self._load()
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                if key in self._disk:
+                    self._disk.move_to_end(key)
+                self.memory_hits += 1
+                return data, None
+            entry = self._disk.get(key)
+            if entry is not None and entry[0].exists():
+                path, size = entry
+                self._disk.move_to_end(key)
+                self.disk_hits += 1
+                if size <= self.memory_item_bytes:
+                    self._remember(key, path.read_bytes())
+                return None, path
+            if entry is not None:
+                self._disk_size -= entry[1]
+                del self._disk[key]
+            self.misses += 1
+            return None, None
+
+    def fill(self, key: str, ext: str, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """Pass chunks through to the caller, caching the complete file once the stream ends."""
+        with self._lock:
+            self._load()
+        tmp = self.directory / f"{key}.{uuid.uuid4().hex}.part"
+        complete = False
+        try:
+            with open(tmp, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    yield chunk
+            complete = True
+        finally:
+            if complete:
+                self._admit(key, ext, tmp)
+            else:
+                # Client went away or the build failed: never cache a partial file
+                tmp.unlink(missing_ok=True)
+
+    def _admit(self, key: str, ext: str, tmp: Path) -> None:
+        path = self.directory / f"{key}.{ext}"
+        try:
+            os.replace(tmp, path)
+            size = path.stat().st_size
+        except OSError:
+            logger.exception("Could not store cached report %s", key)
+            tmp.unlink(missing_ok=True)
+            return
+        with self._lock:
+            if key in self._disk:
+                self._disk_size -= self._disk.pop(key)[1]
+            self._disk[key] = (path, size)
+            self._disk_size += size
+            self.stores += 1
+            if size <= self.memory_item_bytes:
+                self._remember(key, path.read_bytes())
+            while self._disk_size > self.disk_bytes and len(self._disk) > 1:
+                old_key, (old_path, old_size) = self._disk.popitem(last=False)
+                old_path.unlink(missing_ok=True)
+                self._disk_size -= old_size
+                if old_key in self._memory:
+                    self._memory_size -= len(self._memory.pop(old_key))
+                self.disk_evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._load()
+            for path, _ in self._disk.values():
+                path.unlink(missing_ok=True)
+            self._disk.clear()
+            self._memory.clear()
+            self._disk_size = self._memory_size = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_size,
+                "memory_max_bytes": self.memory_bytes,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_size,
+                "disk_max_bytes": self.disk_bytes,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+                "stores": self.stores,
+                "memory_evictions": self.memory_evictions,
+                "disk_evictions": self.disk_evictions,
+            }
+
+
+_settings = get_settings()
+report_cache = ReportCache(
+    _settings.REPORT_CACHE_DIR,
+    memory_bytes=_settings.REPORT_CACHE_MEMORY_BYTES,
+    memory_item_bytes=_settings.REPORT_CACHE_MEMORY_ITEM_BYTES,
+    disk_bytes=_settings.REPORT_CACHE_DISK_BYTES,
+)
@@ -0,0 +1,118 @@
+"""
+Catalog of downloadable reports, shared by background report jobs and the
+report cache. Each entry names the query params it accepts, the collections
+whose data versions it depends on, and a build(db, params) returning
+(columns, rows) for services/export_service.
+"""
+import hashlib
+import json
+from datetime import date, datetime, time
+from typing import Any, Callable, Iterable, Optional
+
+from pymongo.database import Database
+
+from database import CANDIDATES, INTERVIEWS, AUDIT_LOGS
+from services import data_version
+from services.excel_service import (
+    CANDIDATE_EXPORT_COLUMNS,
+    DAILY_LOG_COLUMNS,
+    INTERVIEW_RESULT_COLUMNS,
+    AUDIT_LOG_COLUMNS,
+    all_candidates_rows,
+    daily_recruitment_log_rows,
+    interview_results_rows,
+    audit_logs_rows,
+)
+from services.summary_service import SUMMARY_GROUPS, SUMMARY_COUNT_COLUMNS, decision_summary
+
+DATE_PARAMS = ("from_date", "to_date")
+
+Columns = list[tuple[str, str]]
+Build = Callable[[Database, dict[str, str]], tuple[Columns, Iterable[list[Any]]]]
+
+
+def _day(params: dict[str, str], name: str) -> Optional[datetime]:
+    v = params.get(name)
+    return datetime.combine(date.fromisoformat(v), time.min) if v else None
+
+
+def _branch_summary(db: Database, params: dict[str, str]):
+    group_by = params.get("group_by", "branch")
+    _, header = SUMMARY_GROUPS[group_by]
+    rows = [[r["group"], r["shortlist"], r["reject"], r["total"]] for r in decision_summary(db, group_by)]
+    return [(header, group_by), *SUMMARY_COUNT_COLUMNS], rows
+
+
+REPORTS: dict[str, dict[str, Any]] = {
+    "all-candidates": {
+        "title": "All Candidates",
+        "params": (),
+        "collections": (CANDIDATES,),
+        "build": lambda db, p: (CANDIDATE_EXPORT_COLUMNS, all_candidates_rows(db)),
+    },
+    "branch-summary": {
+        "title": "Branch Summary",
+        "params": ("group_by",),
+        "collections": (CANDIDATES,),
+        "build": _branch_summary,
+    },
+    "daily-log": {
+        "title": "Daily Recruitment Log",
+        "params": DATE_PARAMS,
+        "collections": (CANDIDATES, INTERVIEWS),
+        "build": lambda db, p: (
+            DAILY_LOG_COLUMNS,
+            daily_recruitment_log_rows(db, _day(p, "from_date"), _day(p, "to_date")),
+        ),
+    },
+    "interview-results": {
+        "title": "Interview Results",
+        "params": (*DATE_PARAMS, "role", "decision"),
+        "collections": (INTERVIEWS,),
+        "build": lambda db, p: (
+            INTERVIEW_RESULT_COLUMNS,
+            interview_results_rows(db, _day(p, "from_date"), _day(p, "to_date"), role=p.get("role"), decision=p.get("decision")),
+        ),
+    },
+    "audit-logs": {
+        "title": "Audit Logs",
+        "params": DATE_PARAMS,
+        "collections": (AUDIT_LOGS,),
+        "admin_only": True,
+        "build": lambda db, p: (AUDIT_LOG_COLUMNS, audit_logs_rows(db, _day(p, "from_date"), _day(p, "to_date"))),
+    },
+}
+
+
+def normalize_params(report: str, params: dict[str, Any]) -> dict[str, str]:
+    """
+    Keep only the params the report accepts, drop empty ones, sort keys.
+    Raises ValueError for an unknown report or a malformed value.
+    """
+    spec = REPORTS.get(report)
+    if spec is None:
+        raise ValueError(f"Unknown report: {report}")
+    out: dict[str, str] = {}
+    for name in sorted(spec["params"]):
+        v = params.get(name)
+        if v is None or str(v).strip() == "":
+            continue
+        v = str(v).strip()
+        if name in DATE_PARAMS:
+            v = date.fromisoformat(v).isoformat()
+        if name == "group_by" and v not in SUMMARY_GROUPS:
+            raise ValueError(f"Unknown group_by: {v}")
+        out[name] = v
+    return out
+
+
+def data_versions(db: Database, report: str) -> dict[str, int]:
+    """Current data versions of the collections a report reads."""
+    collections = REPORTS[report]["collections"]
+    return dict(zip(collections, data_version.current(db, *collections)))
+
+
+def report_key(report: str, params: dict[str, str], fmt: str, gzip: bool, versions: dict[str, int]) -> str:
+    """Content key: equal keys mean the same rows in the same format."""
+    payload = json.dumps([report, params, fmt, gzip, versions], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
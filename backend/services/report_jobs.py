@@ -0,0 +1,252 @@
+"""
+Background report jobs: a report from services/report_catalog is built by a
+bounded worker pool and written to disk; the client polls the job for
+progress and downloads the finished file.
+
+Identical requests (same report, params, format and data versions) collapse
+onto one job through the unique active_key. Finished artifacts are evicted
+by age and by total size after every build. Running jobs heartbeat as they
+write, and refresh the heartbeat of jobs still queued in the same process; a
+job whose heartbeat stops (e.g. the process restarted) is marked failed on
+next read and no longer collapses new requests.
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.database import Database
+from pymongo.errors import DuplicateKeyError
+
+from config import get_settings
+from database import REPORT_JOBS
+from models.report_job import report_job_doc
+from models.user import UserView
+from services.export_service import export_stream
+from services.report_catalog import REPORTS, data_versions, normalize_params, report_key
+
+logger = logging.getLogger(__name__)
+
+# Progress is written at most this often
+PROGRESS_EVERY_ROWS = 1000
+PROGRESS_EVERY_SECONDS = 1.0
+ACTIVE_STATUSES = ("queued", "running")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+# Jobs submitted to this process's pool that no worker has picked up yet
+_pending: set[ObjectId] = set()
+_pending_lock = threading.Lock()
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=get_settings().REPORT_JOB_WORKERS,
+                thread_name_prefix="report-job",
+            )
+        return _executor
+
+
+def shutdown() -> None:
+    """Stop taking work; queued builds are dropped (their heartbeats go stale)."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+    with _pending_lock:
+        _pending.clear()
+
+
+def artifact_dir() -> Path:
+    d = Path(get_settings().REPORT_ARTIFACT_DIR)
+    d.mkdir(parents=True, exist_ok=True)
+    return d
+
+
+def _retire(db: Database, job: dict, status: str, error: Optional[str] = None) -> bool:
+    """
+    Take a job out of deduplication and delete its artifact, provided it is
+    still in the status it was read with. Returns whether it was retired.
+    """
+    update: dict[str, Any] = {"status": status, "artifact_path": None}
+    if error:
+        update["error"] = error
+    if status == "failed":
+        update["finished_at"] = datetime.utcnow()
+    result = db[REPORT_JOBS].update_one(
+        {"_id": job["_id"], "status": job["status"]},
+        {"$set": update, "$unset": {"active_key": ""}},
+    )
+    if not result.modified_count:
+        return False
+    path = job.get("artifact_path")
+    if path:
+        Path(path).unlink(missing_ok=True)
+    return True
+
+
+def _usable(db: Database, job: dict) -> bool:
+    """Whether an existing job can still serve an identical request; retires it if not."""
+    if job["status"] in ACTIVE_STATUSES:
+        stale_before = datetime.utcnow() - timedelta(seconds=get_settings().REPORT_JOB_STALE_SECONDS)
+        if job.get("heartbeat_at") and job["heartbeat_at"] < stale_before:
+            # A no-op if it moved on since it was read; callers re-read either way
+            _retire(db, job, "failed", error="Report worker stopped")
+            return False
+        return True
+    if job["status"] == "done":
+        if job.get("artifact_path") and Path(job["artifact_path"]).exists():
+            return True
+        _retire(db, job, "expired")
+    return False
+
+
+def submit_job(db: Database, report: str, params: dict[str, Any], fmt: str, gzip: bool, user: UserView) -> tuple[dict, bool]:
+    """
+    Queue a report build, or join an identical one. Returns (job, created).
+    Raises ValueError for an unknown report or bad params.
+    """
+    params = normalize_params(report, params)
+    if fmt == "xlsx":
+        gzip = False
+    versions = data_versions(db, report)
+    key = report_key(report, params, fmt, gzip, versions)
+    for _ in range(3):
+        existing = db[REPORT_JOBS].find_one({"active_key": key})
+        if existing and _usable(db, existing):
+            existing = db[REPORT_JOBS].find_one_and_update(
+                {"_id": existing["_id"]},
+                {"$addToSet": {"requested_by": user.oid}},
+                return_document=ReturnDocument.AFTER,
+            ) or existing
+            return existing, False
+        doc = report_job_doc(report, params, fmt, gzip, user.oid, key, versions)
+        try:
+            doc["_id"] = db[REPORT_JOBS].insert_one(doc).inserted_id
+        except DuplicateKeyError:
+            continue  # an identical request got in first; join it
+        with _pending_lock:
+            _pending.add(doc["_id"])
+        _pool().submit(_run, db, doc["_id"])
+        return doc, True
+    raise RuntimeError("Could not queue report job")
+
+
+def get_job(db: Database, job_id: ObjectId) -> Optional[dict]:
+    job = db[REPORT_JOBS].find_one({"_id": job_id})
+    if job and job["status"] in ACTIVE_STATUSES and not _usable(db, job):
+        job = db[REPORT_JOBS].find_one({"_id": job_id})
+    return job
+
+
+def list_jobs(db: Database, user: UserView, limit: int = 50) -> list[dict]:
+    return list(db[REPORT_JOBS].find({"requested_by": user.oid}).sort("created_at", -1).limit(limit))
+
+
+class _Progress:
+    """Counts rows as they stream and writes a heartbeat now and then."""
+
+    def __init__(self, db: Database, job_id: ObjectId):
+        self.db = db
+        self.job_id = job_id
+        self.rows = 0
+        self.bytes = 0
+        self._last = time.monotonic()
+
+    def count(self, rows: Iterable[list[Any]]) -> Iterator[list[Any]]:
+        for row in rows:
+            self.rows += 1
+            if self.rows % PROGRESS_EVERY_ROWS == 0 and time.monotonic() - self._last >= PROGRESS_EVERY_SECONDS:
+                self.save()
+            yield row
+
+    def save(self, **extra) -> bool:
+        """Write progress (and `extra`) while the job is still running. Returns False if it no longer is."""
+        self._last = time.monotonic()
+        now = datetime.utcnow()
+        result = self.db[REPORT_JOBS].update_one({"_id": self.job_id, "status": "running"}, {"$set": {
+            "rows_written": self.rows,
+            "bytes_written": self.bytes,
+            "heartbeat_at": now,
+            **extra,
+        }})
+        _heartbeat_pending(self.db, now)
+        return bool(result.matched_count)
+
+
+def _heartbeat_pending(db: Database, now: datetime) -> None:
+    """Keep jobs waiting in this process's pool from looking abandoned."""
+    with _pending_lock:
+        pending = list(_pending)
+    if pending:
+        db[REPORT_JOBS].update_many({"_id": {"$in": pending}, "status": "queued"}, {"$set": {"heartbeat_at": now}})
+
+
+def _run(db: Database, job_id: ObjectId) -> None:
+    with _pending_lock:
+        _pending.discard(job_id)
+    now = datetime.utcnow()
+    job = db[REPORT_JOBS].find_one_and_update(
+        {"_id": job_id, "status": "queued"},
+        {"$set": {"status": "running", "started_at": now, "heartbeat_at": now}},
+        return_document=ReturnDocument.AFTER,
+    )
+    if not job:
+        return
+    spec = REPORTS[job["report"]]
+    tmp = artifact_dir() / f"{job_id}.part"
+    progress = _Progress(db, job_id)
+    try:
+        columns, rows = spec["build"](db, job["params"])
+        chunks, media_type, ext = export_stream(job["format"], spec["title"], columns, progress.count(rows), gzip=job["gzip"])
+        with open(tmp, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+                progress.bytes += len(chunk)
+        path = artifact_dir() / f"{job_id}.{ext}"
+        os.replace(tmp, path)
+        done = progress.save(
+            status="done",
+            artifact_path=str(path),
+            filename=f"{job['report']}.{ext}",
+            media_type=media_type,
+            finished_at=datetime.utcnow(),
+        )
+        if not done:
+            # Retired as stale while building; nobody will download this file
+            logger.warning("Report job %s finished after being retired", job_id)
+            path.unlink(missing_ok=True)
+    except Exception as e:
+        logger.exception("Report job %s failed", job_id)
+        tmp.unlink(missing_ok=True)
+        _retire(db, job, "failed", error=str(e)[:500] or type(e).__name__)
+    try:
+        evict_artifacts(db)
+    except Exception:
+        logger.exception("Report artifact eviction failed")
+
+
+def evict_artifacts(db: Database) -> int:
+    """Expire finished jobs older than the max age, then oldest-first beyond the size budget. Returns count expired."""
+    settings = get_settings()
+    cutoff = datetime.utcnow() - timedelta(hours=settings.REPORT_ARTIFACT_MAX_AGE_HOURS)
+    victims = list(db[REPORT_JOBS].find({"status": "done", "finished_at": {"$lt": cutoff}}, {"status": 1, "artifact_path": 1}))
+    total = 0
+    for job in db[REPORT_JOBS].find(
+        {"status": "done", "finished_at": {"$gte": cutoff}},
+        {"status": 1, "artifact_path": 1, "bytes_written": 1},
+    ).sort("finished_at", -1):
+        total += job.get("bytes_written", 0)
+        if total > settings.REPORT_ARTIFACT_MAX_BYTES:
+            victims.append(job)
+    return sum(_retire(db, job, "expired") for job in victims)
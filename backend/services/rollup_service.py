@@ -0,0 +1,183 @@
+"""
+Per-day throughput rollups: one document per (day, interview_location, diploma_branch)
+in daily_rollups, with counters onboarded / interviewed / shortlist / reject / hold.
+Updated incrementally by candidate_events and rebuildable from candidates + interviews.
+Time-series reads only touch the rollups, never the raw collections.
+"""
+from datetime import datetime
+from typing import Any, Optional
+
+from pymongo import UpdateOne
+from pymongo.client_session import ClientSession
+from pymongo.database import Database
+
+from database import CANDIDATES, INTERVIEWS, DAILY_ROLLUPS
+
+COUNTER_FIELDS = ("onboarded", "interviewed", "shortlist", "reject", "hold")
+GROUP_BY_FIELDS = {"none": None, "location": "location", "branch": "branch"}
+
+
+def _day(dt: Optional[datetime]) -> str:
+    return (dt or datetime.utcnow()).strftime("%Y-%m-%d")
+
+
+def _label(value: Optional[str]) -> str:
+    return (value or "").strip() or "Unknown"
+
+
+def _bucket_update(day: str, location: Optional[str], branch: Optional[str], inc: dict[str, int]) -> tuple[dict, dict]:
+    location, branch = _label(location), _label(branch)
+    return (
+        {"_id": f"{day}|{location}|{branch}"},
+        {
+            "$inc": inc,
+            "$setOnInsert": {"day": day, "location": location, "branch": branch},
+            "$set": {"updated_at": datetime.utcnow()},
+        },
+    )
+
+
+def _bump(db: Database, day: str, location, branch, inc: dict[str, int], session: Optional[ClientSession]) -> None:
+    f, u = _bucket_update(day, location, branch, inc)
+    db[DAILY_ROLLUPS].update_one(f, u, upsert=True, session=session)
+
+
+def record_onboarded(db: Database, candidate: dict, session: Optional[ClientSession] = None) -> None:
+    _bump(db, _day(candidate.get("created_at")), candidate.get("interview_location"),
+          candidate.get("diploma_branch"), {"onboarded": 1}, session)
+
+
+def record_interviewed(
+    db: Database,
+    candidate: dict,
+    decision: str,
+    interview_date: Optional[datetime] = None,
+    session: Optional[ClientSession] = None,
+) -> None:
+    inc = {"interviewed": 1}
+    if decision in COUNTER_FIELDS:
+        inc[decision] = 1
+    _bump(db, _day(interview_date), candidate.get("interview_location"),
+          candidate.get("diploma_branch"), inc, session)
+
+
+def record_interviewed_many(
+    db: Database,
+    items: list[tuple[dict, str]],
+    interview_date: Optional[datetime] = None,
+    session: Optional[ClientSession] = None,
+) -> None:
+    """(candidate, decision) pairs: counters summed per bucket, one bulk_write."""
+    day = _day(interview_date)
+    buckets: dict[tuple[str, str], dict[str, int]] = {}
+    for candidate, decision in items:
+        b = buckets.setdefault((_label(candidate.get("interview_location")), _label(candidate.get("diploma_branch"))), {})
+        b["interviewed"] = b.get("interviewed", 0) + 1
+        if decision in COUNTER_FIELDS:
+            b[decision] = b.get(decision, 0) + 1
+    ops = [UpdateOne(*_bucket_update(day, loc, branch, inc), upsert=True) for (loc, branch), inc in buckets.items()]
+    if ops:
+        db[DAILY_ROLLUPS].bulk_write(ops, ordered=False, session=session)
+
+
+def rebuild_rollups(db: Database) -> int:
+    """
+    Recompute every bucket from candidates and interviews. Returns number of buckets written.
+    Runs against live traffic: buckets the incremental path touches after the rebuild
+    starts keep their live counts, and only buckets untouched since then are replaced
+    or, when no longer produced, deleted.
+    """
+    # Before reading anything: a bucket with a later updated_at has live changes
+    # the aggregations below may not include
+    started = datetime.utcnow()
+    buckets: dict[tuple[str, str, str], dict[str, int]] = {}
+
+    def add(day, location, branch, field, n):
+        b = buckets.setdefault((day, _label(location), _label(branch)), {})
+        b[field] = b.get(field, 0) + n
+
+    day_expr = {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}}
+    for row in db[CANDIDATES].aggregate([
+        {"$match": {"created_at": {"$type": "date"}}},
+        {"$group": {
+            "_id": {"day": day_expr, "location": "$interview_location", "branch": "$diploma_branch"},
+            "n": {"$sum": 1},
+        }},
+    ], allowDiskUse=True):
+        g = row["_id"]
+        add(g["day"], g.get("location"), g.get("branch"), "onboarded", row["n"])
+
+    for row in db[INTERVIEWS].aggregate([
+        {"$match": {"interview_date": {"$type": "date"}}},
+        {"$lookup": {
+            "from": CANDIDATES,
+            "localField": "candidate_oid",
+            "foreignField": "_id",
+            "pipeline": [{"$project": {"interview_location": 1, "diploma_branch": 1}}],
+            "as": "cand",
+        }},
+        {"$group": {
+            "_id": {
+                "day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$interview_date"}},
+                "location": {"$first": "$cand.interview_location"},
+                "branch": {"$first": "$cand.diploma_branch"},
+                "decision": "$decision",
+            },
+            "n": {"$sum": 1},
+        }},
+    ], allowDiskUse=True):
+        g = row["_id"]
+        add(g["day"], g.get("location"), g.get("branch"), "interviewed", row["n"])
+        if g.get("decision") in COUNTER_FIELDS:
+            add(g["day"], g.get("location"), g.get("branch"), g["decision"], row["n"])
+
+    # Overwrite buckets in place, then drop the ones no longer produced, so
+    # readers never see an empty or half-written time series
+    untouched = {"$or": [{"updated_at": {"$lt": started}}, {"updated_at": {"$exists": False}}]}
+    now = datetime.utcnow()
+    ops = []
+    for (day, location, branch), counts in buckets.items():
+        _id = f"{day}|{location}|{branch}"
+        doc = {"day": day, "location": location, "branch": branch, "updated_at": now,
+               **{f: counts.get(f, 0) for f in COUNTER_FIELDS}}
+        # Replace an existing bucket only if no live update reached it since `started`;
+        # create a missing one (a no-op if it exists by now)
+        ops.append(UpdateOne({"_id": _id, **untouched}, {"$set": doc}))
+        ops.append(UpdateOne({"_id": _id}, {"$setOnInsert": doc}, upsert=True))
+        if len(ops) >= 1000:
+            db[DAILY_ROLLUPS].bulk_write(ops)
+            ops = []
+    if ops:
+        db[DAILY_ROLLUPS].bulk_write(ops)
+    db[DAILY_ROLLUPS].delete_many(untouched)
+    return len(buckets)
+
+
+def timeseries(
+    db: Database,
+    from_day: str,
+    to_day: str,
+    group_by: str = "none",
+    location: Optional[str] = None,
+    branch: Optional[str] = None,
+) -> list[dict[str, Any]]:
+    """Per-day counters between from_day and to_day (YYYY-MM-DD, inclusive), optionally split by location/branch."""
+    match: dict[str, Any] = {"day": {"$gte": from_day, "$lte": to_day}}
+    if location:
+        match["location"] = location
+    if branch:
+        match["branch"] = branch
+    key: dict[str, Any] = {"day": "$day"}
+    if GROUP_BY_FIELDS[group_by]:
+        key[group_by] = f"${GROUP_BY_FIELDS[group_by]}"
+    pipeline = [
+        {"$match": match},
+        {"$group": {"_id": key, **{f: {"$sum": f"${f}"} for f in COUNTER_FIELDS}}},
+        {"$sort": {"_id.day": 1}},
+    ]
+    out = []
+    for row in db[DAILY_ROLLUPS].aggregate(pipeline):
+        item = dict(row["_id"])
+        item.update({f: row.get(f, 0) for f in COUNTER_FIELDS})
+        out.append(item)
+    return out
@@ -0,0 +1,320 @@
+"""
+Candidate search index: normalized prefix and trigram tokens per candidate.
+Stored on the candidate document as `search_grams` (multikey index), so
+/api/candidates/search is served by an index instead of an unanchored $regex.
+
+Tokens:
+  p:<x>   – 1 and 2 character prefixes of every word in name/email/candidate_id
+  t:<xyz> – trigrams of the lower-cased name, email and candidate_id
+Candidate ID prefixes are read first from the candidate_id index, in ID
+order, so exact-ID and ID-prefix hits are never crowded out. Terms of 3+
+characters must then contain all of their trigrams; 1–2 character terms read
+word-prefix hits, then fall back to a bounded case-insensitive substring scan.
+At most SEARCH_SCAN_LIMIT hits are read; past that the result is flagged
+truncated. Matches are verified and ranked in Python:
+exact Candidate ID > prefix > substring.
+
+Fuzzy name mode: `name_keys` holds transliteration-tolerant phonetic keys
+for each name word and adjacent word pair ("Mohd"/"Mohammed" -> "md",
+"Shreya"/"Sreya" -> "sr"). A fuzzy query only reads the block of candidates
+sharing a key, then scores them by trigram similarity of the names.
+"""
+import re
+import unicodedata
+
+from pymongo import UpdateOne
+from pymongo.database import Database
+
+from database import CANDIDATES
+
+SEARCH_FIELD = "search_grams"
+NAME_KEYS_FIELD = "name_keys"
+SEARCH_SOURCE_FIELDS = ("name", "email", "candidate_id")
+# Upper bound on index hits ranked per query
+SEARCH_SCAN_LIMIT = 1000
+# Trigrams used in the $all filter; the rest are checked by substring verification
+MAX_QUERY_TRIGRAMS = 8
+
+RANK_EXACT_ID = 3
+RANK_PREFIX = 2
+RANK_SUBSTRING = 1
+
+# Fuzzy mode: block rows ranked per query, minimum score returned, max results
+FUZZY_SCAN_LIMIT = 500
+FUZZY_MIN_SCORE = 0.35
+FUZZY_MAX_RESULTS = 50
+
+_WORD_SPLIT = re.compile(r"[^0-9a-z]+")
+
+# Common abbreviations / spellings folded to one form before scoring
+NAME_ALIASES = {
+    "md": "mohammed",
+    "mohd": "mohammed",
+    "mohamed": "mohammed",
+    "mohammad": "mohammed",
+    "muhammad": "mohammed",
+    "muhammed": "mohammed",
+    "mohamad": "mohammed",
+}
+
+# Transliteration folds, applied in order (aspirates, sibilants, c/k/q, v/w, j/z)
+_PHONETIC_RULES = (
+    ("ksh", "ks"),
+    ("sh", "s"),
+    ("ch", "c"),
+    ("ph", "f"),
+    ("bh", "b"),
+    ("dh", "d"),
+    ("th", "t"),
+    ("kh", "k"),
+    ("gh", "g"),
+    ("jh", "j"),
+    ("x", "ks"),
+    ("q", "k"),
+    ("c", "k"),
+    ("w", "v"),
+    ("z", "j"),
+)
+_VOWELS = set("aeiouy")
+
+
+def _normalize(s: str | None) -> str:
+    """Lower-case, strip accents, collapse whitespace."""
+    if not s:
+        return ""
+    s = unicodedata.normalize("NFKD", str(s))
+    s = "".join(ch for ch in s if not unicodedata.combining(ch))
+    return " ".join(s.lower().split())
+
+
+def _trigrams(s: str) -> set[str]:
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+
+def _words(s: str) -> list[str]:
+    return [w for w in _WORD_SPLIT.split(s) if w]
+
+
+def _name_words(name: str | None) -> list[str]:
+    words = [w for w in _words(_normalize(name)) if not w.isdigit()]
+    return [NAME_ALIASES.get(w, w) for w in words]
+
+
+def _fold(word: str) -> str:
+    """Apply transliteration folds and collapse doubled letters ("ee" -> "e")."""
+    w = word
+    for src, dst in _PHONETIC_RULES:
+        w = w.replace(src, dst)
+    out = ""
+    for ch in w:
+        if not out or ch != out[-1]:
+            out += ch
+    return out
+
+
+def phonetic_key(word: str) -> str:
+    """Consonant skeleton of a name word after transliteration folds."""
+    w = _fold(word)
+    if not w:
+        return ""
+    head = "a" if w[0] in _VOWELS else w[0]
+    # Silent/aspirate h and vowels carry little signal across spellings
+    tail = [ch for ch in w[1:] if ch not in _VOWELS and ch != "h"]
+    key = head
+    for ch in tail:
+        if ch != key[-1]:
+            key += ch
+    return key
+
+
+def name_keys(name: str | None) -> list[str]:
+    """Phonetic keys for each name word and each adjacent word pair."""
+    keys = [phonetic_key(w) for w in _name_words(name)]
+    keys = [k for k in keys if k]
+    out = set(keys)
+    out.update(f"{a}|{b}" for a, b in zip(keys, keys[1:]))
+    return sorted(out)
+
+
+def name_similarity(a: str | None, b: str | None) -> float:
+    """Trigram (Jaccard) similarity of two names after alias and transliteration folding; 0..1."""
+    def grams(name):
+        g: set[str] = set()
+        for w in _name_words(name):
+            g.update(_trigrams(f"  {_fold(w)} "))
+        return g
+    ga, gb = grams(a), grams(b)
+    if not ga or not gb:
+        return 0.0
+    return len(ga & gb) / len(ga | gb)
+
+
+def search_tokens(doc: dict) -> list[str]:
+    """Compute the search_grams tokens for a candidate document."""
+    tokens: set[str] = set()
+    for field in SEARCH_SOURCE_FIELDS:
+        value = _normalize(doc.get(field))
+        if not value:
+            continue
+        tokens.update(f"t:{g}" for g in _trigrams(value))
+        for w in _words(value):
+            tokens.add(f"p:{w[:1]}")
+            if len(w) > 1:
+                tokens.add(f"p:{w[:2]}")
+    return sorted(tokens)
+
+
+def search_fields(doc: dict) -> dict[str, list[str]]:
+    """All precomputed search fields for a candidate document."""
+    return {SEARCH_FIELD: search_tokens(doc), NAME_KEYS_FIELD: name_keys(doc.get("name"))}
+
+
+def with_search_fields(doc: dict) -> dict:
+    """Set search_grams and name_keys on a candidate document (in place) and return it."""
+    doc.update(search_fields(doc))
+    return doc
+
+
+def _query_filters(q: str, term: str) -> list[dict]:
+    """Index reads for a term, most specific first."""
+    # Candidate IDs are stored upper-case; an anchored regex is a candidate_id index range
+    filters = [{"candidate_id": {"$regex": f"^{re.escape(q.strip().upper())}"}}]
+    if len(term) >= 3:
+        grams = sorted(_trigrams(term))
+        if len(grams) > MAX_QUERY_TRIGRAMS:
+            # Spread the picks across the term so the filter stays selective
+            step = len(grams) / MAX_QUERY_TRIGRAMS
+            grams = [grams[int(i * step)] for i in range(MAX_QUERY_TRIGRAMS)]
+        filters.append({SEARCH_FIELD: {"$all": [f"t:{g}" for g in grams]}})
+        return filters
+    words = _words(term)
+    if words:
+        filters.append({SEARCH_FIELD: f"p:{words[0][:2]}"})
+    # Short terms keep substring semantics; the scan stops at SEARCH_SCAN_LIMIT hits
+    pattern = re.escape(q.strip())
+    filters.append({"$or": [{field: {"$regex": pattern, "$options": "i"}} for field in SEARCH_SOURCE_FIELDS]})
+    return filters
+
+
+def _rank(doc: dict, term: str) -> int:
+    """0 if the document does not actually match the term."""
+    cid = _normalize(doc.get("candidate_id"))
+    if cid and cid == term:
+        return RANK_EXACT_ID
+    best = 0
+    for field in SEARCH_SOURCE_FIELDS:
+        value = _normalize(doc.get(field))
+        if not value:
+            continue
+        if value.startswith(term) or any(w.startswith(term) for w in _words(value)):
+            return RANK_PREFIX
+        if term in value:
+            best = RANK_SUBSTRING
+    return best
+
+
+def search_candidates(
+    db: Database,
+    q: str,
+    skip: int = 0,
+    limit: int = 50,
+    extra_filter: dict | None = None,
+    projection: dict | None = None,
+) -> tuple[list[dict], int, bool]:
+    """
+    Ranked, paginated candidate search. Returns (page of documents, total matches, truncated).
+    At most SEARCH_SCAN_LIMIT index hits are ranked; `truncated` is True when that cap was
+    reached, in which case total is a lower bound. `projection` applies to the page fetch.
+    """
+    term = _normalize(q)
+    if not term:
+        return [], 0, False
+    scan_projection = {field: 1 for field in SEARCH_SOURCE_FIELDS}
+    hits: dict = {}
+    truncated = False
+    for f in _query_filters(q, term):
+        budget = SEARCH_SCAN_LIMIT - len(hits)
+        if budget <= 0:
+            truncated = True
+            break
+        clauses = [f]
+        if hits:
+            clauses.append({"_id": {"$nin": list(hits)}})
+        if extra_filter:
+            clauses.append(extra_filter)
+        cursor = db[CANDIDATES].find({"$and": clauses}, scan_projection)
+        if "candidate_id" in f:
+            cursor = cursor.sort("candidate_id", 1)
+        read = 0
+        for d in cursor.limit(budget):
+            hits[d["_id"]] = d
+            read += 1
+        if read == budget:
+            truncated = True
+            break
+    ranked = []
+    for d in hits.values():
+        score = _rank(d, term)
+        if score:
+            ranked.append((score, d))
+    ranked.sort(key=lambda x: (-x[0], _normalize(x[1].get("name")), x[1].get("candidate_id") or ""))
+    page_ids = [d["_id"] for _, d in ranked[skip:skip + limit]]
+    if not page_ids:
+        return [], len(ranked), truncated
+    by_id = {d["_id"]: d for d in db[CANDIDATES].find({"_id": {"$in": page_ids}}, projection)}
+    return [by_id[i] for i in page_ids if i in by_id], len(ranked), truncated
+
+
+def fuzzy_search_candidates(
+    db: Database,
+    q: str,
+    limit: int = FUZZY_MAX_RESULTS,
+    extra_filter: dict | None = None,
+    projection: dict | None = None,
+) -> list[tuple[float, dict]]:
+    """
+    Misspelling-tolerant name lookup. Returns up to `limit` (score, document)
+    pairs, best first. Only candidates sharing a phonetic key with the query are read.
+    """
+    keys = name_keys(q)
+    if not keys:
+        return []
+    match: dict = {NAME_KEYS_FIELD: {"$in": keys}}
+    if extra_filter:
+        match.update(extra_filter)
+    pipeline = [
+        {"$match": match},
+        {"$project": {
+            "name": 1,
+            "overlap": {"$size": {"$setIntersection": [f"${NAME_KEYS_FIELD}", keys]}},
+        }},
+        {"$sort": {"overlap": -1}},
+        {"$limit": FUZZY_SCAN_LIMIT},
+    ]
+    scored = []
+    for d in db[CANDIDATES].aggregate(pipeline):
+        # Mostly spelling similarity; key overlap breaks ties between block members
+        score = 0.75 * name_similarity(q, d.get("name")) + 0.25 * (d["overlap"] / len(keys))
+        if score >= FUZZY_MIN_SCORE:
+            scored.append((round(score, 3), d["_id"]))
+    scored.sort(key=lambda x: -x[0])
+    scored = scored[:min(limit, FUZZY_MAX_RESULTS)]
+    if not scored:
+        return []
+    by_id = {d["_id"]: d for d in db[CANDIDATES].find({"_id": {"$in": [i for _, i in scored]}}, projection)}
+    return [(score, by_id[i]) for score, i in scored if i in by_id]
+
+
+def rebuild_search_index(db: Database, batch_size: int = 1000) -> int:
+    """(Re)compute search fields for every candidate. Returns number of documents updated."""
+    projection = {field: 1 for field in SEARCH_SOURCE_FIELDS}
+    ops: list[UpdateOne] = []
+    n = 0
+    for d in db[CANDIDATES].find({}, projection).batch_size(batch_size):
+        ops.append(UpdateOne({"_id": d["_id"]}, {"$set": search_fields(d)}))
+        if len(ops) >= batch_size:
+            n += db[CANDIDATES].bulk_write(ops, ordered=False).modified_count
+            ops = []
+    if ops:
+        n += db[CANDIDATES].bulk_write(ops, ordered=False).modified_count
+    return n
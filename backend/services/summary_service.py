@@ -0,0 +1,62 @@
+"""
+Decision summaries (shortlisted / not shortlisted / total) grouped by a
+candidate field, tallied by a server-side $group over just that field and
+the decision. Results are cached per process, keyed by the candidates data
+version, so repeated downloads skip the aggregation until a candidate write lands.
+"""
+from typing import Any
+
+from pymongo.database import Database
+
+from database import CANDIDATES
+from services import data_version
+from utils.cache import TTLCache
+
+# group_by name -> (candidate field, column header)
+SUMMARY_GROUPS: dict[str, tuple[str, str]] = {
+    "branch": ("diploma_branch", "Branch"),
+    "location": ("interview_location", "Interview Location"),
+    "state": ("state_of_domicile", "State of Domicile"),
+    "college": ("college_name", "College"),
+}
+
+# Count columns of every summary, after the group column
+SUMMARY_COUNT_COLUMNS: list[tuple[str, str]] = [
+    ("Shortlisted", "shortlist"),
+    ("Not-Shortlisted", "reject"),
+    ("Grand Total", "total"),
+]
+
+# Version-keyed, so the TTL only bounds staleness from writes that bypass data_version
+_summary_cache = TTLCache(maxsize=64, ttl=600.0)
+
+
+def _compute(db: Database, field: str) -> list[dict[str, Any]]:
+    pipeline = [
+        {"$project": {"_id": 0, field: 1, "decision": 1}},
+        {"$group": {
+            "_id": f"${field}",
+            "shortlist": {"$sum": {"$cond": [{"$eq": ["$decision", "shortlist"]}, 1, 0]}},
+            "reject": {"$sum": {"$cond": [{"$eq": ["$decision", "reject"]}, 1, 0]}},
+            "total": {"$sum": 1},
+        }},
+    ]
+    merged: dict[str, dict[str, int]] = {}
+    for row in db[CANDIDATES].aggregate(pipeline):
+        # Missing, null and "" all report as Unknown
+        label = row["_id"] if isinstance(row["_id"], str) and row["_id"].strip() else "Unknown"
+        m = merged.setdefault(label, {"shortlist": 0, "reject": 0, "total": 0})
+        for k in m:
+            m[k] += row[k]
+    return [{"group": label, **counts} for label, counts in sorted(merged.items())]
+
+
+def decision_summary(db: Database, group_by: str = "branch") -> list[dict[str, Any]]:
+    """[{group, shortlist, reject, total}] sorted by group label."""
+    field, _ = SUMMARY_GROUPS[group_by]
+    key = (group_by, data_version.current(db, CANDIDATES))
+    rows = _summary_cache.get(key)
+    if rows is None:
+        rows = _compute(db, field)
+        _summary_cache.set(key, rows)
+    return rows
@@ -0,0 +1,154 @@
+"""
+Test harness: the FastAPI app and services against an in-memory mongomock
+database with every migration applied, running as a standalone server
+(run_transaction calls back with session=None).
+
+mongomock applies each write under its own store lock, but not a
+find-and-modify or a unique-index check as one step, and its bulk_write
+predates pymongo's UpdateOne(sort=). The `db` fixture serializes writes, as
+the server's per-document atomicity would, and replays bulk ops one by one.
+
+Benchmarks (marker `benchmark`) run at small sizes on mongomock. Set
+BENCH_SIZES (e.g. "100,10000,500000") to change the sizes, and
+TEST_MONGODB_URI to run them against a real server (a throwaway database
+named TEST_MONGODB_DB, default "tpeml_bench", is dropped before each size).
+"""
+import os
+import threading
+import uuid
+from collections import Counter
+from types import SimpleNamespace
+
+import mongomock
+import pytest
+from fastapi.testclient import TestClient
+from pymongo import DeleteMany, DeleteOne, InsertOne, MongoClient, ReplaceOne, UpdateMany, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+import database
+import main
+from auth.jwt import create_access_token
+from migrations import apply_migrations
+from models.user import UserView, user_doc
+
+_write_lock = threading.RLock()
+_WRITE_METHODS = ("_insert", "_update", "_find_and_modify", "_delete")
+# Collection methods that are one round trip to the server
+ROUND_TRIPS = (
+    "find", "find_one", "aggregate", "count_documents", "distinct",
+    "insert_one", "insert_many", "update_one", "update_many", "replace_one",
+    "delete_one", "delete_many", "bulk_write",
+    "find_one_and_update", "find_one_and_delete", "find_one_and_replace",
+)
+
+
+def _serialized(fn):
+    def wrapper(self, *args, **kwargs):
+        with _write_lock:
+            return fn(self, *args, **kwargs)
+    return wrapper
+
+
+def _bulk_write(self, requests, ordered=True, session=None, **kwargs):
+    res = SimpleNamespace(inserted_count=0, matched_count=0, modified_count=0, deleted_count=0, upserted_count=0)
+    errors = []
+    for n, op in enumerate(requests):
+        try:
+            if isinstance(op, InsertOne):
+                self.insert_one(op._doc)
+                res.inserted_count += 1
+            elif isinstance(op, (UpdateOne, UpdateMany, ReplaceOne)):
+                write = {UpdateOne: self.update_one, UpdateMany: self.update_many, ReplaceOne: self.replace_one}[type(op)]
+                r = write(op._filter, op._doc, upsert=bool(op._upsert))
+                res.matched_count += r.matched_count
+                res.modified_count += r.modified_count
+                res.upserted_count += r.upserted_id is not None
+            elif isinstance(op, (DeleteOne, DeleteMany)):
+                write = self.delete_one if isinstance(op, DeleteOne) else self.delete_many
+                res.deleted_count += write(op._filter).deleted_count
+        except DuplicateKeyError as e:
+            errors.append({"index": n, "code": 11000, "errmsg": str(e)})
+            if ordered:
+                break
+    if errors:
+        raise BulkWriteError({"writeErrors": errors, "nInserted": res.inserted_count})
+    return res
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """Fresh migrated in-memory database, also served to the app through get_db."""
+    for name in _WRITE_METHODS:
+        monkeypatch.setattr(mongomock.collection.Collection, name, _serialized(getattr(mongomock.collection.Collection, name)))
+    monkeypatch.setattr(mongomock.collection.Collection, "bulk_write", _bulk_write)
+    monkeypatch.setattr(database, "is_replicated", lambda: False)
+    d = mongomock.MongoClient().tpeml_test
+    apply_migrations(d)
+    main.app.dependency_overrides[database.get_db] = lambda: d
+    yield d
+    main.app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def client(db):
+    return TestClient(main.app)
+
+
+@pytest.fixture
+def login(db):
+    """login(role) -> (UserView, Authorization headers) for a new user."""
+    def _login(role: str = "interviewer"):
+        email = f"{role}-{uuid.uuid4().hex[:8]}@example.com"
+        r = db[database.USERS].insert_one(user_doc(email, "x", f"{role.title()} User", role))
+        user = UserView(r.inserted_id, str(r.inserted_id), email, "x", f"{role.title()} User", role)
+        return user, {"Authorization": f"Bearer {create_access_token({'sub': email})}"}
+    return _login
+
+
+@pytest.fixture
+def round_trips(monkeypatch):
+    """Counter of (collection, method) for every round trip made while the test runs."""
+    calls: Counter = Counter()
+    # mongomock implements some methods on top of others (find_one -> find); count the outermost only
+    depth = threading.local()
+    for name in ROUND_TRIPS:
+        original = getattr(mongomock.collection.Collection, name)
+
+        def counted(self, *args, _original=original, _name=name, **kwargs):
+            if not getattr(depth, "n", 0):
+                calls[(self.name, _name)] += 1
+            depth.n = getattr(depth, "n", 0) + 1
+            try:
+                return _original(self, *args, **kwargs)
+            finally:
+                depth.n -= 1
+        monkeypatch.setattr(mongomock.collection.Collection, name, counted)
+    return calls
+
+
+def bench_sizes(default: str) -> list[int]:
+    return [int(s) for s in os.environ.get("BENCH_SIZES", default).split(",")]
+
+
+@pytest.fixture
+def bench_db(db):
+    """
+    bench_db() -> an empty database per benchmark size: a migrated one on the real server
+    when TEST_MONGODB_URI is set, else a bare mongomock one (its unique-index checks scan
+    the collection on every insert, so bulk loading a migrated one is quadratic).
+    """
+    uri = os.environ.get("TEST_MONGODB_URI")
+    if not uri:
+        yield lambda: mongomock.MongoClient().tpeml_bench
+        return
+    client = MongoClient(uri)
+    name = os.environ.get("TEST_MONGODB_DB", "tpeml_bench")
+
+    def _real():
+        client.drop_database(name)
+        d = client[name]
+        apply_migrations(d)
+        return d
+    yield _real
+    client.drop_database(name)
+    client.close()
@@ -0,0 +1,68 @@
+"""Counter-backed Candidate IDs: unique under concurrency, seeded from existing IDs, O(1) per allocation."""
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+
+from database import CANDIDATES, COUNTERS
+from utils.candidate_id import allocate_candidate_ids, generate_candidate_id, seed_candidate_id_counters
+
+from conftest import bench_sizes
+
+YEAR = datetime.utcnow().year
+
+
+def _existing(db, n, prefix="ENG"):
+    for start in range(0, n, 10000):
+        db[CANDIDATES].insert_many([
+            {"candidate_id": f"TPEML-{YEAR}-{prefix}-{i:05d}", "name": f"Candidate {i}"}
+            for i in range(start + 1, min(n, start + 10000) + 1)
+        ])
+
+
+def test_concurrent_ids_are_unique_and_dense(db):
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        ids = list(pool.map(lambda _: generate_candidate_id(db, "Engineering"), range(400)))
+    assert len(set(ids)) == 400
+    assert sorted(int(i.rsplit("-", 1)[1]) for i in ids) == list(range(1, 401))
+
+
+def test_counter_is_seeded_from_existing_ids(db):
+    _existing(db, 412)
+    _existing(db, 7, prefix="HR")
+    assert generate_candidate_id(db, "Engineering") == f"TPEML-{YEAR}-ENG-00413"
+    assert seed_candidate_id_counters(db) == 2
+    # Seeding never moves a counter back
+    assert db[COUNTERS].find_one({"_id": f"candidate_id:{YEAR}:ENG"})["seq"] == 413
+    assert allocate_candidate_ids(db, ["hr", "Engineering", "HR"]) == [
+        f"TPEML-{YEAR}-HR-00008", f"TPEML-{YEAR}-ENG-00414", f"TPEML-{YEAR}-HR-00009",
+    ]
+
+
+def test_allocation_is_one_round_trip(db, round_trips):
+    _existing(db, 300)
+    generate_candidate_id(db, "Engineering")  # seeds the counter
+    round_trips.clear()
+    generate_candidate_id(db, "Engineering")
+    assert dict(round_trips) == {(COUNTERS, "find_one_and_update"): 1}
+
+
+@pytest.mark.benchmark
+def test_allocation_latency_is_flat(bench_db):
+    """p95 of generate_candidate_id as the year's intake grows."""
+    p95 = {}
+    for size in bench_sizes("100,2000,20000"):
+        db = bench_db()
+        _existing(db, size)
+        generate_candidate_id(db, "Engineering")
+        samples = []
+        for _ in range(200):
+            t = time.perf_counter()
+            generate_candidate_id(db, "Engineering")
+            samples.append(time.perf_counter() - t)
+        p95[size] = statistics.quantiles(samples, n=20)[-1]
+        print(f"candidates={size:>8} allocation p95={p95[size] * 1000:.3f}ms")
+    sizes = sorted(p95)
+    assert p95[sizes[-1]] <= 3 * p95[sizes[0]] + 0.002
@@ -0,0 +1,48 @@
+"""GET /api/interviews/completed: a constant number of round trips, whatever the number of rows."""
+from database import CANDIDATES
+from models.candidate import candidate_doc
+from services import candidate_events
+
+
+def _complete(client, db, headers, start, n):
+    for i in range(start, start + n):
+        doc = candidate_doc(f"TPEML-2026-ENG-{i:05d}", f"Candidate {i}", interview_location="Pune")
+        doc["_id"] = db[CANDIDATES].insert_one(doc).inserted_id
+        candidate_events.candidate_created(db, doc)
+        decision = ("shortlist", "reject", "hold")[i % 3]
+        r = client.post("/api/interviews/submit", json={"candidate_id": doc["candidate_id"], "decision": decision}, headers=headers)
+        assert r.status_code == 200
+
+
+def _round_trips(client, round_trips, url, headers):
+    client.get(url, headers=headers)  # warm the auth cache
+    round_trips.clear()
+    r = client.get(url, headers=headers)
+    assert r.status_code == 200
+    return r.json(), dict(round_trips)
+
+
+def test_completed_list_round_trips_do_not_grow_with_rows(db, client, login, round_trips):
+    _, h = login("interviewer")
+    _complete(client, db, h, 0, 5)
+    small, small_calls = _round_trips(client, round_trips, "/api/interviews/completed", h)
+    _complete(client, db, h, 5, 55)
+    large, large_calls = _round_trips(client, round_trips, "/api/interviews/completed", h)
+
+    assert small["total"] == 5 and large["total"] == 60
+    assert small_calls == large_calls == {("interviews", "find"): 1}
+    row = large["interviews"][0]
+    assert row["candidate_name"] and row["interviewer_name"]
+
+
+def test_completed_list_pages_in_one_round_trip_each(db, client, login, round_trips):
+    _, h = login("interviewer")
+    _complete(client, db, h, 0, 25)
+    seen = []
+    url = "/api/interviews/completed?decision=shortlist&limit=3"
+    while url:
+        page, calls = _round_trips(client, round_trips, url, h)
+        assert calls == {("interviews", "find"): 1}
+        seen += [i["id"] for i in page["interviews"]]
+        url = page["next_cursor"] and f"/api/interviews/completed?decision=shortlist&limit=3&cursor={page['next_cursor']}"
+    assert len(seen) == len(set(seen)) == 9
@@ -0,0 +1,43 @@
+"""Interview queue claims: one live lease per panel per location, even under concurrent claims."""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from database import CANDIDATES
+from models.candidate import candidate_doc
+
+
+def _queue(db, n, location="Pune"):
+    now = datetime.utcnow()
+    docs = []
+    for i in range(n):
+        doc = candidate_doc(f"TPEML-2026-ENG-{i:05d}", f"Candidate {i}", interview_location=location)
+        doc["created_at"] = now + timedelta(seconds=i)
+        docs.append(doc)
+    db[CANDIDATES].insert_many(docs)
+
+
+def test_concurrent_claims_from_one_panel_lease_one_candidate(db, client, login):
+    _queue(db, 10)
+    panel, h = login("interviewer")
+    other, other_h = login("interviewer")
+
+    def claim(headers):
+        return client.post("/api/interviews/queue/claim", json={"interview_location": "Pune"}, headers=headers).json()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        got = list(pool.map(claim, [h] * 8))
+    assert {g["candidate"]["candidate_id"] for g in got} == {"TPEML-2026-ENG-00000"}
+    assert db[CANDIDATES].count_documents({"claimed_by": panel.oid}) == 1
+    assert claim(other_h)["candidate"]["candidate_id"] == "TPEML-2026-ENG-00001"
+
+
+def test_lapsed_lease_does_not_block_a_new_claim(db, client, login):
+    _queue(db, 3)
+    panel, h = login("interviewer")
+    db[CANDIDATES].update_one(
+        {"candidate_id": "TPEML-2026-ENG-00002"},
+        {"$set": {"claimed_by": panel.oid, "claimed_at": datetime.utcnow() - timedelta(hours=1),
+                  "claim_expires_at": datetime.utcnow() - timedelta(minutes=30)}},
+    )
+    r = client.post("/api/interviews/queue/claim", json={"interview_location": "Pune"}, headers=h)
+    assert r.json()["candidate"]["candidate_id"] == "TPEML-2026-ENG-00000"
+    assert [c["candidate_id"] for c in db[CANDIDATES].find({"claimed_by": panel.oid})] == ["TPEML-2026-ENG-00000"]
@@ -0,0 +1,64 @@
+"""Concurrent interview submits: exactly one interview and one KPI move per (candidate, round)."""
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from database import CANDIDATES, INTERVIEWS
+from models.candidate import candidate_doc
+from services import candidate_events, kpi_service
+
+CANDIDATES_N = 5
+PANELS = 8
+
+
+def _onboard(db, n):
+    ids = []
+    for i in range(n):
+        doc = candidate_doc(f"TPEML-2026-ENG-{i:05d}", f"Candidate {i}", interview_location="Pune", diploma_branch="Mechanical")
+        doc["_id"] = db[CANDIDATES].insert_one(doc).inserted_id
+        candidate_events.candidate_created(db, doc)
+        ids.append(doc["candidate_id"])
+    return ids
+
+
+def _submit_all(client, panels, candidate_ids):
+    """Every panel submits every candidate at once; returns status codes per candidate."""
+    jobs = [(cid, h, decision) for cid in candidate_ids for (_, h), decision in zip(panels, ["shortlist", "reject"] * PANELS)]
+
+    def submit(job):
+        cid, h, decision = job
+        r = client.post("/api/interviews/submit", json={"candidate_id": cid, "decision": decision}, headers=h)
+        return cid, r.status_code
+    with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+        results = list(pool.map(submit, jobs))
+    codes: dict[str, Counter] = {}
+    for cid, code in results:
+        codes.setdefault(cid, Counter())[code] += 1
+    return codes
+
+
+def test_concurrent_submits_create_one_interview_per_round(db, client, login):
+    ids = _onboard(db, CANDIDATES_N)
+    panels = [login("interviewer") for _ in range(PANELS)]
+    admin, admin_h = login("admin")
+
+    codes = _submit_all(client, panels, ids)
+    assert all(c == Counter({200: 1, 400: PANELS - 1}) for c in codes.values()), codes
+
+    for cid in ids:
+        r = client.post("/api/re-interview/request", json={"candidate_id": cid, "reason": "retest"}, headers=panels[0][1])
+        assert r.status_code == 200
+        r = client.post("/api/re-interview/resolve", json={"request_id": r.json()["id"], "approved": True}, headers=admin_h)
+        assert r.status_code == 200
+
+    codes = _submit_all(client, panels, ids)
+    assert all(c == Counter({200: 1, 400: PANELS - 1}) for c in codes.values()), codes
+
+    rounds = Counter((i["candidate_id"], i["interview_round"]) for i in db[INTERVIEWS].find())
+    assert rounds == Counter({(cid, n): 1 for cid in ids for n in (1, 2)})
+
+    kpis = kpi_service.read_kpis(db)
+    assert kpis["total_candidates"] == CANDIDATES_N
+    assert kpis["interview_completed"] == CANDIDATES_N
+    assert kpis["yet_to_interview"] == 0
+    assert sum(kpis["by_decision"].values()) == CANDIDATES_N
+    assert kpis == kpi_service.kpis_from_doc(kpi_service.compute_kpis(db))
@@ -0,0 +1,135 @@
+"""Candidate search: index-backed ranking, ID-first reads, short terms, truncation, and p95 against the old $regex path."""
+import random
+import statistics
+import time
+
+import mongomock
+import pytest
+
+from database import CANDIDATES
+from models.candidate import candidate_doc
+from services import search_service
+from services.search_service import search_candidates, with_search_fields
+
+from conftest import bench_sizes
+
+FIRST = ["Amit", "Shreya", "Rahul", "Priya", "Mohammed", "Anjali", "Vikram", "Sneha", "Arjun", "Kavya", "Rohan", "Neha"]
+LAST = ["Kumar", "Sharma", "Singh", "Patil", "Deshmukh", "Iyer", "Khan", "Reddy", "Nair", "Joshi", "Kulkarni", "Gupta"]
+
+
+def _candidate(i, name=None, email=None):
+    name = name or f"{FIRST[i % len(FIRST)]} {LAST[(i // len(FIRST)) % len(LAST)]}"
+    doc = candidate_doc(
+        f"TPEML-2026-ENG-{i:05d}", name,
+        email=email or f"{name.split()[0].lower()}.{i}@example.com",
+        interview_location="Pune", year_of_recruitment="2026",
+    )
+    return with_search_fields(doc)
+
+
+def _names(rows):
+    return [r["name"] for r in rows]
+
+
+def test_ranking_exact_id_then_prefix_then_substring(db):
+    db[CANDIDATES].insert_many([
+        _candidate(1, "Vikram Rao", "vr@example.com"),
+        _candidate(2, "Aravind Raol", "ar@example.com"),
+        _candidate(3, "Raosaheb Patil", "rp@example.com"),
+        _candidate(4, "Sneha Kulkarni", "sk@example.com"),
+    ])
+    rows, total, truncated = search_candidates(db, "rao")
+    assert _names(rows) == ["Aravind Raol", "Raosaheb Patil", "Vikram Rao"]
+    assert (total, truncated) == (3, False)
+    rows, _, _ = search_candidates(db, "avin")
+    assert _names(rows) == ["Aravind Raol"]
+
+    rows, total, _ = search_candidates(db, "tpeml-2026-eng-00004")
+    assert _names(rows) == ["Sneha Kulkarni"] and total == 1
+    rows, total, _ = search_candidates(db, "TPEML-2026-ENG-0000")
+    assert total == 4
+
+
+def test_pagination_is_stable(db):
+    db[CANDIDATES].insert_many([_candidate(i, f"Kumar {chr(65 + i)}") for i in range(12)])
+    pages = [search_candidates(db, "kumar", skip=s, limit=5)[0] for s in (0, 5, 10)]
+    assert [len(p) for p in pages] == [5, 5, 2]
+    assert _names(sum(pages, [])) == sorted(_names(sum(pages, [])))
+
+
+def test_short_terms_keep_substring_matches(db):
+    db[CANDIDATES].insert_many([
+        _candidate(1, "Gagan Deep"),
+        _candidate(2, "Arjun Singh"),
+        _candidate(3, "Priya Nair"),
+    ])
+    rows, total, _ = search_candidates(db, "gh")
+    assert _names(rows) == ["Arjun Singh"] and total == 1
+    rows, _, _ = search_candidates(db, "ga")
+    assert _names(rows) == ["Gagan Deep"]
+    rows, _, _ = search_candidates(db, "a")
+    assert _names(rows) == ["Arjun Singh", "Gagan Deep", "Priya Nair"]
+
+
+def test_exact_id_survives_a_truncated_scan(db, monkeypatch):
+    monkeypatch.setattr(search_service, "SEARCH_SCAN_LIMIT", 10)
+    db[CANDIDATES].insert_many([_candidate(i, f"Rahul Kumar {i}") for i in range(1, 30)])
+    rows, total, truncated = search_candidates(db, "kumar")
+    assert truncated and total == 10
+    rows, total, truncated = search_candidates(db, "TPEML-2026-ENG-00029")
+    assert _names(rows)[:1] == ["Rahul Kumar 29"]
+
+
+def test_search_endpoint_contract(db, client, login):
+    _, h = login("hr")
+    r = client.post("/api/candidates", headers=h, json={
+        "name": "Shreya Deshmukh", "gender": "F", "dob": "2004-02-01", "contact_no": "9876543210",
+        "email": "shreya.d@example.com", "residential_address": "Pune", "state_of_domicile": "Maharashtra",
+        "interview_location": "Pune", "date_of_interview": "2026-05-01", "year_of_recruitment": "2026",
+        "college_name": "GPP", "university_name": "MSBTE", "diploma_enrollment_no": "EN1",
+        "diploma_branch": "Mechanical", "diploma_passout_year": "2025", "diploma_percentage": 81.0,
+        "any_backlog_in_diploma": "No", "tenth_percentage": 80.0, "tenth_passout_year": "2020",
+    })
+    assert r.status_code == 201
+    cid = r.json()["candidate_id"]
+
+    body = client.get("/api/candidates/search", params={"q": "deshm"}, headers=h).json()
+    assert [c["candidate_id"] for c in body["candidates"]] == [cid]
+    assert body["total"] == 1 and body["truncated"] is False
+    body = client.get("/api/candidates/search", params={"q": cid}, headers=h).json()
+    assert body["total"] == 1 and body["candidates"][0]["name"] == "Shreya Deshmukh"
+    body = client.get("/api/candidates/search", params={"q": "deshm", "interview_location": "Nagpur"}, headers=h).json()
+    assert body["total"] == 0
+
+
+def _regex_search(db, term):
+    """The /search query this subsystem replaced: unanchored case-insensitive $regex, first 50."""
+    return list(db[CANDIDATES].find({"$or": [
+        {"name": {"$regex": term, "$options": "i"}},
+        {"email": {"$regex": term, "$options": "i"}},
+        {"candidate_id": {"$regex": term, "$options": "i"}},
+    ]}).limit(50))
+
+
+@pytest.mark.benchmark
+def test_search_p95_against_regex(bench_db):
+    """p95 of the indexed search and the old $regex path; on a real server the index must win at the largest size."""
+    rng = random.Random(7)
+    terms = ["shreya", "kulkarni", "amit kumar", "ya", "mohammed khan", "TPEML-2026-ENG-00042", "eshm", "zzzz"]
+    results = {}
+    for size in bench_sizes("500,2000"):
+        db = bench_db()
+        for start in range(0, size, 5000):
+            db[CANDIDATES].insert_many([_candidate(i) for i in range(start, min(size, start + 5000))])
+        for name, run in (("index", lambda t: search_candidates(db, t)), ("regex", lambda t: _regex_search(db, t))):
+            samples = []
+            for _ in range(3):
+                for term in rng.sample(terms, len(terms)):
+                    t = time.perf_counter()
+                    run(term)
+                    samples.append(time.perf_counter() - t)
+            results[(size, name)] = statistics.quantiles(samples, n=20)[-1]
+        print(f"candidates={size:>8} p95 index={results[(size, 'index')] * 1000:.2f}ms regex={results[(size, 'regex')] * 1000:.2f}ms")
+    largest = max(size for size, _ in results)
+    if not isinstance(db.client, mongomock.MongoClient):
+        assert results[(largest, "index")] < results[(largest, "regex")]
@@ -1,12 +1,24 @@
 """
 Unique Candidate ID generation: TPEML-YYYY-{ROLE_PREFIX}-{SEQ}.
 e.g. TPEML-2026-ENG-00412
+
+Sequences live in the counters collection, one document per year+prefix
+(_id "candidate_id:2026:ENG"), advanced with an atomic $inc so concurrent
+onboardings never receive the same ID. Bulk ingest (forms sync) calls
+allocate_candidate_ids, which reserves a contiguous range per prefix with one
+$inc of N and formats the IDs locally.
+
+Numbers from a reserved range that are never used (crashed or partially
+failed batch) are left as gaps; the counter only moves forward, so they are
+never handed out again. Sequences past 99999 simply widen beyond five digits.
 """
 from datetime import datetime
 
+from pymongo import ReturnDocument
 from pymongo.database import Database
+from pymongo.errors import DuplicateKeyError
 
-from database import CANDIDATES
+from database import CANDIDATES, COUNTERS
 
 ROLE_PREFIXES = {
     "engineer": "ENG",
@@ -28,25 +40,123 @@ def _prefix_for_role(role_applied: str | None) -> str:
     return ROLE_PREFIXES["default"]
 
 
+def _counter_key(year: int, prefix: str) -> str:
+    return f"candidate_id:{year}:{prefix}"
+
+
+def _format_candidate_id(year: int, prefix: str, seq: int) -> str:
+    return f"TPEML-{year}-{prefix}-{seq:05d}"
+
+
+def _parse_candidate_id(cid: str) -> tuple[int, str, int] | None:
+    """Split TPEML-YYYY-PREFIX-NNNNN into (year, prefix, seq); None if malformed."""
+    parts = (cid or "").split("-")
+    if len(parts) < 4 or parts[0] != "TPEML":
+        return None
+    try:
+        return int(parts[1]), parts[2], int(parts[-1])
+    except ValueError:
+        return None
+
+
+def _max_existing_seq(db: Database, year: int, prefix: str) -> int:
+    """Highest sequence already used for year+prefix (full scan; seeding only)."""
+    cursor = db[CANDIDATES].find(
+        {"candidate_id": {"$regex": f"^TPEML-{year}-{prefix}-"}},
+        {"candidate_id": 1},
+    )
+    max_seq = 0
+    for d in cursor:
+        parsed = _parse_candidate_id(d.get("candidate_id"))
+        if parsed:
+            max_seq = max(max_seq, parsed[2])
+    return max_seq
+
+
+def _seed_counter(db: Database, year: int, prefix: str) -> None:
+    """Create the counter for year+prefix at the current max sequence. Safe to race."""
+    max_seq = _max_existing_seq(db, year, prefix)
+    try:
+        db[COUNTERS].update_one(
+            {"_id": _counter_key(year, prefix)},
+            {"$max": {"seq": max_seq}},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        # Another worker seeded it first; $max makes a retry unnecessary.
+        pass
+
+
+def _advance_counter(db: Database, year: int, prefix: str, count: int = 1) -> int:
+    """Atomically add `count` to the year+prefix counter and return the new value."""
+    key = _counter_key(year, prefix)
+    doc = db[COUNTERS].find_one_and_update(
+        {"_id": key},
+        {"$inc": {"seq": count}},
+        return_document=ReturnDocument.AFTER,
+    )
+    if doc is None:
+        # First ID for this year+prefix in this database: seed from existing IDs once.
+        _seed_counter(db, year, prefix)
+        doc = db[COUNTERS].find_one_and_update(
+            {"_id": key},
+            {"$inc": {"seq": count}},
+            return_document=ReturnDocument.AFTER,
+        )
+    return doc["seq"]
+
+
 def generate_candidate_id(db: Database, role_applied: str | None = None) -> str:
     """
     Generate next Candidate ID: TPEML-YYYY-PREFIX-NNNNN.
-    Uses max existing seq for same year+prefix.
+    One atomic find-and-modify on the year+prefix counter.
     """
     year = datetime.utcnow().year
     prefix = _prefix_for_role(role_applied)
+    seq = _advance_counter(db, year, prefix)
+    return _format_candidate_id(year, prefix, seq)
+
+
+def allocate_candidate_ids(db: Database, roles: list[str | None]) -> list[str]:
+    """
+    Allocate one Candidate ID per entry of `roles`, in order.
+    Roles mapping to the same prefix share one range reservation, so a batch
+    mixing several branches costs one round trip per distinct prefix.
+    """
+    prefixes = [_prefix_for_role(r) for r in roles]
+    year = datetime.utcnow().year
+    next_seq: dict[str, int] = {}
+    for prefix in set(prefixes):
+        count = prefixes.count(prefix)
+        next_seq[prefix] = _advance_counter(db, year, prefix, count) - count + 1
+    out = []
+    for prefix in prefixes:
+        out.append(_format_candidate_id(year, prefix, next_seq[prefix]))
+        next_seq[prefix] += 1
+    return out
+
+
+def seed_candidate_id_counters(db: Database) -> int:
+    """
+    One-time seeding of counters from existing candidate IDs.
+    Raises counters to the max used sequence ($max), never lowers them.
+    Returns number of year+prefix counters touched.
+    """
+    max_by_key: dict[tuple[int, str], int] = {}
     cursor = db[CANDIDATES].find(
-        {"candidate_id": {"$regex": f"^TPEML-{year}-{prefix}-"}},
-        {"candidate_id": 1},
+        {"candidate_id": {"$regex": "^TPEML-"}},
+        {"candidate_id": 1, "_id": 0},
     )
-    max_seq = 0
     for d in cursor:
-        cid = d.get("candidate_id") or ""
-        try:
-            parts = cid.split("-")
-            if len(parts) >= 4:
-                max_seq = max(max_seq, int(parts[-1]))
-        except (ValueError, IndexError):
+        parsed = _parse_candidate_id(d.get("candidate_id"))
+        if not parsed:
             continue
-    next_seq = max_seq + 1
-    return f"TPEML-{year}-{prefix}-{next_seq:05d}"
+        year, prefix, seq = parsed
+        max_by_key[(year, prefix)] = max(max_by_key.get((year, prefix), 0), seq)
+    for (year, prefix), max_seq in max_by_key.items():
+        db[COUNTERS].update_one(
+            {"_id": _counter_key(year, prefix)},
+            {"$max": {"seq": max_seq}},
+            upsert=True,
+        )
+    return len(max_by_key)
@@ -0,0 +1,39 @@
+"""
+Opaque keyset cursors for (sort value, _id) pagination.
+A cursor is urlsafe base64 of JSON: {"v": <datetime iso>, "id": <ObjectId hex>}.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException
+
+
+def encode_cursor(value: Optional[datetime], oid: ObjectId) -> str:
+    payload = {"v": value.isoformat() if value else None, "id": str(oid)}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[Optional[datetime], ObjectId]:
+    """Return (sort value, _id). Raises 400 on a malformed cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        value = datetime.fromisoformat(payload["v"]) if payload.get("v") else None
+        return value, ObjectId(payload["id"])
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_filter(field: str, cursor: str, descending: bool = True) -> dict:
+    """Filter selecting rows strictly after `cursor` in (field, _id) order."""
+    value, oid = decode_cursor(cursor)
+    op = "$lt" if descending else "$gt"
+    return {"$or": [
+        {field: {op: value}},
+        {field: value, "_id": {op: oid}},
+    ]}